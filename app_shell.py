@@ -0,0 +1,375 @@
+import os
+import sys
+from datetime import datetime
+
+import customtkinter as ctk
+from tkinter import messagebox, PhotoImage
+from PIL import Image, ImageDraw
+
+from database import db_connection, change_counter, table_versions, watch_changes
+from network_monitor import get_monitor
+from profile_window import ProfileWindow
+
+
+# Rendered avatars outlive the windows that show them: logging out and back in
+# (or switching roles) creates a new Tk root, but the decoded, resized and
+# masked PIL image for an unchanged file is reused.
+_avatar_images = {}  # (path, mtime, size) -> circular PIL image
+
+
+def _base_dir() -> str:
+    if getattr(sys, "frozen", False):
+        return sys._MEIPASS
+    return os.path.dirname(__file__)
+
+
+def _avatar_path_for(username: str):
+    try:
+        with db_connection() as conn:
+            row = conn.execute("SELECT profile_image_path FROM users WHERE username = ?", (username,)).fetchone()
+    except Exception:
+        return None
+    if row and row[0]:
+        return row[0]
+    return None
+
+
+def circular_avatar(img_path: str, size=(60, 60)):
+    """Circular RGBA thumbnail of ``img_path``, rendered once per file version."""
+    key = (img_path, os.path.getmtime(img_path), size)
+    image = _avatar_images.get(key)
+    if image is None:
+        raw_img = Image.open(img_path).convert("RGBA")
+        raw_img = raw_img.resize(size, Image.Resampling.LANCZOS)
+
+        mask = Image.new("L", size, 0)
+        draw = ImageDraw.Draw(mask)
+        draw.ellipse((0, 0) + size, fill=255)
+
+        image = Image.new("RGBA", size, (0, 0, 0, 0))
+        image.paste(raw_img, (0, 0), mask=mask)
+        _avatar_images[key] = image
+    return image
+
+
+class AppShell(ctk.CTk):
+    """Window frame shared by every role: sidebar, content area, status bar and account menu.
+
+    Subclasses set ``role_title``, build their sidebar in ``_build_sidebar``
+    and open their first page in ``show_home``.
+    """
+
+    role_title = ""
+    content_style = {"corner_radius": 0, "fg_color": "transparent"}
+    # no internet, offline, good
+    net_colors = ("#2563eb", "#6b7280", "#16a34a")
+
+    def __init__(self, username: str):
+        super().__init__()
+
+        self.title(f"MEDISKED: HOSPITAL SCHEDULING AND BILLING MANAGMENT SYSTEM - {self.role_title}")
+        self.geometry("1100x650")
+        self.resizable(True, True)
+
+        ico_path = os.path.join(_base_dir(), "images", "logo.ico")
+        png_path = os.path.join(_base_dir(), "images", "logo.png")
+        try:
+            if os.path.exists(ico_path):
+                self.iconbitmap(ico_path)
+            elif os.path.exists(png_path):
+                self._icon_image = PhotoImage(file=png_path)
+                self.iconphoto(False, self._icon_image)
+        except Exception:
+            pass
+
+        # Center window on screen
+        self.update_idletasks()
+        width = 1100
+        height = 650
+        x = (self.winfo_screenwidth() - width) // 2
+        y = (self.winfo_screenheight() - height) // 2
+        self.geometry(f"{width}x{height}+{x}+{y}")
+
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("blue")
+
+        # Use a consistent dark background color for every window
+        self.configure(fg_color="#020617")
+
+        self.username = username
+        self.should_relogin = False
+        self.profile_window = None
+        self.account_menu = None
+
+        # Layout: sidebar + content + bottom status bar
+        self.grid_columnconfigure(0, weight=0)
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=0)
+
+        self.sidebar = self._build_sidebar()
+        self.sidebar.grid(row=0, column=0, sticky="nsw", rowspan=2)
+
+        self.content = ctk.CTkFrame(self, **self.content_style)
+        self.content.grid(row=0, column=1, sticky="nsew", padx=20, pady=(60, 20))
+        self.content.grid_rowconfigure(0, weight=1)
+        self.content.grid_columnconfigure(0, weight=1)
+
+        # Bottom status bar
+        self.status_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.status_frame.grid(row=1, column=1, sticky="ew", padx=20, pady=(0, 10))
+        # Column 0: network indicator, Column 1: text status
+        self.status_frame.grid_columnconfigure(0, weight=0)
+        self.status_frame.grid_columnconfigure(1, weight=1)
+
+        self.net_status_label = ctk.CTkLabel(
+            self.status_frame,
+            text="● Checking...",
+            anchor="w",
+            font=("Inter", 11),
+            text_color="#64748b",
+        )
+        self.net_status_label.grid(row=0, column=0, sticky="w", padx=(0, 12))
+
+        self.status_label = ctk.CTkLabel(
+            self.status_frame,
+            text="",
+            anchor="e",
+            font=("Inter", 11),
+            text_color="#64748b"
+        )
+        self.status_label.grid(row=0, column=1, sticky="e")
+
+        self._net_status = "unknown"
+
+        # Top-right avatar
+        self.current_avatar_path = _avatar_path_for(self.username)
+        self._reload_avatar_image()
+
+        self.avatar_button = ctk.CTkButton(
+            self,
+            image=self._avatar_icon,
+            text="",
+            width=32,
+            height=32,
+            fg_color="#020617",
+            hover_color="#1e293b",
+            corner_radius=16,
+            command=self.open_profile,
+        )
+        self.avatar_button.place(relx=1.0, x=-15, y=10, anchor="ne")
+
+        self.current_page = None
+        self._pages = {}        # page class -> live instance
+        self._page_state = {}   # page class -> _data_state() when it last showed fresh data
+        self.show_home()
+        self._update_status_bar()
+        get_monitor().subscribe(self, self._update_network_status)
+        watch_changes(self, self._on_external_change)
+
+    def _build_sidebar(self):
+        raise NotImplementedError
+
+    def show_home(self):
+        raise NotImplementedError
+
+    def _status_text(self, now_str: str) -> str:
+        return f"Medisked v1.0   |   User: {self.username}   |   {now_str}"
+
+    def _reload_avatar_image(self):
+        img_path = os.path.join(_base_dir(), "images", "user.png")
+        if self.current_avatar_path and os.path.exists(self.current_avatar_path):
+            img_path = self.current_avatar_path
+
+        try:
+            circular_img = circular_avatar(img_path)
+            # CTkImage holds Tk photo images, so each window wraps the cached PIL image itself
+            self._avatar_icon = ctk.CTkImage(light_image=circular_img, dark_image=circular_img, size=(30, 30))
+        except Exception:
+            self._avatar_icon = None
+
+    def _update_avatar_ui(self, new_path):
+        self.current_avatar_path = new_path
+        self._reload_avatar_image()
+        self.avatar_button.configure(image=self._avatar_icon)
+
+    def _data_state(self, page_cls):
+        # Pages list the tables they show in ``tables``; any write counts for the rest
+        tables = getattr(page_cls, "tables", None)
+        if tables:
+            return table_versions(tables)
+        return change_counter()
+
+    def _set_page(self, page_cls, **kwargs):
+        """Show the page of type ``page_cls``, reusing the instance built on an earlier visit.
+
+        Hidden pages stay alive with ``grid_remove``. When one of the page's
+        ``tables`` changed while it was hidden, its ``refresh()`` re-reads the
+        data into the existing widgets; a page without one is rebuilt.
+        """
+        if type(self.current_page) is page_cls and self.current_page.winfo_exists():
+            # Clicking the open page's button reloads it, as it always has
+            if hasattr(self.current_page, "refresh"):
+                self.current_page.refresh()
+            self._page_state[page_cls] = self._data_state(page_cls)
+            return
+        if self.current_page is not None:
+            self.current_page.grid_remove()
+            self._page_state[type(self.current_page)] = self._data_state(type(self.current_page))
+
+        state = self._data_state(page_cls)
+        page = self._pages.get(page_cls)
+        if page is not None and not page.winfo_exists():
+            page = None
+        if page is not None and self._page_state.get(page_cls) != state:
+            if hasattr(page, "refresh"):
+                page.refresh()
+            else:
+                page.destroy()
+                page = None
+        if page is None:
+            page = page_cls(self.content, **kwargs)
+            self._pages[page_cls] = page
+        self._page_state[page_cls] = state
+
+        self.current_page = page
+        self.current_page.grid(row=0, column=0, sticky="nsew")
+
+    def _on_external_change(self):
+        """Another station wrote to the database: refresh the open page if its tables moved."""
+        page = self.current_page
+        if page is None or not hasattr(page, "refresh") or not getattr(page, "auto_refresh", True):
+            return
+        state = self._data_state(type(page))
+        if state != self._page_state.get(type(page)):
+            self._page_state[type(page)] = state
+            page.refresh()
+
+    def open_profile(self):
+        if self.account_menu is not None and self.account_menu.winfo_exists():
+            self.account_menu.destroy()
+            self.account_menu = None
+            return
+
+        self.account_menu = ctk.CTkToplevel(self)
+        self.account_menu.overrideredirect(True)
+        self.account_menu.attributes("-topmost", True)
+
+        self.account_menu.update_idletasks()
+
+        bx = self.avatar_button.winfo_rootx()
+        by = self.avatar_button.winfo_rooty()
+        bw = self.avatar_button.winfo_width()
+
+        width, height = 200, 140
+        desired_x = bx - width + bw
+        desired_y = by + self.avatar_button.winfo_height() + 4
+
+        root_x = self.winfo_rootx()
+        root_y = self.winfo_rooty()
+        root_w = self.winfo_width()
+        root_h = self.winfo_height()
+
+        min_x = root_x
+        max_x = root_x + max(root_w - width, 0)
+        min_y = root_y
+        max_y = root_y + max(root_h - height, 0)
+
+        x = max(min_x, min(desired_x, max_x))
+        y = max(min_y, min(desired_y, max_y))
+
+        self.account_menu.geometry(f"{width}x{height}+{x}+{y}")
+
+        # Container with border
+        container = ctk.CTkFrame(
+            self.account_menu,
+            fg_color="#1e293b",
+            border_width=2,
+            border_color="#475569", # Slate 600 border
+            corner_radius=0
+        )
+        container.pack(fill="both", expand=True)
+
+        container.grid_columnconfigure(0, weight=1)
+
+        btn_settings = ctk.CTkButton(
+            container,
+            text="ACCOUNT SETTINGS",
+            anchor="w",
+            command=self._open_account_settings,
+        )
+        btn_settings.grid(row=0, column=0, padx=10, pady=(8, 4), sticky="ew")
+
+        btn_security = ctk.CTkButton(
+            container,
+            text="SECURITY",
+            anchor="w",
+            command=self._open_security,
+        )
+        btn_security.grid(row=1, column=0, padx=10, pady=4, sticky="ew")
+
+        btn_logout = ctk.CTkButton(
+            container,
+            text="LOGOUT",
+            anchor="w",
+            fg_color="#b91c1c",
+            hover_color="#991b1b",
+            command=self._logout_from_menu,
+        )
+        btn_logout.grid(row=2, column=0, padx=10, pady=(4, 8), sticky="ew")
+
+    def _close_account_menu(self):
+        if self.account_menu is not None and self.account_menu.winfo_exists():
+            self.account_menu.destroy()
+        self.account_menu = None
+
+    def _open_profile_window(self, mode: str):
+        self._close_account_menu()
+
+        if self.profile_window is None or not self.profile_window.winfo_exists():
+            self.profile_window = ProfileWindow(self, self.username, anchor_widget=self.avatar_button, mode=mode)
+        else:
+            self.profile_window.focus()
+
+    def _open_account_settings(self):
+        self._open_profile_window("settings")
+
+    def _open_security(self):
+        self._open_profile_window("security")
+
+    def _logout_from_menu(self):
+        self._close_account_menu()
+        self.logout()
+
+    def logout(self):
+        if not messagebox.askyesno("Confirm Logout", "Are you sure you want to logout?"):
+            return
+        self.should_relogin = True
+        self.destroy()
+
+    def _update_status_bar(self):
+        """Update the bottom status bar with username and current time every second."""
+        now_str = datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")
+        self.status_label.configure(text=self._status_text(now_str))
+        self.after(1000, self._update_status_bar)
+
+    def _update_network_status(self, latency: float | None, err: Exception | None):
+        """Show the latest connectivity probe result in the indicator."""
+        no_internet, offline, good = self.net_colors
+
+        def classify(latency: float | None, error: Exception | None):
+            if error is not None:
+                # Treat network/DNS errors as no-internet
+                return "no_internet", "No internet", no_internet
+            if latency is None:
+                return "offline", "Offline", offline
+            if latency > 1.0:
+                return "slow", f"Slow ({latency*1000:.0f} ms)", "#f97316"
+            return "good", f"Online ({latency*1000:.0f} ms)", good
+
+        status_key, label_text, color = classify(latency, err)
+        self._net_status = status_key
+        try:
+            self.net_status_label.configure(text=f"● {label_text}", text_color=color)
+        except Exception:
+            pass
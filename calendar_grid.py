@@ -0,0 +1,88 @@
+import calendar
+
+import customtkinter as ctk
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_EMPTY_CELL = {"text": "", "fg_color": "transparent", "hover": False, "state": "disabled"}
+
+
+class CalendarGrid(ctk.CTkFrame):
+    """Month calendar backed by a fixed 6x7 pool of day buttons.
+
+    The buttons are created once. ``show()`` works out the style of every cell
+    and only reconfigures the ones that differ from what is already on screen,
+    so flipping months or doctors touches a handful of widgets instead of
+    rebuilding the whole grid.
+    """
+
+    def __init__(self, master, on_pick, cell_size=40, cell_font=("Inter", 12), cell_pad=4,
+                 cell_radius=None, header_font=("Inter", 12, "bold"), header_color="#94a3b8",
+                 header_pady=(0, 10), header_upper=False, uniform_rows=False, **kwargs):
+        super().__init__(master, **kwargs)
+        self._on_pick = on_pick
+        self._dates = [[None] * 7 for _ in range(6)]
+        self._applied = [[dict(_EMPTY_CELL) for _ in range(7)] for _ in range(6)]
+
+        for i, wd in enumerate(WEEKDAYS):
+            self.grid_columnconfigure(i, weight=1, uniform="cal_col")
+            ctk.CTkLabel(
+                self, text=wd.upper() if header_upper else wd, font=header_font, text_color=header_color
+            ).grid(row=0, column=i, pady=header_pady)
+
+        btn_kwargs = {}
+        if cell_radius is not None:
+            btn_kwargs["corner_radius"] = cell_radius
+
+        self._buttons = []
+        for r in range(6):
+            if uniform_rows:
+                self.grid_rowconfigure(r + 1, weight=1, uniform="cal_row")
+            row_btns = []
+            for c in range(7):
+                btn = ctk.CTkButton(
+                    self,
+                    width=cell_size,
+                    height=cell_size,
+                    font=cell_font,
+                    command=lambda r=r, c=c: self._clicked(r, c),
+                    **_EMPTY_CELL,
+                    **btn_kwargs,
+                )
+                btn.grid(row=r + 1, column=c, padx=cell_pad, pady=cell_pad, sticky="nsew")
+                row_btns.append(btn)
+            self._buttons.append(row_btns)
+
+    def show(self, year: int, month: int, style_for):
+        """Lay out ``year``/``month``.
+
+        ``style_for(date_str)`` returns the button options for that day
+        (``fg_color``, ``hover_color`` and optionally ``text_color``, ``state``
+        and ``hover``). Disabled days are not clickable.
+        """
+        weeks = calendar.Calendar(firstweekday=0).monthdayscalendar(year, month)
+        for r in range(6):
+            week = weeks[r] if r < len(weeks) else [0] * 7
+            for c in range(7):
+                day_num = week[c]
+                if day_num == 0:
+                    self._dates[r][c] = None
+                    self._apply(r, c, _EMPTY_CELL)
+                    continue
+                d_str = f"{year:04d}-{month:02d}-{day_num:02d}"
+                self._dates[r][c] = d_str
+                style = {"text": str(day_num), "text_color": "white", "hover": True, "state": "normal"}
+                style.update(style_for(d_str))
+                self._apply(r, c, style)
+
+    def _apply(self, r, c, style):
+        applied = self._applied[r][c]
+        changed = {key: value for key, value in style.items() if applied.get(key) != value}
+        if changed:
+            self._buttons[r][c].configure(**changed)
+            applied.update(changed)
+
+    def _clicked(self, r, c):
+        d_str = self._dates[r][c]
+        if d_str is not None and self._applied[r][c].get("state") != "disabled":
+            self._on_pick(d_str)
@@ -1,11 +1,10 @@
-import sqlite3
 import os
 import shutil
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from PIL import Image
 
-from database import DB_NAME, log_activity
+from database import db_connection, log_activity
 
 class CashierProfileWindow(ctk.CTkToplevel):
     def __init__(self, master, username: str, anchor_widget=None):
@@ -130,15 +129,14 @@ class CashierProfileWindow(ctk.CTkToplevel):
         save_button.grid(row=0, column=1, padx=(10, 0), sticky="e")
 
     def _load_data(self):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        cur.execute("SELECT password, profile_image_path, full_name FROM users WHERE username = ?", (self.username,))
-        row = cur.fetchone()
-        if row:
-            self.password_value = row[0]
-            self.current_image_path = row[1]
-            self.current_full_name = row[2]
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT password, profile_image_path, full_name FROM users WHERE username = ?", (self.username,))
+            row = cur.fetchone()
+            if row:
+                self.password_value = row[0]
+                self.current_image_path = row[1]
+                self.current_full_name = row[2]
 
     def _load_avatar_preview(self, path):
         image = None
@@ -172,42 +170,38 @@ class CashierProfileWindow(ctk.CTkToplevel):
             messagebox.showwarning("Validation", "Username cannot be empty.")
             return
 
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-
-        # Check unique username
-        if new_username != self.username:
-            cur.execute("SELECT COUNT(*) FROM users WHERE username = ?", (new_username,))
-            if cur.fetchone()[0] > 0:
-                conn.close()
-                messagebox.showerror("Error", "Username already exists.")
-                return
-
-        # Prepare image path
-        final_image_path = self.current_image_path
-        if self.selected_image_path:
-            ext = os.path.splitext(self.selected_image_path)[1]
-            new_filename = f"{new_username}_profile{ext}"
-            target_dir = os.path.join(os.getcwd(), "profile_images")
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
-            target_path = os.path.join(target_dir, new_filename)
-            try:
-                shutil.copy2(self.selected_image_path, target_path)
-                final_image_path = target_path
-            except Exception as e:
-                conn.close()
-                messagebox.showerror("Error", f"Failed to save image: {e}")
-                return
-
-        password_to_save = new_password if new_password else self.password_value
-
-        cur.execute(
-            "UPDATE users SET username = ?, password = ?, profile_image_path = ?, full_name = ? WHERE username = ?",
-            (new_username, password_to_save, final_image_path, new_fullname, self.username),
-        )
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            # Check unique username
+            if new_username != self.username:
+                cur.execute("SELECT COUNT(*) FROM users WHERE username = ?", (new_username,))
+                if cur.fetchone()[0] > 0:
+                    messagebox.showerror("Error", "Username already exists.")
+                    return
+
+            # Prepare image path
+            final_image_path = self.current_image_path
+            if self.selected_image_path:
+                ext = os.path.splitext(self.selected_image_path)[1]
+                new_filename = f"{new_username}_profile{ext}"
+                target_dir = os.path.join(os.getcwd(), "profile_images")
+                if not os.path.exists(target_dir):
+                    os.makedirs(target_dir)
+                target_path = os.path.join(target_dir, new_filename)
+                try:
+                    shutil.copy2(self.selected_image_path, target_path)
+                    final_image_path = target_path
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to save image: {e}")
+                    return
+
+            password_to_save = new_password if new_password else self.password_value
+
+            cur.execute(
+                "UPDATE users SET username = ?, password = ?, profile_image_path = ?, full_name = ? WHERE username = ?",
+                (new_username, password_to_save, final_image_path, new_fullname, self.username),
+            )
 
         # Update main app avatar immediately
         if hasattr(self.master_ref, "_update_avatar_ui"):
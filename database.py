@@ -1,13 +1,482 @@
+import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_NAME = "database.db"
+# How long a statement waits for another station's write lock before failing,
+# and how many times a whole write transaction is retried after that.
+BUSY_TIMEOUT = 10.0
+BUSY_RETRIES = 5
 
+# Seed rows for the services table: (name, price in PHP).
+DEFAULT_SERVICES = [
+    ("General Consultation", 400),
+    ("Pediatrics Consultation", 450),
+    ("Internal Medicine", 500),
+    ("Cardiology Consultation", 800),
+    ("OB-GYN Consultation", 700),
+    ("Dermatology Consultation", 600),
+    ("ENT Consultation", 550),
+    ("Orthopedic Consultation", 750),
+    ("Ophthalmology Consultation", 500),
+    ("Dental Consultation", 350),
+    ("CBC (Complete Blood Count)", 250),
+    ("Urinalysis", 150),
+    ("Stool Examination", 150),
+    ("Fasting Blood Sugar (FBS)", 200),
+    ("HbA1c", 800),
+    ("Lipid Profile", 700),
+    ("Creatinine Test", 300),
+    ("BUN (Blood Urea Nitrogen)", 250),
+    ("Liver Function Test (LFT)", 500),
+    ("TSH / Thyroid Test", 700),
+    ("Chest X-Ray (PA View)", 650),
+    ("Lumbar X-Ray", 800),
+    ("Ultrasound – Whole Abdomen", 1000),
+    ("Ultrasound – Pelvic / OB", 900),
+    ("Ultrasound – Thyroid", 800),
+    ("2D Echo", 2500),
+    ("ECG", 600),
+    ("CT Scan (Plain)", 6000),
+    ("MRI (Plain)", 10000),
+    ("Mammogram", 2000),
+    ("Wound Dressing", 300),
+    ("Nebulization", 200),
+    ("Injection Service", 200),
+    ("Suturing (small wound)", 1000),
+    ("Ear Cleaning", 400),
+    ("Incision and Drainage", 800),
+    ("ECG with Interpretation", 800),
+    ("Cast / Splint Application", 1000),
+    ("Pap Smear", 500),
+    ("Pregnancy Test (Urine)", 200),
+    ("Medical Certificate", 250),
+    ("Vital Signs Check", 100),
+    ("ECG Print Request", 150),
+    ("X-Ray CD Copy", 150),
+    ("Laboratory Results Printing", 100),
+    ("Doctor Follow-Up Consultation", 300),
+    ("Teleconsultation", 400),
+    ("Nutritional Counseling", 500),
+    ("Family Planning Consultation", 400),
+    ("Vaccination Service (Service Fee)", 400),
+]
 
-def init_db(db_path: str = DB_NAME) -> None:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
+_local = threading.local()
+
+
+def get_connection(db_path: str = DB_NAME) -> sqlite3.Connection:
+    """Return the calling thread's long-lived connection to ``db_path``.
+
+    Connections are opened lazily, one per thread and database file, and kept
+    open so SQLite's statement cache is reused across calls instead of paying
+    for a fresh connect/teardown on every query.
+    """
+    conns = getattr(_local, "connections", None)
+    if conns is None:
+        conns = _local.connections = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, cached_statements=256)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError:
+            pass
+        conns[db_path] = conn
+    return conn
+
+
+@contextmanager
+def db_connection(db_path: str = DB_NAME, immediate: bool = False):
+    """Yield the shared connection, committing on success and rolling back on error.
+
+    Blocks may nest (e.g. ``log_activity`` inside a page's own block); only the
+    outermost one commits or rolls back. ``immediate`` takes the write lock
+    up front (BEGIN IMMEDIATE), so a read-then-write block cannot be beaten to
+    the lock by another station between its read and its write.
+    """
+    conn = get_connection(db_path)
+    depths = getattr(_local, "depths", None)
+    if depths is None:
+        depths = _local.depths = {}
+    if immediate and not depths.get(db_path) and not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    depths[db_path] = depths.get(db_path, 0) + 1
+    try:
+        yield conn
+    except BaseException:
+        if depths[db_path] == 1:
+            conn.rollback()
+        raise
+    else:
+        if depths[db_path] == 1:
+            conn.commit()
+    finally:
+        depths[db_path] -= 1
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def run_write(fn, db_path: str = DB_NAME, attempts: int = BUSY_RETRIES):
+    """Run ``fn(conn)`` in its own immediate transaction and return its result.
+
+    When another station still holds the write lock after ``BUSY_TIMEOUT``,
+    the whole transaction is rolled back and retried with a short backoff.
+    Inside an enclosing ``db_connection`` block ``fn`` simply runs there.
+    """
+    if getattr(_local, "depths", {}).get(db_path):
+        return fn(get_connection(db_path))
+    for attempt in range(attempts):
+        try:
+            with db_connection(db_path, immediate=True) as conn:
+                return fn(conn)
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e) or attempt == attempts - 1:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def close_connections() -> None:
+    """Close every connection opened by the calling thread."""
+    conns = getattr(_local, "connections", None) or {}
+    for conn in conns.values():
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conns.clear()
+
+
+def change_counter(db_path: str = DB_NAME) -> tuple[int, int]:
+    """A value that differs whenever ``db_path`` has been written since it was last read.
+
+    ``PRAGMA data_version`` moves when another connection (another thread or
+    another front-desk PC) commits; ``total_changes`` counts this thread's own
+    writes. Compare two results for equality only.
+    """
+    conn = get_connection(db_path)
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+def _column_names(cur: sqlite3.Cursor, table: str) -> set[str]:
+    return {row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _migrate_appointment_indexes(cur: sqlite3.Cursor) -> None:
+    """Index the hot appointment lookups and store derived date columns.
+
+    ``schedule`` is stored as 'YYYY-MM-DD HH:MM', so the day and month are plain
+    prefixes of it. Keeping them in their own indexed columns (maintained by
+    triggers) lets the dashboards filter by day/month without calling
+    DATE()/strftime() on every row.
+    """
+    cols = _column_names(cur, "appointments")
+    if "schedule_date" not in cols:
+        cur.execute("ALTER TABLE appointments ADD COLUMN schedule_date TEXT")
+    if "schedule_month" not in cols:
+        cur.execute("ALTER TABLE appointments ADD COLUMN schedule_month TEXT")
+
+    cur.execute(
+        "UPDATE appointments SET schedule_date = substr(schedule, 1, 10), schedule_month = substr(schedule, 1, 7)"
+    )
+
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_appointments_schedule_insert
+        AFTER INSERT ON appointments
+        BEGIN
+            UPDATE appointments
+            SET schedule_date = substr(NEW.schedule, 1, 10), schedule_month = substr(NEW.schedule, 1, 7)
+            WHERE id = NEW.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_appointments_schedule_update
+        AFTER UPDATE OF schedule ON appointments
+        BEGIN
+            UPDATE appointments
+            SET schedule_date = substr(NEW.schedule, 1, 10), schedule_month = substr(NEW.schedule, 1, 7)
+            WHERE id = NEW.id;
+        END
+        """
+    )
+
+    # POS barcode lookup
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_barcode ON appointments (barcode)")
+    # Slot availability / overlap checks
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_doctor_schedule ON appointments (doctor_name, schedule)")
+    # Dashboard earnings by day / month
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_date_paid ON appointments (schedule_date, is_paid)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_month_paid ON appointments (schedule_month, is_paid)")
+    # Doctor dashboard stats by day / month
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date ON appointments (doctor_name, schedule_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_doctor_month ON appointments (doctor_name, schedule_month)")
+
+
+_FTS_COLUMNS = "patient_name, doctor_name, barcode, notes"
+
+
+def _migrate_appointment_fts(cur: sqlite3.Cursor) -> None:
+    """Trigram full-text index over appointments, including the free-text notes.
+
+    ``notes`` carries the contact number, address and booked service, so this
+    is what lets staff find a patient by phone number or street name. The
+    trigram tokenizer matches any run of three or more characters, also in
+    the middle of a word (part of a barcode or phone number). The index
+    stores no text of its own (``content='appointments'``); triggers feed it
+    every insert, update and delete.
+    """
+    cur.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS appointments_fts
+        USING fts5({_FTS_COLUMNS}, content='appointments', content_rowid='id', tokenize='trigram')
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_appointments_fts_insert
+        AFTER INSERT ON appointments
+        BEGIN
+            INSERT INTO appointments_fts (rowid, {_FTS_COLUMNS})
+            VALUES (NEW.id, NEW.patient_name, NEW.doctor_name, NEW.barcode, NEW.notes);
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_appointments_fts_delete
+        AFTER DELETE ON appointments
+        BEGIN
+            INSERT INTO appointments_fts (appointments_fts, rowid, {_FTS_COLUMNS})
+            VALUES ('delete', OLD.id, OLD.patient_name, OLD.doctor_name, OLD.barcode, OLD.notes);
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_appointments_fts_update
+        AFTER UPDATE OF {_FTS_COLUMNS} ON appointments
+        BEGIN
+            INSERT INTO appointments_fts (appointments_fts, rowid, {_FTS_COLUMNS})
+            VALUES ('delete', OLD.id, OLD.patient_name, OLD.doctor_name, OLD.barcode, OLD.notes);
+            INSERT INTO appointments_fts (rowid, {_FTS_COLUMNS})
+            VALUES (NEW.id, NEW.patient_name, NEW.doctor_name, NEW.barcode, NEW.notes);
+        END
+        """
+    )
+    cur.execute("INSERT INTO appointments_fts (appointments_fts) VALUES ('rebuild')")
+
+
+def _split_notes(notes: str) -> dict[str, str]:
+    """Parse a 'Contact: ... | Address: ... | About: ...' notes string."""
+    fields = {}
+    for part in notes.split("|"):
+        if ":" in part:
+            key, value = part.split(":", 1)
+            fields.setdefault(key.strip(), value.strip())
+    return fields
+
+
+def _migrate_structured_appointments(cur: sqlite3.Cursor) -> None:
+    """Give appointments real contact/address/service/price columns.
+
+    Until now these only lived inside the ``notes`` string and every earnings
+    figure re-parsed it. This seeds a ``services`` table from the booking
+    page's old hard-coded list and backfills the new columns from existing
+    notes; the price written in the note wins over today's list price, so old
+    bookings keep what they were quoted.
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS services (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            price REAL NOT NULL,
+            is_active INTEGER NOT NULL DEFAULT 1
+        )
+        """
+    )
+    cur.executemany("INSERT OR IGNORE INTO services (name, price) VALUES (?, ?)", DEFAULT_SERVICES)
+
+    cols = _column_names(cur, "appointments")
+    if "contact" not in cols:
+        cur.execute("ALTER TABLE appointments ADD COLUMN contact TEXT")
+    if "address" not in cols:
+        cur.execute("ALTER TABLE appointments ADD COLUMN address TEXT")
+    if "service_id" not in cols:
+        cur.execute("ALTER TABLE appointments ADD COLUMN service_id INTEGER REFERENCES services(id)")
+    if "price" not in cols:
+        cur.execute("ALTER TABLE appointments ADD COLUMN price REAL")
+
+    by_name = {name: (sid, price) for sid, name, price in cur.execute("SELECT id, name, price FROM services")}
+    updates = []
+    for rid, notes in cur.execute("SELECT id, notes FROM appointments WHERE notes IS NOT NULL").fetchall():
+        fields = _split_notes(notes)
+        about = fields.get("About", "")
+        service_id, price = by_name.get(about.rsplit(" - ", 1)[0].strip(), (None, None))
+        m = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*PHP", about)
+        if m:
+            price = float(m.group(1).replace(",", ""))
+        updates.append((fields.get("Contact") or None, fields.get("Address") or None, service_id, price, rid))
+    cur.executemany("UPDATE appointments SET contact = ?, address = ?, service_id = ?, price = ? WHERE id = ?", updates)
+
+
+def _migrate_earnings_index(cur: sqlite3.Cursor) -> None:
+    """Covering index so the all-time average ticket only reads paid rows."""
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_appointments_paid_price ON appointments (is_paid, price)")
+
+
+def _revenue_delta_sql(row: str, sign: str) -> str:
+    day = f"substr({row}.schedule, 1, 10)"
+    return f"""
+            INSERT OR IGNORE INTO daily_revenue (day, doctor_name) VALUES ({day}, {row}.doctor_name);
+            UPDATE daily_revenue
+            SET revenue = revenue {sign} COALESCE({row}.price, 0),
+                tickets = tickets {sign} ({row}.price IS NOT NULL)
+            WHERE day = {day} AND doctor_name = {row}.doctor_name;"""
+
+
+def _migrate_daily_revenue(cur: sqlite3.Cursor) -> None:
+    """Per-day, per-doctor totals of paid appointments, kept current by triggers.
+
+    ``revenue`` sums the price of paid appointments scheduled that day and
+    ``tickets`` counts the ones that have a price. Every insert, delete and
+    change to payment, price, schedule or doctor moves the old row's amount
+    out and the new row's amount in, so the dashboards read a handful of
+    rollup rows instead of scanning appointments.
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_revenue (
+            day TEXT NOT NULL,
+            doctor_name TEXT NOT NULL,
+            revenue REAL NOT NULL DEFAULT 0,
+            tickets INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, doctor_name)
+        )
+        """
+    )
+    cur.execute("DELETE FROM daily_revenue")
+    cur.execute(
+        """
+        INSERT INTO daily_revenue (day, doctor_name, revenue, tickets)
+        SELECT substr(schedule, 1, 10), doctor_name, COALESCE(SUM(price), 0), COUNT(price)
+        FROM appointments
+        WHERE is_paid = 1
+        GROUP BY substr(schedule, 1, 10), doctor_name
+        """
+    )
 
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_revenue_insert
+        AFTER INSERT ON appointments WHEN NEW.is_paid = 1
+        BEGIN{_revenue_delta_sql("NEW", "+")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_revenue_delete
+        AFTER DELETE ON appointments WHEN OLD.is_paid = 1
+        BEGIN{_revenue_delta_sql("OLD", "-")}
+        END
+        """
+    )
+    # The old and new sides of an update have different WHEN conditions, so
+    # each gets its own trigger.
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_revenue_update_old
+        AFTER UPDATE OF is_paid, price, schedule, doctor_name ON appointments WHEN OLD.is_paid = 1
+        BEGIN{_revenue_delta_sql("OLD", "-")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_revenue_update_new
+        AFTER UPDATE OF is_paid, price, schedule, doctor_name ON appointments WHEN NEW.is_paid = 1
+        BEGIN{_revenue_delta_sql("NEW", "+")}
+        END
+        """
+    )
+
+
+TRACKED_TABLES = (
+    "appointments",
+    "doctors",
+    "doctor_availability",
+    "services",
+    "users",
+    "password_reset_requests",
+    "system_settings",
+    "activity_logs",
+)
+
+
+def _migrate_change_tracking(cur: sqlite3.Cursor) -> None:
+    """A version counter per table, bumped by triggers on every row written.
+
+    Pages remember the versions of the tables they show and skip reloading
+    when none of them moved, no matter which station made the change.
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for table in TRACKED_TABLES:
+        cur.execute("INSERT OR IGNORE INTO table_versions (name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cur.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+                """
+            )
+
+
+def _migrate_appointment_duration(cur: sqlite3.Cursor) -> None:
+    """How long each appointment blocks its doctor, taken from the slot it was booked in.
+
+    Older rows stay NULL and are read as the two hours every booking used to take.
+    """
+    if "duration_minutes" not in _column_names(cur, "appointments"):
+        cur.execute("ALTER TABLE appointments ADD COLUMN duration_minutes INTEGER")
+
+
+def _migrate_availability_rules(cur: sqlite3.Cursor) -> None:
+    """Standing weekly hours stored as one rule row instead of a row per day.
+
+    A rule row has ``weekday_mask`` set (bit 0 is Monday, bit 6 Sunday); its
+    ``date`` is the first day it applies and ``valid_until`` the last, or NULL
+    for no end. Dated rows for a day take precedence over any rule.
+    """
+    cols = _column_names(cur, "doctor_availability")
+    if "weekday_mask" not in cols:
+        cur.execute("ALTER TABLE doctor_availability ADD COLUMN weekday_mask INTEGER")
+    if "valid_until" not in cols:
+        cur.execute("ALTER TABLE doctor_availability ADD COLUMN valid_until TEXT")
+
+
+def _migrate_base_schema(cur: sqlite3.Cursor) -> None:
+    """Original schema, default rows and one-off cleanup of old sample data."""
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS users (
@@ -56,15 +525,11 @@ def init_db(db_path: str = DB_NAME) -> None:
     )
 
     
-    try:
+    user_cols = _column_names(cur, "users")
+    if "full_name" not in user_cols:
         cur.execute("ALTER TABLE users ADD COLUMN full_name TEXT")
-    except sqlite3.OperationalError:
-        pass
-
-    try:
+    if "profile_image_path" not in user_cols:
         cur.execute("ALTER TABLE users ADD COLUMN profile_image_path TEXT")
-    except sqlite3.OperationalError:
-        pass
 
     
     cur.execute(
@@ -84,23 +549,15 @@ def init_db(db_path: str = DB_NAME) -> None:
     )
 
     
-    try:
+    appt_cols = _column_names(cur, "appointments")
+    if "is_rescheduled" not in appt_cols:
         cur.execute("ALTER TABLE appointments ADD COLUMN is_rescheduled INTEGER NOT NULL DEFAULT 0")
-    except sqlite3.OperationalError:
-        
-        pass
-    try:
+    if "barcode" not in appt_cols:
         cur.execute("ALTER TABLE appointments ADD COLUMN barcode TEXT")
-    except sqlite3.OperationalError:
-        pass
-    try:
+    if "is_paid" not in appt_cols:
         cur.execute("ALTER TABLE appointments ADD COLUMN is_paid INTEGER NOT NULL DEFAULT 0")
-    except sqlite3.OperationalError:
-        pass
-    try:
+    if "amount_paid" not in appt_cols:
         cur.execute("ALTER TABLE appointments ADD COLUMN amount_paid REAL")
-    except sqlite3.OperationalError:
-        pass
 
     
     cur.execute(
@@ -171,46 +628,143 @@ def init_db(db_path: str = DB_NAME) -> None:
         )
         """
     )
-    
-    conn.commit()
-    conn.close()
+
+
+# Ordered (version, migration) pairs. Version 0 is the original schema; it is
+# skipped on databases that already recorded a later version. Append new ones;
+# never renumber.
+MIGRATIONS = [
+    (0, _migrate_base_schema),
+    (1, _migrate_appointment_indexes),
+    (2, _migrate_appointment_fts),
+    (3, _migrate_structured_appointments),
+    (4, _migrate_earnings_index),
+    (5, _migrate_daily_revenue),
+    (6, _migrate_change_tracking),
+    (7, _migrate_appointment_duration),
+    (8, _migrate_availability_rules),
+]
+
+
+def init_db(db_path: str = DB_NAME) -> None:
+    """Bring ``db_path`` up to the latest schema version.
+
+    Applied versions are recorded in ``schema_version``, so once a database is
+    current this is a single lookup no matter how many migrations exist. Each
+    migration runs under the write lock and re-checks the recorded version,
+    so stations starting together apply it exactly once.
+    """
+    with db_connection(db_path) as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                applied_at TEXT NOT NULL
+            )
+            """
+        )
+        current = cur.execute("SELECT COALESCE(MAX(version), -1) FROM schema_version").fetchone()[0]
+
+    for version, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+
+        def _apply(conn, version=version, migrate=migrate):
+            # Another station starting at the same time may have applied it
+            # while this one waited for the write lock
+            cur = conn.cursor()
+            if cur.execute("SELECT COALESCE(MAX(version), -1) FROM schema_version").fetchone()[0] >= version:
+                return
+            migrate(cur)
+            cur.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (?, ?)",
+                (version, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+
+        run_write(_apply, db_path)
+
+
+def table_versions(tables, db_path: str = DB_NAME) -> tuple[int, ...]:
+    """Current version of each of ``tables``, in the order given."""
+    tables = tuple(tables)
+    with db_connection(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT name, version FROM table_versions WHERE name IN ({','.join('?' * len(tables))})",
+            tables,
+        ).fetchall()
+    versions = dict(rows)
+    return tuple(versions.get(t, 0) for t in tables)
+
+
+def watch_changes(widget, callback, poll_ms: int = 1000, db_path: str = DB_NAME) -> None:
+    """Call ``callback()`` on the Tk thread whenever another connection commits to ``db_path``.
+
+    Only ``PRAGMA data_version`` is polled, which costs no disk I/O; writes
+    made through this thread's own connection do not trigger the callback.
+    Polling stops when ``widget`` is destroyed; a callback that raises is
+    reported by Tk and polled again next time.
+    """
+    from tkinter import TclError  # here, so the headless service never needs Tk
+
+    conn = get_connection(db_path)
+    last = conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _poll():
+        nonlocal last
+        try:
+            current = conn.execute("PRAGMA data_version").fetchone()[0]
+            if current != last:
+                last = current
+                callback()
+        finally:
+            # Keep polling even if this refresh failed; Tk reports the error
+            try:
+                if widget.winfo_exists():
+                    widget.after(poll_ms, _poll)
+            except TclError:
+                pass  # Application gone
+
+    widget.after(poll_ms, _poll)
+
+
+def service_label(name: str, price: float) -> str:
+    """How a service is shown and written into notes, e.g. 'ECG - 600 PHP'."""
+    return f"{name} - {price:g} PHP"
+
+
+def get_services(db_path: str = DB_NAME):
+    """Active services as (id, name, price) rows, in list order."""
+    with db_connection(db_path) as conn:
+        return conn.execute("SELECT id, name, price FROM services WHERE is_active = 1 ORDER BY id").fetchall()
 
 
 def get_setting(key: str, default: str | None = None, db_path: str = DB_NAME) -> str | None:
     """Read a system setting from the database."""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT value FROM system_settings WHERE key = ?", (key,))
-        row = cur.fetchone()
-        return row[0] if row is not None else default
-    finally:
-        conn.close()
+    with db_connection(db_path) as conn:
+        row = conn.execute("SELECT value FROM system_settings WHERE key = ?", (key,)).fetchone()
+    return row[0] if row is not None else default
 
 
 def set_setting(key: str, value: str, db_path: str = DB_NAME) -> None:
     """Persist a system setting in the database."""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    try:
-        cur.execute(
+    with db_connection(db_path) as conn:
+        conn.execute(
             "INSERT INTO system_settings (key, value) VALUES (?, ?) "
             "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
             (key, value),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
-def log_activity(username: str | None, role: str | None, action: str, details: str | None = None) -> None:
+def log_activity(username: str | None, role: str | None, action: str, details: str | None = None,
+                 db_path: str = DB_NAME) -> None:
     """Insert a new activity log entry if logging is enabled.
 
     Timestamps are stored as 'YYYY-MM-DD hh:mm:ss AM/PM'.
     """
     
     try:
-        enabled = get_setting("activity_logging_enabled", "1")
+        enabled = get_setting("activity_logging_enabled", "1", db_path)
     except Exception:
         enabled = "1"
     if enabled != "1":
@@ -218,27 +772,99 @@ def log_activity(username: str | None, role: str | None, action: str, details: s
 
     ts = datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")
 
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    try:
-        cur.execute(
+    with db_connection(db_path) as conn:
+        conn.execute(
             "INSERT INTO activity_logs (timestamp, username, role, action, details) VALUES (?, ?, ?, ?, ?)",
             (ts, username, role, action, details),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def get_activity_logs(limit: int = 200, db_path: str = DB_NAME):
     """Return the most recent activity log rows (timestamp, username, role, action, details)."""
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    try:
-        cur.execute(
+    with db_connection(db_path) as conn:
+        return conn.execute(
             "SELECT timestamp, username, role, action, details FROM activity_logs ORDER BY id DESC LIMIT ?",
             (limit,),
-        )
-        return cur.fetchall()
-    finally:
-        conn.close()
+        ).fetchall()
+
+
+# The trigram index cannot look up anything shorter than this
+FTS_MIN_CHARS = 3
+
+# The indexed columns as one string, for words too short for the index
+_SEARCHED_TEXT_SQL = (
+    "(COALESCE(patient_name, '') || ' ' || COALESCE(doctor_name, '') || ' ' || "
+    "COALESCE(barcode, '') || ' ' || COALESCE(notes, ''))"
+)
+
+
+def _fts_query(words: list[str]) -> str:
+    """Turn typed words into an FTS5 query: every one must appear somewhere."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def _like_pattern(text: str) -> str:
+    """``text`` as a LIKE pattern matching it anywhere, with its own % and _ taken literally."""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def search_appointments(columns: str, query: str = "", before_id: int | None = None,
+                        limit: int | None = None, is_paid: bool | None = None, db_path: str = DB_NAME):
+    """Appointments matching ``query``, best match first, or newest first without one.
+
+    ``columns`` is the SELECT list and must start with ``id``. Results are
+    paged by key: pass the id of the last row already shown as ``before_id``
+    to get the next ``limit`` rows.
+
+    Words of 3+ characters are found through ``appointments_fts`` (patient,
+    doctor, barcode and the notes, so contact numbers, addresses and services
+    are searchable) and ordered by (bm25 rank, id); the next page starts after
+    the rank and id of ``before_id``, so no page re-reads the ones before it.
+    Shorter words are too short for the trigram index and are matched with
+    LIKE on the same columns instead; a query made only of them lists the
+    matches newest first. ``limit=None`` returns every match.
+    """
+    where, params = [], []
+    words = query.strip().lower().split()
+    match = _fts_query([word for word in words if len(word) >= FTS_MIN_CHARS])
+    for word in words:
+        if len(word) < FTS_MIN_CHARS:
+            where.append(f"{_SEARCHED_TEXT_SQL} LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(word))
+    if is_paid is not None:
+        where.append("COALESCE(is_paid, 0) = ?")
+        params.append(1 if is_paid else 0)
+
+    with db_connection(db_path) as conn:
+        if match:
+            if before_id is not None:
+                row = conn.execute(
+                    "SELECT rank FROM appointments_fts WHERE appointments_fts MATCH ? AND rowid = ?",
+                    (match, before_id),
+                ).fetchone()
+                if row is None:
+                    # The last row shown no longer matches; the list is reloaded on the next refresh
+                    return []
+                where.append("(m.score > ? OR (m.score = ? AND id < ?))")
+                params.extend((row[0], row[0], before_id))
+            sql = (
+                f"SELECT {columns} FROM appointments "
+                "JOIN (SELECT rowid, rank AS score FROM appointments_fts "
+                "WHERE appointments_fts MATCH ?) m ON m.rowid = appointments.id"
+            )
+            params.insert(0, match)
+            order = " ORDER BY m.score, id DESC"
+        else:
+            if before_id is not None:
+                where.append("id < ?")
+                params.append(before_id)
+            sql = f"SELECT {columns} FROM appointments"
+            order = " ORDER BY id DESC"
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += order
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return conn.execute(sql, params).fetchall()
@@ -1,11 +1,10 @@
-import sqlite3
 import os
 import shutil
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from PIL import Image
 
-from database import DB_NAME
+from database import db_connection
 
 class DoctorProfileWindow(ctk.CTkToplevel):
     def __init__(self, master, username: str, doctor_id: int, anchor_widget=None):
@@ -146,24 +145,23 @@ class DoctorProfileWindow(ctk.CTkToplevel):
         save_button.grid(row=0, column=1, padx=(10, 0), sticky="e")
 
     def _load_data(self):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
+        with db_connection() as conn:
+            cur = conn.cursor()
 
-        cur.execute("SELECT username, password, profile_image_path, full_name FROM users WHERE username = ?", (self.old_username,))
-        row = cur.fetchone()
-        if row:
-            self.username_value = row[0]
-            self.password_value = row[1]
-            self.current_image_path = row[2]
-            self.current_full_name = row[3]
+            cur.execute("SELECT username, password, profile_image_path, full_name FROM users WHERE username = ?", (self.old_username,))
+            row = cur.fetchone()
+            if row:
+                self.username_value = row[0]
+                self.password_value = row[1]
+                self.current_image_path = row[2]
+                self.current_full_name = row[3]
 
-        if self.doctor_id is not None:
-            cur.execute("SELECT specialty FROM doctors WHERE id = ?", (self.doctor_id,))
-            doc_row = cur.fetchone()
-            if doc_row:
-                self.prof_value = doc_row[0]
+            if self.doctor_id is not None:
+                cur.execute("SELECT specialty FROM doctors WHERE id = ?", (self.doctor_id,))
+                doc_row = cur.fetchone()
+                if doc_row:
+                    self.prof_value = doc_row[0]
 
-        conn.close()
 
     def _load_avatar_preview(self, path):
         image = None
@@ -198,77 +196,73 @@ class DoctorProfileWindow(ctk.CTkToplevel):
             messagebox.showwarning("Validation", "Username cannot be empty.")
             return
 
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-
-        # Check unique username
-        if new_username != self.old_username:
-            cur.execute("SELECT COUNT(*) FROM users WHERE username = ?", (new_username,))
-            if cur.fetchone()[0] > 0:
-                conn.close()
-                messagebox.showerror("Error", "Username already exists.")
-                return
-
-        # Prepare image path
-        final_image_path = self.current_image_path
-        if self.selected_image_path:
-            ext = os.path.splitext(self.selected_image_path)[1]
-            new_filename = f"{new_username}_profile{ext}"
-            target_dir = os.path.join(os.getcwd(), "profile_images")
-            if not os.path.exists(target_dir):
-                os.makedirs(target_dir)
-            target_path = os.path.join(target_dir, new_filename)
-            try:
-                shutil.copy2(self.selected_image_path, target_path)
-                final_image_path = target_path
-            except Exception as e:
-                conn.close()
-                messagebox.showerror("Error", f"Failed to save image: {e}")
-                return
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            # Check unique username
+            if new_username != self.old_username:
+                cur.execute("SELECT COUNT(*) FROM users WHERE username = ?", (new_username,))
+                if cur.fetchone()[0] > 0:
+                    messagebox.showerror("Error", "Username already exists.")
+                    return
+
+            # Prepare image path
+            final_image_path = self.current_image_path
+            if self.selected_image_path:
+                ext = os.path.splitext(self.selected_image_path)[1]
+                new_filename = f"{new_username}_profile{ext}"
+                target_dir = os.path.join(os.getcwd(), "profile_images")
+                if not os.path.exists(target_dir):
+                    os.makedirs(target_dir)
+                target_path = os.path.join(target_dir, new_filename)
+                try:
+                    shutil.copy2(self.selected_image_path, target_path)
+                    final_image_path = target_path
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to save image: {e}")
+                    return
         
-        # Use existing password if new one is empty
-        password_to_save = new_password if new_password else self.password_value
-
-        # Update Users table
-        cur.execute(
-            "UPDATE users SET username = ?, password = ?, profile_image_path = ?, full_name = ? WHERE username = ?",
-            (new_username, password_to_save, final_image_path, new_fullname, self.old_username),
-        )
+            # Use existing password if new one is empty
+            password_to_save = new_password if new_password else self.password_value
 
-        # Update Doctors table and Appointments if username changed
-        # We need to find the old doctor name to update appointments correctly
-        old_doctor_name = None
-        if self.doctor_id is not None:
-            cur.execute("SELECT name FROM doctors WHERE id = ?", (self.doctor_id,))
-            row = cur.fetchone()
-            if row:
-                old_doctor_name = row[0]
-            
-            # Update Doctor info
-            # Sync doctor Name with Username (as per established pattern) or Full Name?
-            # Creating uniformity: The system seems to rely on doctor_name in appointments matching the doctor_name in doctors table.
-            # And previously it synced with 'new_username'.
-            # Let's keep syncing with 'new_username' as the primary ID-like Name, 
-            # OR we can switch to using 'new_fullname' if that's preferred.
-            # But changing that logic might break other parts relying on username.
-            # Safest bet: Keep syncing 'name' column in doctors table with 'username' from users table,
-            # unless instructed otherwise.
-            # User asked "change a display name", which we added as 'full_name'.
-            
+            # Update Users table
             cur.execute(
-                "UPDATE doctors SET name = ?, specialty = ? WHERE id = ?",
-                (new_username, new_prof, self.doctor_id),
+                "UPDATE users SET username = ?, password = ?, profile_image_path = ?, full_name = ? WHERE username = ?",
+                (new_username, password_to_save, final_image_path, new_fullname, self.old_username),
             )
+
+            # Update Doctors table and Appointments if username changed
+            # We need to find the old doctor name to update appointments correctly
+            old_doctor_name = None
+            if self.doctor_id is not None:
+                cur.execute("SELECT name FROM doctors WHERE id = ?", (self.doctor_id,))
+                row = cur.fetchone()
+                if row:
+                    old_doctor_name = row[0]
+            
+                # Update Doctor info
+                # Sync doctor Name with Username (as per established pattern) or Full Name?
+                # Creating uniformity: The system seems to rely on doctor_name in appointments matching the doctor_name in doctors table.
+                # And previously it synced with 'new_username'.
+                # Let's keep syncing with 'new_username' as the primary ID-like Name, 
+                # OR we can switch to using 'new_fullname' if that's preferred.
+                # But changing that logic might break other parts relying on username.
+                # Safest bet: Keep syncing 'name' column in doctors table with 'username' from users table,
+                # unless instructed otherwise.
+                # User asked "change a display name", which we added as 'full_name'.
             
-            # If username changed, update all appointments
-            if old_doctor_name and new_username != old_doctor_name:
                 cur.execute(
-                    "UPDATE appointments SET doctor_name = ? WHERE doctor_name = ?",
-                    (new_username, old_doctor_name),
+                    "UPDATE doctors SET name = ?, specialty = ? WHERE id = ?",
+                    (new_username, new_prof, self.doctor_id),
                 )
+            
+                # If username changed, update all appointments
+                if old_doctor_name and new_username != old_doctor_name:
+                    cur.execute(
+                        "UPDATE appointments SET doctor_name = ? WHERE doctor_name = ?",
+                        (new_username, old_doctor_name),
+                    )
 
-        conn.commit()
-        conn.close()
 
         # Update main app avatar immediately
         if hasattr(self.master_ref, "_update_avatar_ui"):
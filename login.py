@@ -1,11 +1,10 @@
 import os
 import sys
-import sqlite3
 import random
 import customtkinter as ctk
 from tkinter import messagebox, PhotoImage
 
-from database import DB_NAME, init_db, get_setting, log_activity
+from database import DB_NAME, init_db, get_setting, log_activity, db_connection
 
 
 class LoginApp(ctk.CTk):
@@ -70,18 +69,15 @@ class LoginApp(ctk.CTk):
     def _fetch_recent_users(self):
         """Fetch up to 3 recent unique logins with their avatars."""
         try:
-            conn = sqlite3.connect(DB_NAME)
-            cur = conn.cursor()
-            # Join with users to get profile image if available
-            cur.execute("""
-                SELECT r.username, u.profile_image_path, u.full_name
-                FROM recent_logins r
-                LEFT JOIN users u ON r.username = u.username
-                ORDER BY r.last_login DESC
-                LIMIT 3
-            """)
-            rows = cur.fetchall() # [(username, path, full_name), ...]
-            conn.close()
+            with db_connection() as conn:
+                # Join with users to get profile image if available
+                rows = conn.execute("""
+                    SELECT r.username, u.profile_image_path, u.full_name
+                    FROM recent_logins r
+                    LEFT JOIN users u ON r.username = u.username
+                    ORDER BY r.last_login DESC
+                    LIMIT 3
+                """).fetchall() # [(username, path, full_name), ...]
             return rows
         except Exception:
             return []
@@ -364,15 +360,12 @@ class LoginApp(ctk.CTk):
         try:
             from datetime import datetime
             ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            conn = sqlite3.connect(DB_NAME)
-            cur = conn.cursor()
-            # Upsert
-            cur.execute("""
-                INSERT INTO recent_logins (username, last_login) VALUES (?, ?)
-                ON CONFLICT(username) DO UPDATE SET last_login = excluded.last_login
-            """, (username, ts))
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                # Upsert
+                conn.execute("""
+                    INSERT INTO recent_logins (username, last_login) VALUES (?, ?)
+                    ON CONFLICT(username) DO UPDATE SET last_login = excluded.last_login
+                """, (username, ts))
         except Exception:
             pass
 
@@ -457,28 +450,25 @@ class LoginApp(ctk.CTk):
                 messagebox.showwarning("Validation", "Please fill in all fields.")
                 return
 
-            import sqlite3
             from datetime import datetime
 
             ts = datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")
 
             try:
-                conn = sqlite3.connect(DB_NAME)
-                cur = conn.cursor()
-
-                # Ensure username exists
-                cur.execute("SELECT 1 FROM users WHERE username = ?", (uname,))
-                if cur.fetchone() is None:
-                    conn.close()
+                with db_connection() as conn:
+                    cur = conn.cursor()
+
+                    # Ensure username exists
+                    cur.execute("SELECT 1 FROM users WHERE username = ?", (uname,))
+                    exists = cur.fetchone() is not None
+                    if exists:
+                        cur.execute(
+                            "INSERT INTO password_reset_requests (username, last_password, requested_at) VALUES (?, ?, ?)",
+                            (uname, last_pwd, ts),
+                        )
+                if not exists:
                     messagebox.showerror("Error", "Username does not exist in the system.")
                     return
-
-                cur.execute(
-                    "INSERT INTO password_reset_requests (username, last_password, requested_at) VALUES (?, ?, ?)",
-                    (uname, last_pwd, ts),
-                )
-                conn.commit()
-                conn.close()
             except Exception as exc:
                 messagebox.showerror("Error", f"Failed to send request: {exc}")
                 return
@@ -609,16 +599,12 @@ class LoginApp(ctk.CTk):
 
     @staticmethod
     def authenticate(username: str, password: str):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-
-        cur.execute(
-            "SELECT role FROM users WHERE username = ? AND password = ?",
-            (username, password),
-        )
-        row = cur.fetchone()
+        with db_connection() as conn:
+            row = conn.execute(
+                "SELECT role FROM users WHERE username = ? AND password = ?",
+                (username, password),
+            ).fetchone()
 
-        conn.close()
         if row is None:
             return None
         return row[0]
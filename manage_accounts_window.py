@@ -3,7 +3,7 @@ import sqlite3
 import customtkinter as ctk
 from tkinter import messagebox
 
-from database import DB_NAME, log_activity
+from database import db_connection, log_activity
 from profile_window import ProfileWindow
 
 
@@ -124,9 +124,8 @@ class ManageAccountsWindow(ctk.CTkToplevel):
         for child in self.users_frame.winfo_children():
             child.destroy()
 
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        try:
+        with db_connection() as conn:
+            cur = conn.cursor()
             cur.execute(
                 """
                 SELECT username, COALESCE(full_name, ''), role
@@ -135,8 +134,6 @@ class ManageAccountsWindow(ctk.CTkToplevel):
                 """
             )
             rows = cur.fetchall()
-        finally:
-            conn.close()
 
         if not rows:
             lbl = ctk.CTkLabel(self.users_frame, text="No users found.")
@@ -186,33 +183,29 @@ class ManageAccountsWindow(ctk.CTkToplevel):
             messagebox.showwarning("Validation", "Role must be 'receptionist', 'doctor', or 'cashier'.")
             return
 
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
         try:
-            cur.execute(
-                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                (username, password, role),
-            )
-
-           
-            if role == "doctor":
+            with db_connection() as conn:
+                cur = conn.cursor()
                 cur.execute(
-                    "SELECT id FROM doctors WHERE name = ?",
-                    (username,),
+                    "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                    (username, password, role),
                 )
-                row = cur.fetchone()
-                if row is None:
+
+           
+                if role == "doctor":
                     cur.execute(
-                        "INSERT INTO doctors (name, specialty, status, notes) VALUES (?, NULL, 'active', NULL)",
+                        "SELECT id FROM doctors WHERE name = ?",
                         (username,),
                     )
-
-            conn.commit()
+                    row = cur.fetchone()
+                    if row is None:
+                        cur.execute(
+                            "INSERT INTO doctors (name, specialty, status, notes) VALUES (?, NULL, 'active', NULL)",
+                            (username,),
+                        )
         except sqlite3.IntegrityError:
             messagebox.showerror("Error", "Username already exists.")
-            conn.close()
             return
-        conn.close()
         messagebox.showinfo("Account", f"{role.capitalize()} account created.")
         try:
             log_activity(self.username, "admin", "create_user", f"Created {role} account '{username}'")
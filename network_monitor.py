@@ -0,0 +1,109 @@
+import queue
+import threading
+import time
+import urllib.request
+
+from database import get_setting
+
+DEFAULT_TARGET = "https://www.google.com"
+
+
+class NetworkMonitor:
+    """Checks connectivity from a background thread so the UI never waits on the network.
+
+    The worker probes ``target`` every ``interval`` seconds and puts
+    ``(latency, error)`` on a queue per subscriber; each window drains its own
+    queue from the Tk thread with ``after()``.
+    """
+
+    def __init__(self, target: str = DEFAULT_TARGET, interval: float = 10.0, timeout: float = 1.5):
+        self.target = target
+        self.interval = interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._queues = []
+        self._latest = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="network-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def probe(self):
+        """One HEAD request to ``target``: ``(latency_seconds, None)`` or ``(None, error)``."""
+        start = time.monotonic()
+        try:
+            req = urllib.request.Request(self.target, method="HEAD")
+            with urllib.request.urlopen(req, timeout=self.timeout):
+                pass
+        except Exception as e:
+            return None, e
+        return time.monotonic() - start, None
+
+    def _run(self):
+        while not self._stop.is_set():
+            result = self.probe()
+            with self._lock:
+                self._latest = result
+                for q in self._queues:
+                    q.put(result)
+            self._stop.wait(self.interval)
+
+    def subscribe(self, widget, callback, poll_ms: int = 250):
+        """Call ``callback(latency, error)`` on the Tk thread after every probe.
+
+        Polling stops and the queue is dropped when ``widget`` is destroyed.
+        The last known result, if any, is delivered straight away.
+        """
+        q = queue.Queue()
+        with self._lock:
+            self._queues.append(q)
+            if self._latest is not None:
+                q.put(self._latest)
+
+        def _unsubscribe(event=None):
+            if event is not None and event.widget is not widget:
+                return
+            with self._lock:
+                if q in self._queues:
+                    self._queues.remove(q)
+
+        def _poll():
+            try:
+                while True:
+                    latency, error = q.get_nowait()
+                    callback(latency, error)
+            except queue.Empty:
+                pass
+            except Exception:
+                _unsubscribe()
+                return
+            try:
+                widget.after(poll_ms, _poll)
+            except Exception:
+                _unsubscribe()
+
+        widget.bind("<Destroy>", _unsubscribe, add="+")
+        self.start()
+        _poll()
+
+
+_monitor = None
+
+
+def get_monitor() -> NetworkMonitor:
+    """The process-wide monitor; its target comes from the ``network_check_url`` setting."""
+    global _monitor
+    if _monitor is None:
+        try:
+            target = get_setting("network_check_url", DEFAULT_TARGET) or DEFAULT_TARGET
+        except Exception:
+            target = DEFAULT_TARGET
+        _monitor = NetworkMonitor(target)
+    return _monitor
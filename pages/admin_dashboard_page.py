@@ -1,11 +1,12 @@
 import customtkinter as ctk
-import sqlite3
-from datetime import datetime, date
+from datetime import datetime
 
-from database import DB_NAME
+from database import db_connection
 
 
 class AdminDashboardPage(ctk.CTkFrame):
+    tables = ("appointments", "doctors", "users")
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -81,9 +82,6 @@ class AdminDashboardPage(ctk.CTkFrame):
 
         self._refresh_data()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
-
     def _create_stat_card(self, parent, column, label, value, fg_color):
         # Modern filled stat card
         card = ctk.CTkFrame(
@@ -114,125 +112,38 @@ class AdminDashboardPage(ctk.CTkFrame):
 
         return value_label
 
-    def _extract_total_from_notes(self, notes: str | None) -> float | None:
-        if not notes:
-            return None
-        raw = notes
-        if "About:" in raw:
-            after = raw.split("About:", 1)[1]
-        else:
-            after = raw
-        digits: list[str] = []
-        token = ""
-        for ch in after:
-            if ch.isdigit() or ch in ",.":
-                token += ch
-            else:
-                if token:
-                    digits.append(token)
-                    token = ""
-        if token:
-            digits.append(token)
-        if not digits:
-            return None
-        candidate = digits[-1].replace(",", "")
-        try:
-            value = float(candidate)
-        except ValueError:
-            return None
-        return value
+    def refresh(self):
+        self._refresh_data()
 
     def _refresh_data(self):
-        conn = self._connect()
-        cur = conn.cursor()
-
-        cur.execute("SELECT COUNT(*) FROM users")
-        total_users = cur.fetchone()[0]
-
-        cur.execute("SELECT COUNT(*) FROM doctors WHERE status = 'active'")
-        total_doctors = cur.fetchone()[0]
-
-        today_str = date.today().strftime("%Y-%m-%d")
-        cur.execute(
-            """
-            SELECT COALESCE(notes, '')
-            FROM appointments
-            WHERE is_paid = 1 AND DATE(schedule) = DATE('now')
-            """
-        )
-        rows_today = cur.fetchall()
-        earnings_today = 0.0
-        for (notes,) in rows_today:
-            total = self._extract_total_from_notes(notes)
-            if total is not None:
-                earnings_today += total
-
-        cur.execute(
-            """
-            SELECT COALESCE(notes, '')
-            FROM appointments
-            WHERE is_paid = 1
-              AND strftime('%Y-%m', schedule) = strftime('%Y-%m', 'now')
-            """
-        )
-        rows_month = cur.fetchall()
-        earnings_month = 0.0
-        for (notes,) in rows_month:
-            total = self._extract_total_from_notes(notes)
-            if total is not None:
-                earnings_month += total
-
-        cur.execute(
-            """
-            SELECT patient_name, doctor_name, schedule, notes, is_paid, is_rescheduled
-            FROM appointments
-            ORDER BY schedule DESC
-            LIMIT 8
-            """
-        )
-        recent_rows = cur.fetchall()
-
-        conn.close()
-
-        # Update cards
-        # Additional aggregate for total appointments
-        total_appt = 0
-        try:
-            conn2 = self._connect()
-            cur2 = conn2.cursor()
-            cur2.execute("SELECT COUNT(*) FROM appointments")
-            total_appt = cur2.fetchone()[0] or 0
-        finally:
-            try:
-                conn2.close()
-            except Exception:
-                pass
-
-        # Additional aggregate for average earnings per appointment
-        avg_earnings = 0.0
-        try:
-            conn2 = self._connect()
-            cur2 = conn2.cursor()
-            cur2.execute(
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            # All six stat cards in one round-trip; earnings come from the daily_revenue rollup
+            cur.execute(
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM users),
+                    (SELECT COUNT(*) FROM doctors WHERE status = 'active'),
+                    (SELECT COUNT(*) FROM appointments),
+                    (SELECT COALESCE(SUM(revenue), 0) FROM daily_revenue
+                      WHERE day = DATE('now')),
+                    (SELECT COALESCE(SUM(revenue), 0) FROM daily_revenue
+                      WHERE day >= DATE('now', 'start of month') AND day < DATE('now', 'start of month', '+1 month')),
+                    (SELECT COALESCE(SUM(revenue) / NULLIF(SUM(tickets), 0), 0) FROM daily_revenue)
                 """
-                SELECT COALESCE(notes, '')
+            )
+            total_users, total_doctors, total_appt, earnings_today, earnings_month, avg_earnings = cur.fetchone()
+
+            cur.execute(
+                """
+                SELECT patient_name, doctor_name, schedule, notes, is_paid, is_rescheduled
                 FROM appointments
-                WHERE is_paid = 1
+                ORDER BY schedule DESC
+                LIMIT 8
                 """
             )
-            rows = cur2.fetchall()
-            totals: list[float] = []
-            for (notes,) in rows:
-                total = self._extract_total_from_notes(notes)
-                if total is not None:
-                    totals.append(total)
-            if totals:
-                avg_earnings = sum(totals) / len(totals)
-        finally:
-            try:
-                conn2.close()
-            except Exception:
-                pass
+            recent_rows = cur.fetchall()
 
         self.card_users.configure(text=str(total_users))
         self.card_doctors.configure(text=str(total_doctors))
@@ -244,19 +155,18 @@ class AdminDashboardPage(ctk.CTkFrame):
         for child in self.analytics_list.winfo_children():
             child.destroy()
 
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT doctor_name, COUNT(*) as c
-            FROM appointments
-            GROUP BY doctor_name
-            ORDER BY c DESC
-            LIMIT 5
-            """
-        )
-        top_doctors = cur.fetchall()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT doctor_name, COUNT(*) as c
+                FROM appointments
+                GROUP BY doctor_name
+                ORDER BY c DESC
+                LIMIT 5
+                """
+            )
+            top_doctors = cur.fetchall()
 
         if not top_doctors:
             empty = ctk.CTkLabel(
@@ -3,10 +3,12 @@ import sqlite3
 import customtkinter as ctk
 from tkinter import messagebox
 
-from database import DB_NAME, log_activity
+from database import db_connection, log_activity
 
 
 class AdminManageAccountsPage(ctk.CTkFrame):
+    tables = ("users", "password_reset_requests")
+
     def __init__(self, master, username: str):
         super().__init__(master, corner_radius=0, fg_color="transparent")
         self.username = username
@@ -120,13 +122,16 @@ class AdminManageAccountsPage(ctk.CTkFrame):
         self.requests_frame.grid(row=0, column=0, sticky="nsew")
         self._refresh_requests_list()
 
+    def refresh(self):
+        self._refresh_users_list()
+        self._refresh_requests_list()
+
     def _refresh_requests_list(self):
         for child in self.requests_frame.winfo_children():
             child.destroy()
 
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        try:
+        with db_connection() as conn:
+            cur = conn.cursor()
             cur.execute("""
                 SELECT r.id, r.username, r.last_password, COALESCE(u.password, ''), r.requested_at
                 FROM password_reset_requests AS r
@@ -134,8 +139,6 @@ class AdminManageAccountsPage(ctk.CTkFrame):
                 ORDER BY r.id DESC
             """)
             rows = cur.fetchall()
-        finally:
-            conn.close()
 
         if not rows:
             ctk.CTkLabel(self.requests_frame, text="No active requests.", font=("Inter", 14), text_color="#94a3b8").pack(pady=40)
@@ -179,14 +182,11 @@ class AdminManageAccountsPage(ctk.CTkFrame):
 
 
     def _clear_request(self, request_id: int):
-        conn = sqlite3.connect(DB_NAME)
         try:
-            conn.execute("DELETE FROM password_reset_requests WHERE id = ?", (request_id,))
-            conn.commit()
+            with db_connection() as conn:
+                conn.execute("DELETE FROM password_reset_requests WHERE id = ?", (request_id,))
         except Exception as e:
             messagebox.showerror("Error", f"Failed: {e}")
-        finally:
-            conn.close()
         self._refresh_requests_list()
 
     def _edit_password_from_request(self, username: str, request_id: int):
@@ -218,17 +218,14 @@ class AdminManageAccountsPage(ctk.CTkFrame):
             new_pwd = pwd_entry.get().strip()
             if not new_pwd: return
             
-            conn = sqlite3.connect(DB_NAME)
             try:
-                conn.execute("UPDATE users SET password = ? WHERE username = ?", (new_pwd, username))
-                conn.commit()
+                with db_connection() as conn:
+                    conn.execute("UPDATE users SET password = ? WHERE username = ?", (new_pwd, username))
                 self._clear_request(request_id)
                 messagebox.showinfo("Success", "Password updated.")
                 win.destroy()
             except Exception as e:
                 messagebox.showerror("Error", str(e))
-            finally:
-                conn.close()
 
         ctk.CTkButton(win, text="Save Password", command=_save, width=280, fg_color="#3b82f6", hover_color="#2563eb", font=("Inter", 13, "bold")).pack()
 
@@ -242,18 +239,17 @@ class AdminManageAccountsPage(ctk.CTkFrame):
             messagebox.showwarning("Validation", "Username and password are required.")
             return
 
-        conn = sqlite3.connect(DB_NAME)
         try:
-            cur = conn.cursor()
-            cur.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", (username, password, role))
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", (username, password, role))
             
-            if role == "doctor":
-                # Check if doctor exists, else add
-                cur.execute("SELECT id FROM doctors WHERE name = ?", (username,))
-                if not cur.fetchone():
-                    cur.execute("INSERT INTO doctors (name, status) VALUES (?, 'active')", (username,))
+                if role == "doctor":
+                    # Check if doctor exists, else add
+                    cur.execute("SELECT id FROM doctors WHERE name = ?", (username,))
+                    if not cur.fetchone():
+                        cur.execute("INSERT INTO doctors (name, status) VALUES (?, 'active')", (username,))
             
-            conn.commit()
             messagebox.showinfo("Success", f"{role.capitalize()} account created.")
             try: log_activity(self.username, "admin", "create_user", f"Created {role} '{username}'")
             except: pass
@@ -263,20 +259,15 @@ class AdminManageAccountsPage(ctk.CTkFrame):
             
         except sqlite3.IntegrityError:
             messagebox.showerror("Error", "Username already exists.")
-        finally:
-            conn.close()
 
     def _refresh_users_list(self):
         for child in self.users_frame.winfo_children():
             child.destroy()
 
-        conn = sqlite3.connect(DB_NAME)
-        try:
+        with db_connection() as conn:
             cur = conn.cursor()
             cur.execute("SELECT username, COALESCE(full_name, ''), role FROM users ORDER BY role, username")
             rows = cur.fetchall()
-        finally:
-            conn.close()
 
         if not rows:
             ctk.CTkLabel(self.users_frame, text="No accounts found.", font=("Inter", 14), text_color="#94a3b8").pack(pady=40)
@@ -326,11 +317,10 @@ class AdminManageAccountsPage(ctk.CTkFrame):
 
 
     def _open_edit_user(self, username: str):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        cur.execute("SELECT username, COALESCE(full_name, ''), password, role FROM users WHERE username = ?", (username,))
-        row = cur.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT username, COALESCE(full_name, ''), password, role FROM users WHERE username = ?", (username,))
+            row = cur.fetchone()
         
         if not row: return
         uname, full_name, pwd, role = row
@@ -365,17 +355,14 @@ class AdminManageAccountsPage(ctk.CTkFrame):
             p = pwd_e.get().strip()
             p_final = p if p else pwd
             
-            conn = sqlite3.connect(DB_NAME)
             try:
-                conn.execute("UPDATE users SET full_name=?, password=? WHERE username=?", (n, p_final, uname))
-                conn.commit()
+                with db_connection() as conn:
+                    conn.execute("UPDATE users SET full_name=?, password=? WHERE username=?", (n, p_final, uname))
                 messagebox.showinfo("Success", "Account updated.")
                 win.destroy()
                 self._refresh_users_list()
             except Exception as e:
                 messagebox.showerror("Error", str(e))
-            finally:
-                conn.close()
 
         ctk.CTkButton(win, text="Save Changes", width=300, height=36, fg_color="#3b82f6", hover_color="#2563eb", font=("Inter", 13, "bold"), command=_save).pack(pady=20)
 
@@ -387,17 +374,14 @@ class AdminManageAccountsPage(ctk.CTkFrame):
         if not messagebox.askyesno("Confirm", f"Delete account '{username}'?"):
              return
              
-        conn = sqlite3.connect(DB_NAME)
         try:
-            cur = conn.cursor()
-            cur.execute("DELETE FROM users WHERE username=?", (username,))
-            # Handle doctor linked logic if needed
-            cur.execute("UPDATE doctors SET status='inactive' WHERE name=?", (username,))
-            conn.commit()
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("DELETE FROM users WHERE username=?", (username,))
+                # Handle doctor linked logic if needed
+                cur.execute("UPDATE doctors SET status='inactive' WHERE name=?", (username,))
             messagebox.showinfo("Deleted", "Account deleted.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
-        finally:
-            conn.close()
         
         self._refresh_users_list()
@@ -1,13 +1,15 @@
 import customtkinter as ctk
-import sqlite3
 import csv
 from datetime import datetime
 
 from tkinter import filedialog, messagebox, Menu
-from database import DB_NAME, log_activity
+from database import db_connection, log_activity, search_appointments
+from virtual_table import VirtualTable
 
 
 class AdminRecordsPage(ctk.CTkFrame):
+    tables = ("appointments",)
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -48,7 +50,7 @@ class AdminRecordsPage(ctk.CTkFrame):
 
         self.search_entry = ctk.CTkEntry(
             actions_frame,
-            placeholder_text="Search patient or doctor...",
+            placeholder_text="Search patient, phone, service...",
             width=200,
             height=36,
             corner_radius=8,
@@ -140,11 +142,9 @@ class AdminRecordsPage(ctk.CTkFrame):
         # div.grid(row=0, column=0, sticky="ew", pady=(40, 0), padx=20) 
         # Using pady to push it below the header row labels roughly
 
-        self.table_frame = ctk.CTkScrollableFrame(list_container, corner_radius=0, fg_color="transparent")
+        self.table_frame = VirtualTable(list_container, self._make_row, self._bind_row, row_height=60)
         self.table_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=(10, 10))
-        self.table_frame.grid_columnconfigure(0, weight=1)
 
-        self.records = []
         self.reload_records()
 
         self.search_entry.bind("<Return>", lambda event: self.apply_filters())
@@ -154,117 +154,109 @@ class AdminRecordsPage(ctk.CTkFrame):
         self.apply_filters()
 
     def reload_records(self):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
+        self.apply_filters()
 
-        cur.execute(
-            "SELECT id, patient_name, doctor_name, schedule, notes, COALESCE(is_paid, 0), COALESCE(amount_paid, 0) FROM appointments ORDER BY id DESC"
+    def get_filtered_records(self, before_id=None, limit=None):
+        return search_appointments(
+            "id, patient_name, doctor_name, schedule, notes, COALESCE(is_paid, 0), COALESCE(amount_paid, 0)",
+            self.search_entry.get(),
+            before_id=before_id,
+            limit=limit,
         )
-        self.records = cur.fetchall()
 
-        conn.close()
-        self.apply_filters()
+    def apply_filters(self, keep_position: bool = False):
+        self.table_frame.set_source(lambda last, limit: self.get_filtered_records(last[0] if last else None, limit), keep_position=keep_position)
 
-    def get_filtered_records(self):
-        query = self.search_entry.get().strip().lower()
+    def refresh(self):
+        self.apply_filters(keep_position=True)
 
-        filtered = []
-        for rec in self.records:
-            rid, patient, doctor, schedule, notes, is_paid, amount_paid = rec
-            haystack = f"{patient} {doctor}".lower()
-            if query and query not in haystack:
-                continue
-            filtered.append(rec)
-        return filtered
+    def _make_row(self, parent):
+        # Use a card-like row container for distinct look
+        row_frame = ctk.CTkFrame(
+            parent,
+            corner_radius=8,
+            fg_color="#334155", # Slate 700 (Card background)
+            border_width=1,
+            border_color="#475569", # Slate 600 (Border)
+            height=50
+        )
+        row_frame.grid_rowconfigure(0, weight=1)
+
+        # Grid layout matching the header EXACTLY
+        row_frame.grid_columnconfigure(0, weight=0, minsize=60)  # ID
+        row_frame.grid_columnconfigure((1, 2, 3), weight=1, uniform="data_cols") # Patient, Doctor, Schedule
+        row_frame.grid_columnconfigure(4, weight=0, minsize=100) # Status
+        row_frame.grid_columnconfigure(5, weight=0, minsize=100) # Paid
+        row_frame.grid_columnconfigure(6, weight=0, minsize=140) # Actions
+        row_frame.record = None
+
+        # 1. ID
+        row_frame.id_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 12), text_color="#cbd5e1", anchor="w")
+        row_frame.id_label.grid(row=0, column=0, sticky="ew", padx=10)
+
+        # 2. Patient
+        row_frame.patient_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 13, "bold"), text_color="white", anchor="w")
+        row_frame.patient_label.grid(row=0, column=1, sticky="ew", padx=10)
+
+        # 3. Doctor
+        row_frame.doctor_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 13), text_color="#94a3b8", anchor="w")
+        row_frame.doctor_label.grid(row=0, column=2, sticky="ew", padx=10)
+
+        # 4. Schedule
+        row_frame.schedule_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 12), text_color="#cbd5e1", anchor="w")
+        row_frame.schedule_label.grid(row=0, column=3, sticky="ew", padx=10)
+
+        # 5. Status
+        row_frame.status_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 11, "bold"), anchor="w")
+        row_frame.status_label.grid(row=0, column=4, sticky="ew", padx=10)
+
+        # 6. Amount
+        row_frame.amount_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 12), text_color="white", anchor="w")
+        row_frame.amount_label.grid(row=0, column=5, sticky="ew", padx=10)
+
+        # 7. Actions
+        actions_panel = ctk.CTkFrame(row_frame, fg_color="transparent")
+        actions_panel.grid(row=0, column=6, sticky="e", padx=10)
+
+        # Helper for icon-like small buttons
+        def _action_btn(txt, color, cmd):
+            return ctk.CTkButton(
+                actions_panel,
+                text=txt,
+                width=40,
+                height=24,
+                font=("Inter", 11),
+                fg_color="transparent",
+                border_width=1,
+                border_color=color,
+                text_color=color,
+                hover_color=("#1e293b", "#0f172a"),
+                command=cmd
+            )
 
-    def apply_filters(self):
-        for child in self.table_frame.winfo_children():
-            child.destroy()
+        view_btn = _action_btn("View", "#3b82f6", lambda: self._view_details(row_frame.record))
+        view_btn.pack(side="left", padx=2)
 
-        filtered = self.get_filtered_records()
+        edit_btn = _action_btn("Edit", "#10b981", lambda: self._edit_record(row_frame.record))
+        edit_btn.pack(side="left", padx=2)
 
-        for row_index, rec in enumerate(filtered):
-            rid, patient, doctor, schedule, notes, is_paid, amount_paid = rec
-            
-            # Use a card-like row container for distinct look
-            row_frame = ctk.CTkFrame(
-                self.table_frame, 
-                corner_radius=8,
-                fg_color="#334155", # Slate 700 (Card background)
-                border_width=1,
-                border_color="#475569", # Slate 600 (Border)
-                height=50
-            ) 
-            row_frame.grid(row=row_index, column=0, sticky="ew", pady=5, padx=5)
-            
-            # Grid layout matching the header EXACTLY
-            row_frame.grid_columnconfigure(0, weight=0, minsize=60)  # ID
-            row_frame.grid_columnconfigure((1, 2, 3), weight=1, uniform="data_cols") # Patient, Doctor, Schedule
-            row_frame.grid_columnconfigure(4, weight=0, minsize=100) # Status
-            row_frame.grid_columnconfigure(5, weight=0, minsize=100) # Paid
-            row_frame.grid_columnconfigure(6, weight=0, minsize=140) # Actions
-
-            # 1. ID
-            ctk.CTkLabel(row_frame, text=str(rid), font=("Inter", 12), text_color="#cbd5e1", anchor="w").grid(row=0, column=0, sticky="ew", padx=10, pady=10)
-
-            # 2. Patient
-            ctk.CTkLabel(row_frame, text=patient, font=("Inter", 13, "bold"), text_color="white", anchor="w").grid(row=0, column=1, sticky="ew", padx=10)
-
-            # 3. Doctor
-            ctk.CTkLabel(row_frame, text=f"Dr. {doctor}", font=("Inter", 13), text_color="#94a3b8", anchor="w").grid(row=0, column=2, sticky="ew", padx=10)
-
-            # 4. Schedule
-            pretty_schedule = self._format_schedule(schedule)
-            ctk.CTkLabel(row_frame, text=pretty_schedule, font=("Inter", 12), text_color="#cbd5e1", anchor="w").grid(row=0, column=3, sticky="ew", padx=10)
-
-            # 5. Status
-            status_text = "PAID" if is_paid else "UNPAID"
-            status_color = "#10b981" if is_paid else "#ef4444" 
-            ctk.CTkLabel(row_frame, text=status_text, font=("Inter", 11, "bold"), text_color=status_color, anchor="w").grid(row=0, column=4, sticky="ew", padx=10)
-
-            # 6. Amount
-            amount_text = f"₱{amount_paid:,.2f}" if amount_paid else "-"
-            ctk.CTkLabel(row_frame, text=amount_text, font=("Inter", 12), text_color="white", anchor="w").grid(row=0, column=5, sticky="ew", padx=10)
-
-            # 7. Actions
-            actions_panel = ctk.CTkFrame(row_frame, fg_color="transparent")
-            actions_panel.grid(row=0, column=6, sticky="e", padx=10)
-
-            # Helper for icon-like small buttons
-            def _action_btn(txt, color, cmd):
-                return ctk.CTkButton(
-                    actions_panel,
-                    text=txt,
-                    width=40,
-                    height=24,
-                    font=("Inter", 11),
-                    fg_color="transparent",
-                    border_width=1,
-                    border_color=color,
-                    text_color=color,
-                    hover_color=("#1e293b", "#0f172a"), 
-                    command=cmd
-                )
-
-            view_btn = _action_btn("View", "#3b82f6", lambda r=rec: self._view_details(r))
-            view_btn.pack(side="left", padx=2)
-
-            edit_btn = _action_btn("Edit", "#10b981", lambda r=rec: self._edit_record(r))
-            edit_btn.pack(side="left", padx=2)
-
-            del_btn = _action_btn("Del", "#ef4444", lambda r=rec: self._delete_record(r))
-            del_btn.pack(side="left", padx=2)
-
-            # Separator line at bottom of row
-            sep = ctk.CTkFrame(self.table_frame, height=1, fg_color="#334155")
-            sep.grid(row=row_index, column=0, sticky="ew", pady=(45, 0)) 
-            # Place sep "behind" or "below" row_frame by adjusting row span or using a container?
-            # Easiest way in a grid is just to make the row frame taller or put sep in next grid row.
-            # But let's simplify: Just add a border to the generic frame if we want separators.
-            # Actually, let's skip separators for a cleaner look if spacing is good, or put them inside row_frame.
-            sep_inner = ctk.CTkFrame(row_frame, height=1, fg_color="#334155")
-            sep_inner.place(relx=0, rely=0.95, relwidth=1.0, anchor="sw")
+        del_btn = _action_btn("Del", "#ef4444", lambda: self._delete_record(row_frame.record))
+        del_btn.pack(side="left", padx=2)
 
+        return row_frame
+
+    def _bind_row(self, row_frame, rec):
+        rid, patient, doctor, schedule, notes, is_paid, amount_paid = rec
+        row_frame.record = rec
+        row_frame.id_label.configure(text=str(rid))
+        row_frame.patient_label.configure(text=patient)
+        row_frame.doctor_label.configure(text=f"Dr. {doctor}")
+        row_frame.schedule_label.configure(text=self._format_schedule(schedule))
+        row_frame.status_label.configure(
+            text="PAID" if is_paid else "UNPAID",
+            text_color="#10b981" if is_paid else "#ef4444",
+        )
+        row_frame.amount_label.configure(text=f"₱{amount_paid:,.2f}" if amount_paid else "-")
 
     def _show_row_menu(self, event, record):
         menu = Menu(self, tearoff=0)
@@ -385,14 +377,10 @@ class AdminRecordsPage(ctk.CTkFrame):
                 messagebox.showwarning("Error", "Missing fields")
                 return
 
-            conn = sqlite3.connect(DB_NAME)
-            try:
+            with db_connection() as conn:
                 cur = conn.cursor()
                 cur.execute("UPDATE appointments SET patient_name=?, doctor_name=?, schedule=?, notes=? WHERE id=?", 
                             (new_p, new_d, new_s, new_n, rid))
-                conn.commit()
-            finally:
-                conn.close()
             
             # Log
             try:
@@ -410,12 +398,8 @@ class AdminRecordsPage(ctk.CTkFrame):
         if not messagebox.askyesno("Confirm Delete", f"Delete appointment #{rid}?"):
             return
 
-        conn = sqlite3.connect(DB_NAME)
-        try:
+        with db_connection() as conn:
             conn.execute("DELETE FROM appointments WHERE id = ?", (rid,))
-            conn.commit()
-        finally:
-            conn.close()
         
         self.reload_records()
         try:
@@ -3,9 +3,12 @@ from datetime import datetime
 from tkinter import messagebox
 
 from database import get_setting, set_setting, get_activity_logs, log_activity
+from network_monitor import DEFAULT_TARGET, get_monitor
 
 
 class AdminSettingsPage(ctk.CTkFrame):
+    tables = ("activity_logs",)
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -85,6 +88,10 @@ class AdminSettingsPage(ctk.CTkFrame):
         self.login_popup_switch = ctk.CTkSwitch(sys_content, text="Show Login Success Popup", font=("Inter", 13), text_color="#e2e8f0", progress_color="#10b981")
         self.login_popup_switch.pack(pady=10, padx=40, anchor="w")
 
+        ctk.CTkLabel(sys_content, text="Connectivity Check URL", font=("Inter", 13), text_color="#e2e8f0").pack(pady=(10, 4), padx=40, anchor="w")
+        self.network_url_entry = ctk.CTkEntry(sys_content, width=280, height=34, font=("Inter", 13), fg_color="#1e293b", border_color="#475569", text_color="white")
+        self.network_url_entry.pack(pady=(0, 10), padx=40, anchor="w")
+
         ctk.CTkButton(sys_content, text="Save Changes", width=200, height=40, font=("Inter", 13, "bold"), fg_color="#3b82f6", hover_color="#2563eb", command=self._save_settings).pack(pady=(30, 20), padx=40)
 
 
@@ -142,6 +149,11 @@ class AdminSettingsPage(ctk.CTkFrame):
         self.logs_frame.grid(row=0, column=0, sticky="nsew")
         self._reload_logs()
 
+    def refresh(self):
+        # Keep unsaved edits on the settings tab; only the log list goes stale
+        if self.logs_frame.winfo_manager():
+            self._reload_logs()
+
     def _load_settings(self):
         """Load current system settings into the UI."""
         logging_enabled = get_setting("activity_logging_enabled", "1") == "1"
@@ -150,10 +162,17 @@ class AdminSettingsPage(ctk.CTkFrame):
         self.logging_switch.select() if logging_enabled else self.logging_switch.deselect()
         self.login_popup_switch.select() if show_popup else self.login_popup_switch.deselect()
 
+        self.network_url_entry.delete(0, "end")
+        self.network_url_entry.insert(0, get_setting("network_check_url", DEFAULT_TARGET) or DEFAULT_TARGET)
+
     def _save_settings(self):
         """Persist system settings from the UI to the database."""
         set_setting("activity_logging_enabled", "1" if self.logging_switch.get() else "0")
         set_setting("show_login_success_popup", "1" if self.login_popup_switch.get() else "0")
+
+        url = self.network_url_entry.get().strip() or DEFAULT_TARGET
+        set_setting("network_check_url", url)
+        get_monitor().target = url
         
         try:
             top = self.winfo_toplevel()
@@ -1,16 +1,18 @@
 import customtkinter as ctk
-import sqlite3
 from datetime import datetime
 import os
 
 from tkinter import messagebox
 
-from database import DB_NAME, log_activity
+from database import DB_NAME, db_connection, log_activity, run_write
+from receipt_queue import get_receipt_queue
 
 
 class CashierPOSPage(ctk.CTkFrame):
     """Simple POS interface for cashiers: verify APPT barcode and mark as paid."""
 
+    tables = ("appointments",)
+
     def __init__(self, master):
         super().__init__(master, corner_radius=10, fg_color="transparent")
 
@@ -222,62 +224,17 @@ class CashierPOSPage(ctk.CTkFrame):
 
         self.current_record = None
 
-        # Prices
-        self.service_prices = {
-            "General Consultation - 400 PHP": 400.0,
-            "Pediatrics Consultation - 450 PHP": 450.0,
-            "Internal Medicine - 500 PHP": 500.0,
-            "Cardiology Consultation - 800 PHP": 800.0,
-            "OB-GYN Consultation - 700 PHP": 700.0,
-            "Dermatology Consultation - 600 PHP": 600.0,
-            "ENT Consultation - 550 PHP": 550.0,
-            "Orthopedic Consultation - 750 PHP": 750.0,
-            "Ophthalmology Consultation - 500 PHP": 500.0,
-            "Dental Consultation - 350 PHP": 350.0,
-            "CBC (Complete Blood Count) - 250 PHP": 250.0,
-            "Urinalysis - 150 PHP": 150.0,
-            "Stool Examination - 150 PHP": 150.0,
-            "Fasting Blood Sugar (FBS) - 200 PHP": 200.0,
-            "HbA1c - 800 PHP": 800.0,
-            "Lipid Profile - 700 PHP": 700.0,
-            "Creatinine Test - 300 PHP": 300.0,
-            "BUN (Blood Urea Nitrogen) - 250 PHP": 250.0,
-            "Liver Function Test (LFT) - 500 PHP": 500.0,
-            "TSH / Thyroid Test - 700 PHP": 700.0,
-            "Chest X-Ray (PA View) - 650 PHP": 650.0,
-            "Lumbar X-Ray - 800 PHP": 800.0,
-            "Ultrasound   Whole Abdomen - 1000 PHP": 1000.0,
-            "Ultrasound   Pelvic / OB - 900 PHP": 900.0,
-            "Ultrasound   Thyroid - 800 PHP": 800.0,
-            "2D Echo - 2500 PHP": 2500.0,
-            "ECG - 600 PHP": 600.0,
-            "CT Scan (Plain) - 6000 PHP": 6000.0,
-            "MRI (Plain) - 10000 PHP": 10000.0,
-            "Mammogram - 2000 PHP": 2000.0,
-            "Wound Dressing - 300 PHP": 300.0,
-            "Nebulization - 200 PHP": 200.0,
-            "Injection Service - 200 PHP": 200.0,
-            "Suturing (small wound) - 1000 PHP": 1000.0,
-            "Ear Cleaning - 400 PHP": 400.0,
-            "Incision and Drainage - 800 PHP": 800.0,
-            "ECG with Interpretation - 800 PHP": 800.0,
-            "Cast / Splint Application - 1000 PHP": 1000.0,
-            "Pap Smear - 500 PHP": 500.0,
-            "Pregnancy Test (Urine) - 200 PHP": 200.0,
-            "Medical Certificate - 250 PHP": 250.0,
-            "Vital Signs Check - 100 PHP": 100.0,
-            "ECG Print Request - 150 PHP": 150.0,
-            "X-Ray CD Copy - 150 PHP": 150.0,
-            "Laboratory Results Printing - 100 PHP": 100.0,
-            "Doctor Follow-Up Consultation - 300 PHP": 300.0,
-            "Teleconsultation - 400 PHP": 400.0,
-            "Nutritional Counseling - 500 PHP": 500.0,
-            "Family Planning Consultation - 400 PHP": 400.0,
-            "Vaccination Service (Service Fee) - 400 PHP": 400.0,
-        }
-
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
+    def refresh(self):
+        # Another station may have settled the looked-up appointment meanwhile
+        if self.current_record is None:
+            return
+        with db_connection() as conn:
+            row = conn.execute("SELECT COALESCE(is_paid, 0) FROM appointments WHERE id = ?", (self.current_record[0],)).fetchone()
+        if row is None:
+            self._clear()
+            return
+        self.current_record = self.current_record[:6] + (row[0],) + self.current_record[7:]
+        self.detail_labels["paid"].configure(text="Yes" if row[0] else "No")
 
     def _clear(self):
         self.barcode_entry.delete(0, "end")
@@ -294,20 +251,19 @@ class CashierPOSPage(ctk.CTkFrame):
             messagebox.showwarning("POS", "Please enter or scan a barcode.")
             return
 
-        conn = self._connect()
-        cur = conn.cursor()
-        try:
+        with db_connection() as conn:
+            cur = conn.cursor()
             cur.execute(
                 """
-                SELECT id, patient_name, doctor_name, schedule, COALESCE(notes, ''), barcode, COALESCE(is_paid, 0)
-                FROM appointments
-                WHERE barcode = ?
+                SELECT a.id, a.patient_name, a.doctor_name, a.schedule, COALESCE(a.notes, ''), a.barcode,
+                       COALESCE(a.is_paid, 0), a.price, s.name
+                FROM appointments a
+                LEFT JOIN services s ON s.id = a.service_id
+                WHERE a.barcode = ?
                 """,
                 (code,),
             )
             row = cur.fetchone()
-        finally:
-            conn.close()
 
         if row is None:
             messagebox.showerror("POS", "No appointment found for that barcode.")
@@ -315,7 +271,7 @@ class CashierPOSPage(ctk.CTkFrame):
             self.barcode_entry.insert(0, code)
             return
 
-        rid, patient, doctor, schedule, notes, barcode, is_paid = row
+        rid, patient, doctor, schedule, notes, barcode, is_paid, price, service_name = row
         self.current_record = row
 
         # Fill detail labels
@@ -332,8 +288,7 @@ class CashierPOSPage(ctk.CTkFrame):
         self.detail_labels["notes"].configure(text=notes or "-")
         self.detail_labels["paid"].configure(text="Yes" if is_paid else "No")
 
-        # Auto-compute total amount based on the service encoded in notes
-        price = self._extract_price_from_notes(notes)
+        # Total amount is the price recorded at booking
         self.amount_entry.delete(0, "end")
         if price is not None:
             self.amount_entry.insert(0, f"{price:.2f}")
@@ -358,33 +313,6 @@ class CashierPOSPage(ctk.CTkFrame):
         else:
             self.change_label.configure(text="Change: -")
 
-    def _extract_price_from_notes(self, notes: str | None) -> float | None:
-        if not notes:
-            return None
-
-        about_value = None
-        parts = [p.strip() for p in notes.split("|")]
-        for part in parts:
-            if part.startswith("About:"):
-                about_value = part[len("About:") :].strip()
-                break
-
-        if not about_value:
-            return None
-
-        if about_value in self.service_prices:
-            return self.service_prices[about_value]
-
-        import re
-        m = re.search(r"(\d[\d,]*)\s*PHP", about_value)
-        if not m:
-            return None
-        raw = m.group(1).replace(",", "")
-        try:
-            return float(raw)
-        except ValueError:
-            return None
-
     def _confirm_payment(self):
         if self.current_record is None:
             messagebox.showwarning("POS", "Verify a barcode first.")
@@ -403,7 +331,7 @@ class CashierPOSPage(ctk.CTkFrame):
 
         change = paid - total
         
-        rid, patient, doctor, schedule, notes, barcode, is_paid = self.current_record
+        rid, patient, doctor, schedule, notes, barcode, is_paid, price, service_name = self.current_record
 
         # Review Modal (Themed)
         review = ctk.CTkToplevel(self)
@@ -467,16 +395,16 @@ class CashierPOSPage(ctk.CTkFrame):
         ctk.CTkButton(btns, text="Cancel", fg_color="transparent", border_width=1, border_color="#f59e0b", text_color="#f59e0b", hover_color="#334155", width=120, command=review.destroy).pack(side="left", expand=True)
         
         def _ok():
-            conn = self._connect()
-            cur = conn.cursor()
-            try:
-                cur.execute(
-                    "UPDATE appointments SET is_paid = 1, amount_paid = ? WHERE id = ?",
-                    (paid, rid),
-                )
-                conn.commit()
-            finally:
-                conn.close()
+            # Only settle it if the paid flag is still what this station looked up
+            updated = run_write(lambda conn: conn.execute(
+                "UPDATE appointments SET is_paid = 1, amount_paid = ? WHERE id = ? AND COALESCE(is_paid, 0) = ?",
+                (paid, rid, is_paid),
+            ).rowcount)
+            if not updated:
+                review.destroy()
+                messagebox.showwarning("POS", "This appointment was just settled at another station.")
+                self._lookup()
+                return
 
             if "paid" in self.detail_labels:
                 self.detail_labels["paid"].configure(text="Yes")
@@ -491,14 +419,6 @@ class CashierPOSPage(ctk.CTkFrame):
             filename = f"receipt_{safe_barcode}_{ts}.bmp"
             filepath = os.path.join(receipts_dir, filename)
 
-            service_name = "Medical Services"
-            if notes:
-                parts = [p.strip() for p in notes.split("|")]
-                for part in parts:
-                    if part.startswith("About:"):
-                        service_name = part[len("About:") :].strip()
-                        break
-            
             lines = [
                 "CASHIER INVOICE",
                 f"Date/Time: {datetime.now().strftime('%Y-%m-%d %I:%M:%S %p')}",
@@ -509,7 +429,7 @@ class CashierPOSPage(ctk.CTkFrame):
                 f"Schedule:  {st}",
                 "---",
                 "PARTICULARS",
-                f"{service_name}",
+                f"{service_name or 'Medical Services'}",
                 "---",
                 f"Total Amount:    ₱{total:,.2f}",
                 f"Payment Made:    ₱{paid:,.2f}",
@@ -518,15 +438,17 @@ class CashierPOSPage(ctk.CTkFrame):
                 "Thank you for trusting Medisked!",
             ]
 
-            _write_receipt_image(filepath, lines)
+            # The receipt is rendered on the receipt queue's worker; the counter is free for the next scan now
+            review.destroy()
+            self._clear()
+            self.barcode_entry.focus_set()
 
-            # Success Popup
+            # Success Popup (not modal, closes itself)
             printing = ctk.CTkToplevel(self)
             printing.title("")
             printing.geometry("300x150")
             printing.configure(fg_color="#0f172a")
             printing.transient(self)
-            printing.grab_set()
             
             printing.update_idletasks()
             mx = self.winfo_rootx() + (self.winfo_width() - 300) // 2
@@ -534,14 +456,18 @@ class CashierPOSPage(ctk.CTkFrame):
             printing.geometry(f"+{mx}+{my}")
 
             ctk.CTkLabel(printing, text="✅ Payment Successful", font=("Inter", 18, "bold"), text_color="#10b981").pack(expand=True)
-            ctk.CTkLabel(printing, text="Receipt Saved.", font=("Inter", 12), text_color="#94a3b8").pack(pady=(0, 20))
-            
-            def _finish():
-                printing.destroy()
-                review.destroy()
-                self._clear()
-
-            printing.after(1500, _finish)
+            receipt_label = ctk.CTkLabel(printing, text="Printing receipt...", font=("Inter", 12), text_color="#94a3b8")
+            receipt_label.pack(pady=(0, 20))
+            printing.after(1500, printing.destroy)
+
+            def _printed(path, error):
+                if error is not None:
+                    messagebox.showwarning("POS", f"Payment saved, but the receipt for {barcode or 'this appointment'} could not be written:\n{error}")
+                    return
+                try: receipt_label.configure(text="Receipt Saved.")
+                except: pass
+
+            get_receipt_queue().submit(_write_receipt_image, filepath, lines, widget=self, on_done=_printed)
             
             # Log
             try:
@@ -1,14 +1,16 @@
 import customtkinter as ctk
-import sqlite3
 from datetime import datetime
 
 from tkinter import messagebox
-from database import DB_NAME
+from database import search_appointments
+from virtual_table import VirtualTable
 
 
 class CashierRecordsPage(ctk.CTkFrame):
     """Cashier view of appointment/payment records (view-only)."""
 
+    tables = ("appointments",)
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -47,7 +49,7 @@ class CashierRecordsPage(ctk.CTkFrame):
 
         self.search_entry = ctk.CTkEntry(
             controls_frame,
-            placeholder_text="Search patient or doctor...",
+            placeholder_text="Search patient, phone, service...",
             width=200,
             height=36,
             font=("Inter", 13),
@@ -118,11 +120,9 @@ class CashierRecordsPage(ctk.CTkFrame):
         _hlabel(2, "STATUS")
         _hlabel(3, "ACTIONS", "e")
 
-        self.table_frame = ctk.CTkScrollableFrame(container, corner_radius=0, fg_color="transparent")
+        self.table_frame = VirtualTable(container, self._make_row, self._bind_row, row_height=80, row_padx=0)
         self.table_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=5)
-        self.table_frame.grid_columnconfigure(0, weight=1)
 
-        self.records = []
         self.reload_records()
 
     def _make_filter_btn(self, parent, text, mode):
@@ -153,132 +153,120 @@ class CashierRecordsPage(ctk.CTkFrame):
                 btn.configure(fg_color=inactive_fg, text_color=inactive_text)
 
     def reload_records(self):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id, patient_name, doctor_name, schedule, COALESCE(amount_paid, 0), COALESCE(is_paid, 0), barcode, notes FROM appointments ORDER BY id DESC LIMIT 50"
-        )
-        self.records = cur.fetchall()
-        conn.close()
         self.apply_filters()
         self._update_filter_visuals()
 
-    def clear_table(self):
-        for child in self.table_frame.winfo_children():
-            child.destroy()
-
-    def get_filtered_records(self):
-        query = self.search_entry.get().strip().lower()
-        result = []
-        for rec in self.records:
-            rid, patient, doctor, schedule, amount_paid, is_paid, barcode, notes = rec
-            haystack = f"{patient} {doctor} {barcode or ''}".lower()
-            if query and query not in haystack:
-                continue
-            if self.status_filter == "paid" and not is_paid:
-                continue
-            if self.status_filter == "unpaid" and is_paid:
-                continue
-            result.append(rec)
-        return result
-
-    def apply_filters(self):
-        self.clear_table()
-        filtered = self.get_filtered_records()
-
-        if not filtered:
-            ctk.CTkLabel(
-                self.table_frame,
-                text="No records found.",
-                font=("Inter", 14),
-                text_color="#64748b"
-            ).pack(pady=40)
-            return
-
-        for row_index, rec in enumerate(filtered):
-            rid, patient, doctor, schedule, amount_paid, is_paid, barcode, notes = rec
-
-            # Card Row
-            row = ctk.CTkFrame(self.table_frame, corner_radius=10, fg_color="#1e293b", height=60)
-            row.pack(fill="x", pady=5)
-            
-            row.grid_columnconfigure(0, weight=1)
-            row.grid_columnconfigure(1, weight=1)
-            row.grid_columnconfigure(2, weight=0, minsize=100)
-            row.grid_columnconfigure(3, weight=0, minsize=100)
-
-            pretty_schedule = self._format_schedule(schedule)
-            total_value = self._extract_total_from_notes(notes)
-            total_text = f"₱{total_value:,.2f}" if total_value is not None else "-"
-            amt_text = f"₱{amount_paid:,.2f}" if amount_paid else "-"
-            paid_text = "PAID" if is_paid else "UNPAID"
-            paid_color = "#10b981" if is_paid else "#ef4444"
-
-            # 1. Transaction Info (Patient / Doctor)
-            info_frame = ctk.CTkFrame(row, fg_color="transparent")
-            info_frame.grid(row=0, column=0, sticky="ew", padx=15, pady=10)
-            
-            ctk.CTkLabel(
-                info_frame, 
-                text=patient or "Unknown Patient", 
-                font=("Inter", 14, "bold"), 
-                text_color="white",
-                anchor="w"
-            ).pack(anchor="w")
-            
-            ctk.CTkLabel(
-                info_frame, 
-                text=f"Dr. {doctor or 'Unknown'}", 
-                font=("Inter", 12), 
-                text_color="#94a3b8",
-                anchor="w"
-            ).pack(anchor="w")
-
-            # 2. Schedule / Amount
-            sched_frame = ctk.CTkFrame(row, fg_color="transparent")
-            sched_frame.grid(row=0, column=1, sticky="ew", padx=10, pady=10)
-            
-            ctk.CTkLabel(
-                sched_frame, 
-                text=pretty_schedule, 
-                font=("Inter", 13), 
-                text_color="white",
-                anchor="w"
-            ).pack(anchor="w")
-            
-            detail_sub = f"Total: {total_text}"
-            if is_paid: detail_sub += f" • Paid: {amt_text}"
-            
-            ctk.CTkLabel(
-                sched_frame, 
-                text=detail_sub, 
-                font=("Inter", 12), 
-                text_color="#94a3b8",
-                anchor="w"
-            ).pack(anchor="w")
-
-            # 3. Status Badge
-            status_Badge = ctk.CTkFrame(row, fg_color=paid_color, corner_radius=6, height=24)
-            status_Badge.grid(row=0, column=2, padx=10)
-            ctk.CTkLabel(status_Badge, text=paid_text, font=("Inter", 11, "bold"), text_color="white").pack(padx=8, pady=2)
-
-            # 4. Action
-            ctk.CTkButton(
-                row,
-                text="Details",
-                width=70,
-                height=30,
-                font=("Inter", 12, "bold"),
-                fg_color="transparent",
-                border_width=1,
-                border_color="#3b82f6",
-                text_color="#3b82f6",
-                hover_color="#1e293b", # slightly darker or transparent hover
-                command=lambda r=rec: self._view_details(r)
-            ).grid(row=0, column=3, padx=15)
+    def get_filtered_records(self, before_id=None, limit=None):
+        is_paid = {"paid": True, "unpaid": False}.get(self.status_filter)
+        return search_appointments(
+            "id, patient_name, doctor_name, schedule, COALESCE(amount_paid, 0), COALESCE(is_paid, 0), barcode, notes, price",
+            self.search_entry.get(),
+            before_id=before_id,
+            limit=limit,
+            is_paid=is_paid,
+        )
+
+    def apply_filters(self, keep_position: bool = False):
+        self.table_frame.set_source(lambda last, limit: self.get_filtered_records(last[0] if last else None, limit), page_size=50, keep_position=keep_position)
+
+    def refresh(self):
+        self.apply_filters(keep_position=True)
+
+    def _make_row(self, parent):
+        # Card Row
+        row = ctk.CTkFrame(parent, corner_radius=10, fg_color="#1e293b", height=60)
+        row.grid_rowconfigure(0, weight=1)
+        row.grid_columnconfigure(0, weight=1)
+        row.grid_columnconfigure(1, weight=1)
+        row.grid_columnconfigure(2, weight=0, minsize=100)
+        row.grid_columnconfigure(3, weight=0, minsize=100)
+        row.record = None
+
+        # 1. Transaction Info (Patient / Doctor)
+        info_frame = ctk.CTkFrame(row, fg_color="transparent")
+        info_frame.grid(row=0, column=0, sticky="ew", padx=15, pady=10)
+
+        row.patient_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Inter", 14, "bold"),
+            text_color="white",
+            anchor="w"
+        )
+        row.patient_label.pack(anchor="w")
+
+        row.doctor_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Inter", 12),
+            text_color="#94a3b8",
+            anchor="w"
+        )
+        row.doctor_label.pack(anchor="w")
+
+        # 2. Schedule / Amount
+        sched_frame = ctk.CTkFrame(row, fg_color="transparent")
+        sched_frame.grid(row=0, column=1, sticky="ew", padx=10, pady=10)
+
+        row.schedule_label = ctk.CTkLabel(
+            sched_frame,
+            text="",
+            font=("Inter", 13),
+            text_color="white",
+            anchor="w"
+        )
+        row.schedule_label.pack(anchor="w")
+
+        row.detail_label = ctk.CTkLabel(
+            sched_frame,
+            text="",
+            font=("Inter", 12),
+            text_color="#94a3b8",
+            anchor="w"
+        )
+        row.detail_label.pack(anchor="w")
+
+        # 3. Status Badge
+        row.status_badge = ctk.CTkFrame(row, corner_radius=6, height=24)
+        row.status_badge.grid(row=0, column=2, padx=10)
+        row.status_label = ctk.CTkLabel(row.status_badge, text="", font=("Inter", 11, "bold"), text_color="white")
+        row.status_label.pack(padx=8, pady=2)
+
+        # 4. Action
+        ctk.CTkButton(
+            row,
+            text="Details",
+            width=70,
+            height=30,
+            font=("Inter", 12, "bold"),
+            fg_color="transparent",
+            border_width=1,
+            border_color="#3b82f6",
+            text_color="#3b82f6",
+            hover_color="#1e293b", # slightly darker or transparent hover
+            command=lambda: self._view_details(row.record)
+        ).grid(row=0, column=3, padx=15)
+
+        return row
+
+    def _bind_row(self, row, rec):
+        rid, patient, doctor, schedule, amount_paid, is_paid, barcode, notes, price = rec
+        row.record = rec
+
+        total_text = f"₱{price:,.2f}" if price is not None else "-"
+        amt_text = f"₱{amount_paid:,.2f}" if amount_paid else "-"
+        detail_sub = f"Total: {total_text}"
+        if is_paid: detail_sub += f" • Paid: {amt_text}"
+
+        row.patient_label.configure(text=patient or "Unknown Patient")
+        row.doctor_label.configure(text=f"Dr. {doctor or 'Unknown'}")
+        row.schedule_label.configure(text=self._format_schedule(schedule))
+        row.detail_label.configure(text=detail_sub)
+        row.status_badge.configure(fg_color="#10b981" if is_paid else "#ef4444")
+        row.status_label.configure(text="PAID" if is_paid else "UNPAID")
 
     def _view_details(self, record):
-        rid, patient, doctor, schedule, amount_paid, is_paid, barcode, notes = record
+        rid, patient, doctor, schedule, amount_paid, is_paid, barcode, notes, price = record
 
         win = ctk.CTkToplevel(self)
         win.title("Transaction Details")
@@ -323,8 +311,7 @@ class CashierRecordsPage(ctk.CTkFrame):
         div = ctk.CTkFrame(content, height=1, fg_color="#334155")
         div.grid(row=4, column=0, sticky="ew", padx=15, pady=10)
 
-        total_val = self._extract_total_from_notes(notes)
-        total_str = f"₱{total_val:,.2f}" if total_val else "-"
+        total_str = f"₱{price:,.2f}" if price else "-"
         paid_str = f"₱{amount_paid:,.2f}" if amount_paid else "-"
 
         _row(5, "Total Due:", total_str)
@@ -362,20 +349,6 @@ class CashierRecordsPage(ctk.CTkFrame):
 
         ctk.CTkButton(win, text="Close", width=100, fg_color="transparent", border_width=1, border_color="#64748b", text_color="#cbd5e1", hover_color="#334155", command=win.destroy).pack(pady=(0, 20))
 
-    def _extract_total_from_notes(self, notes: str | None) -> float | None:
-        if not notes: return None
-        raw = notes.split("About:", 1)[1] if "About:" in notes else notes
-        digits = []
-        token = ""
-        for ch in raw:
-            if ch.isdigit() or ch in ",.": token += ch
-            else:
-                if token: digits.append(token); token = ""
-        if token: digits.append(token)
-        if not digits: return None
-        try: return float(digits[-1].replace(",", ""))
-        except: return None
-
     def _set_status_filter(self, value: str):
         self.status_filter = value
         self.apply_filters()
@@ -1,11 +1,12 @@
 import customtkinter as ctk
-import sqlite3
 from datetime import datetime
 
-from database import DB_NAME
+from database import db_connection
 
 
 class DoctorAppointmentsPage(ctk.CTkFrame):
+    tables = ("appointments",)
+
     def __init__(self, master, doctor_name: str):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -129,33 +130,32 @@ class DoctorAppointmentsPage(ctk.CTkFrame):
         self._update_filter_buttons()
         self._load_appointments()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
+    def refresh(self):
+        self._load_appointments()
 
     def _load_appointments(self):
         for child in self.list_frame.winfo_children():
             child.destroy()
 
-        conn = self._connect()
-        cur = conn.cursor()
+        with db_connection() as conn:
+            cur = conn.cursor()
 
-        base_query = """
-            SELECT patient_name, schedule, notes, COALESCE(is_rescheduled, 0), COALESCE(is_paid, 0)
-            FROM appointments
-            WHERE doctor_name = ?
-        """
-        params = [self.doctor_name]
+            base_query = """
+                SELECT patient_name, schedule, notes, COALESCE(is_rescheduled, 0), COALESCE(is_paid, 0)
+                FROM appointments
+                WHERE doctor_name = ?
+            """
+            params = [self.doctor_name]
 
-        if self.filter_mode == "today":
-            base_query += " AND DATE(schedule) = DATE('now')"
-        elif self.filter_mode == "upcoming":
-            base_query += " AND DATETIME(schedule) >= DATETIME('now')"
+            if self.filter_mode == "today":
+                base_query += " AND schedule_date = DATE('now')"
+            elif self.filter_mode == "upcoming":
+                base_query += " AND DATETIME(schedule) >= DATETIME('now')"
         
-        base_query += " ORDER BY DATETIME(schedule)"
+            base_query += " ORDER BY DATETIME(schedule)"
 
-        cur.execute(base_query, tuple(params))
-        rows = cur.fetchall()
-        conn.close()
+            cur.execute(base_query, tuple(params))
+            rows = cur.fetchall()
 
         if not rows:
             ctk.CTkLabel(
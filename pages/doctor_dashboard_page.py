@@ -1,8 +1,9 @@
-import sqlite3
 import customtkinter as ctk
-from database import DB_NAME
+from database import db_connection
 
 class DoctorDashboardPage(ctk.CTkFrame):
+    tables = ("appointments",)
+
     def __init__(self, master, doctor_id: int | None, doctor_name: str):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -38,10 +39,10 @@ class DoctorDashboardPage(ctk.CTkFrame):
         for i in range(4):
             stats_row.grid_columnconfigure(i, weight=1)
 
-        self._create_stat_card(stats_row, 0, "UPCOMING", str(total_upcoming), "#3b82f6") # Blue
-        self._create_stat_card(stats_row, 1, "EARNED TODAY", f"₱{earnings_today:,.2f}", "#f59e0b") # Amber
-        self._create_stat_card(stats_row, 2, "MONTHLY EARNINGS", f"₱{earnings_month:,.2f}", "#f43f5e") # Rose
-        self._create_stat_card(stats_row, 3, "TOTAL PATIENTS", str(patients_month), "#8b5cf6") # Violet
+        self.card_upcoming = self._create_stat_card(stats_row, 0, "UPCOMING", str(total_upcoming), "#3b82f6") # Blue
+        self.card_today = self._create_stat_card(stats_row, 1, "EARNED TODAY", f"₱{earnings_today:,.2f}", "#f59e0b") # Amber
+        self.card_month = self._create_stat_card(stats_row, 2, "MONTHLY EARNINGS", f"₱{earnings_month:,.2f}", "#f43f5e") # Rose
+        self.card_patients = self._create_stat_card(stats_row, 3, "TOTAL PATIENTS", str(patients_month), "#8b5cf6") # Violet
 
         # --- Two Columns ---
         
@@ -82,9 +83,6 @@ class DoctorDashboardPage(ctk.CTkFrame):
 
         self._populate_data()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
-
     def _create_stat_card(self, parent, column, label, value, fg_color):
         card = ctk.CTkFrame(
             parent, 
@@ -99,72 +97,75 @@ class DoctorDashboardPage(ctk.CTkFrame):
 
         ctk.CTkLabel(card, text=label, font=("Inter", 11, "bold"), text_color="#cbd5e1").grid(row=0, column=0, padx=14, pady=(14, 2), sticky="w")
 
-        ctk.CTkLabel(
+        value_label = ctk.CTkLabel(
             card,
             text=value,
             font=("Inter", 22, "bold"),
             text_color="white", 
-        ).grid(row=1, column=0, padx=14, pady=(0, 14), sticky="w")
+        )
+        value_label.grid(row=1, column=0, padx=14, pady=(0, 14), sticky="w")
         
         # Indicator line
         ctk.CTkFrame(card, height=3, width=40, fg_color=fg_color, corner_radius=2).grid(row=2, column=0, padx=14, pady=(0, 12), sticky="w")
 
-    def _extract_total_from_notes(self, notes: str | None) -> float | None:
-        if not notes: return None
-        import re
-        matches = re.findall(r"[\d,]+\.?\d*", notes)
-        if not matches: return None
-        try:
-             candidate = matches[-1].replace(",", "")
-             return float(candidate)
-        except: return None
+        return value_label
+
+    def refresh(self):
+        total_upcoming, earnings_today, earnings_month, patients_month = self._load_stats()
+        self.card_upcoming.configure(text=str(total_upcoming))
+        self.card_today.configure(text=f"₱{earnings_today:,.2f}")
+        self.card_month.configure(text=f"₱{earnings_month:,.2f}")
+        self.card_patients.configure(text=str(patients_month))
+        self._populate_data()
 
     def _load_stats(self):
         if not self.doctor_name: return 0, 0, 0, 0
-        conn = self._connect()
-        cur = conn.cursor()
+        with db_connection() as conn:
+            cur = conn.cursor()
         
-        cur.execute("SELECT COUNT(*) FROM appointments WHERE doctor_name=? AND DATE(schedule) >= DATE('now')", (self.doctor_name,))
-        upc = cur.fetchone()[0] or 0
+            cur.execute("SELECT COUNT(*) FROM appointments WHERE doctor_name=? AND schedule_date >= DATE('now')", (self.doctor_name,))
+            upc = cur.fetchone()[0] or 0
         
-        cur.execute("SELECT COALESCE(notes,'') FROM appointments WHERE doctor_name=? AND is_paid=1 AND DATE(schedule)=DATE('now')", (self.doctor_name,))
-        etoday = sum(self._extract_total_from_notes(n) or 0 for (n,) in cur.fetchall())
+            cur.execute("SELECT COALESCE(SUM(revenue),0) FROM daily_revenue WHERE doctor_name=? AND day=DATE('now')", (self.doctor_name,))
+            etoday = cur.fetchone()[0]
         
-        cur.execute("SELECT COALESCE(notes,'') FROM appointments WHERE doctor_name=? AND is_paid=1 AND strftime('%Y-%m', schedule)=strftime('%Y-%m','now')", (self.doctor_name,))
-        emonth = sum(self._extract_total_from_notes(n) or 0 for (n,) in cur.fetchall())
+            cur.execute(
+                "SELECT COALESCE(SUM(revenue),0) FROM daily_revenue WHERE doctor_name=? "
+                "AND day >= DATE('now','start of month') AND day < DATE('now','start of month','+1 month')",
+                (self.doctor_name,),
+            )
+            emonth = cur.fetchone()[0]
         
-        cur.execute("SELECT COUNT(DISTINCT patient_name) FROM appointments WHERE doctor_name=? AND strftime('%Y-%m', schedule)=strftime('%Y-%m','now')", (self.doctor_name,))
-        pmonth = cur.fetchone()[0] or 0
+            cur.execute("SELECT COUNT(DISTINCT patient_name) FROM appointments WHERE doctor_name=? AND schedule_month=strftime('%Y-%m','now')", (self.doctor_name,))
+            pmonth = cur.fetchone()[0] or 0
         
-        conn.close()
         return upc, etoday, emonth, pmonth
 
     def _populate_data(self):
         if not self.doctor_name: return
-        conn = self._connect()
-        cur = conn.cursor()
-
-        # 1. Upcoming appts (Today)
-        # We will use this for the LEFT column "Today's Schedule"
-        cur.execute("""
-            SELECT patient_name, schedule, COALESCE(notes, ''), COALESCE(is_rescheduled, 0)
-            FROM appointments
-            WHERE doctor_name = ? AND DATE(schedule) = DATE('now')
-            ORDER BY schedule ASC
-        """, (self.doctor_name,))
-        today_rows = cur.fetchall()
-
-        # 2. Recent appts (Past, Global Recent)
-        cur.execute("""
-            SELECT patient_name, schedule, COALESCE(notes, ''), COALESCE(is_rescheduled, 0), is_paid
-            FROM appointments
-            WHERE doctor_name = ?
-            ORDER BY DATETIME(schedule) DESC
-            LIMIT 10
-        """, (self.doctor_name,))
-        recent_rows = cur.fetchall()
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            # 1. Upcoming appts (Today)
+            # We will use this for the LEFT column "Today's Schedule"
+            cur.execute("""
+                SELECT patient_name, schedule, COALESCE(notes, ''), COALESCE(is_rescheduled, 0)
+                FROM appointments
+                WHERE doctor_name = ? AND schedule_date = DATE('now')
+                ORDER BY schedule ASC
+            """, (self.doctor_name,))
+            today_rows = cur.fetchall()
+
+            # 2. Recent appts (Past, Global Recent)
+            cur.execute("""
+                SELECT patient_name, schedule, COALESCE(notes, ''), COALESCE(is_rescheduled, 0), is_paid
+                FROM appointments
+                WHERE doctor_name = ?
+                ORDER BY DATETIME(schedule) DESC
+                LIMIT 10
+            """, (self.doctor_name,))
+            recent_rows = cur.fetchall()
         
-        conn.close()
 
         # Populate Left List (Today)
         for c in self.upcoming_list.winfo_children(): c.destroy()
@@ -1,18 +1,32 @@
 import customtkinter as ctk
-import sqlite3
 import calendar
-from datetime import date
+from datetime import date, datetime, timedelta
 from tkinter import messagebox
 
-from database import DB_NAME
+from database import db_connection
+from calendar_grid import CalendarGrid
+from scheduling import load_range
+from scheduling.availability import SLOT_CAPACITY, SLOT_MINUTES
+
+SLOT_LENGTHS = (15, 20, 30, 45, 60, 90, 120)
+TEMPLATE_SPANS = {"1 month": 1, "3 months": 3, "6 months": 6, "12 months": 12, "No end date": None}
+
+
+def _add_months(d: date, months: int) -> date:
+    y, m = divmod(d.month - 1 + months, 12)
+    year, month = d.year + y, m + 1
+    return d.replace(year=year, month=month, day=min(d.day, calendar.monthrange(year, month)[1]))
 
 
 class DoctorManagePage(ctk.CTkFrame):
+    tables = ("appointments", "doctor_availability")
+
     def __init__(self, master, doctor_id, doctor_name: str):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
         self.doctor_id = doctor_id
         self.doctor_name = doctor_name
+        self._weekly_windows = []
 
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
@@ -70,37 +84,19 @@ class DoctorManagePage(ctk.CTkFrame):
         )
         next_btn.grid(row=0, column=2, padx=(10, 0))
 
+        ctk.CTkButton(
+            controls, text="Recurring Hours", height=32,
+            fg_color="#3b82f6", hover_color="#2563eb",
+            font=("Inter", 13, "bold"), command=self._open_recurring_template
+        ).grid(row=0, column=3, padx=(10, 0))
+
         # Calendar
-        self.calendar_frame = ctk.CTkFrame(content, fg_color="transparent")
+        self.calendar_frame = CalendarGrid(
+            content, on_pick=self._open_day_detail, cell_size=40, cell_font=("Inter", 12, "bold"),
+            cell_radius=8, header_font=("Inter", 11, "bold"), header_upper=True, uniform_rows=True,
+            fg_color="transparent",
+        )
         self.calendar_frame.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="ew")
-        
-        # Grid Init
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        for i, wd in enumerate(days):
-            self.calendar_frame.grid_columnconfigure(i, weight=1, uniform="cal_col")
-            lbl = ctk.CTkLabel(self.calendar_frame, text=wd.upper(), font=("Inter", 11, "bold"), text_color="#94a3b8")
-            lbl.grid(row=0, column=i, pady=(0, 10))
-
-        # View Holder for Buttons: 6 rows x 7 cols
-        self.cal_buttons = []
-        for r in range(1, 7): # Rows 1-6
-            self.calendar_frame.grid_rowconfigure(r, weight=1, uniform="cal_row")
-            row_btns = []
-            for c in range(7):
-                btn = ctk.CTkButton(
-                    self.calendar_frame,
-                    text="",
-                    font=("Inter", 12, "bold"),
-                    width=40, 
-                    height=40,
-                    corner_radius=8,
-                    fg_color="transparent", # Default invisible
-                    hover=False,
-                    state="disabled"
-                )
-                btn.grid(row=r, column=c, padx=4, pady=4, sticky="nsew")
-                row_btns.append(btn)
-            self.cal_buttons.append(row_btns)
 
         # Day Detail Section (Below Calendar)
         div = ctk.CTkFrame(content, height=2, fg_color="#334155")
@@ -114,17 +110,24 @@ class DoctorManagePage(ctk.CTkFrame):
         self.selected_date = None
         self._refresh_calendar()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
+    def refresh(self):
+        self._refresh_calendar()
+        if self.selected_date:
+            self._load_day_data(self.selected_date)
 
-    def _edit_slot(self, slot_id: int, start_t: str, end_t: str, slot_len: int | None, max_appt: int | None):
-        """Open a small window to edit an existing time slot."""
+    def _edit_slot(self, slot_id: int, start_t: str, end_t: str, slot_len: int | None, max_appt: int | None,
+                   weekly_index: int | None = None):
+        """Open a small window to edit an existing time slot.
+
+        ``weekly_index`` is the position of a weekly window in ``self._weekly_windows``;
+        the first edit of such a day copies all its weekly windows into hours for that day.
+        """
         if self.selected_date is None or self.doctor_id is None: return
 
         master = self.winfo_toplevel()
         win = ctk.CTkToplevel(master)
         win.title("Edit Time Slot" if slot_id != -1 else "Set Time Slot")
-        win.geometry("500x350")
+        win.geometry("500x450")
         win.configure(fg_color="#0f172a")
         win.transient(master)
         win.grab_set()
@@ -132,7 +135,7 @@ class DoctorManagePage(ctk.CTkFrame):
         # Center
         win.update_idletasks()
         x = master.winfo_rootx() + (master.winfo_width() - 500) // 2
-        y = master.winfo_rooty() + (master.winfo_height() - 350) // 2
+        y = master.winfo_rooty() + (master.winfo_height() - 450) // 2
         win.geometry(f"+{x}+{y}")
 
         win.grid_columnconfigure(1, weight=1)
@@ -166,6 +169,7 @@ class DoctorManagePage(ctk.CTkFrame):
 
         sh_c, sm_c, sp_c = _create_time_row(1, "Start Time", s_h, s_m, s_p)
         eh_c, em_c, ep_c = _create_time_row(2, "End Time", e_h, e_m, e_p)
+        len_c, cap_c = self._create_slot_options(win, 3, slot_len, max_appt)
 
         def _to_24h(h, m, p):
             try: hh = int(h)
@@ -180,32 +184,38 @@ class DoctorManagePage(ctk.CTkFrame):
             if ns >= ne:
                 messagebox.showerror("Error", "End time must be after start time.")
                 return
-            conn = self._connect()
-            cur = conn.cursor()
+            sl, ma = self._slot_option_values(len_c, cap_c)
+            with db_connection() as conn:
+                cur = conn.cursor()
             
-            if slot_id == -1:
-                # Create new slot from virtual default
-                cur.execute("INSERT INTO doctor_availability (doctor_id, date, start_time, end_time, is_available, max_appointments, slot_length_minutes) VALUES (?, ?, ?, ?, 1, 1, 30)", 
-                           (self.doctor_id, self.selected_date, ns, ne))
-            else:
-                cur.execute("UPDATE doctor_availability SET start_time=?, end_time=? WHERE id=?", (ns, ne, slot_id))
+                if slot_id == -1:
+                    # Create new slot from virtual default, keeping the day's other weekly windows
+                    self._copy_weekly_windows(cur, skip=weekly_index)
+                    cur.execute("INSERT INTO doctor_availability (doctor_id, date, start_time, end_time, is_available, max_appointments, slot_length_minutes) VALUES (?, ?, ?, ?, 1, ?, ?)", 
+                               (self.doctor_id, self.selected_date, ns, ne, ma, sl))
+                else:
+                    cur.execute("UPDATE doctor_availability SET start_time=?, end_time=?, max_appointments=?, slot_length_minutes=? WHERE id=?", (ns, ne, ma, sl, slot_id))
             
-            conn.commit()
-            conn.close()
             win.destroy()
             self._load_day_data(self.selected_date)
 
         def delete():
-            if slot_id == -1:
+            if slot_id == -1 and weekly_index is not None and len(self._weekly_windows) > 1:
+                # Drop one weekly window for this day only: the others become hours for the day
+                if messagebox.askyesno("Confirm", "Remove these hours for this day only?"):
+                    with db_connection() as conn:
+                        self._copy_weekly_windows(conn.cursor(), skip=weekly_index)
+                    win.destroy()
+                    self._refresh_calendar()
+                    self._load_day_data(self.selected_date)
+            elif slot_id == -1:
                  # Deleting the default slot means creating an 'Unavailable' override
                  if messagebox.askyesno("Confirm", "Mark this day as Unavailable?"):
-                    conn = self._connect()
-                    cur = conn.cursor()
-                    # Ensure we have an unavailable header
-                    cur.execute("DELETE FROM doctor_availability WHERE doctor_id=? AND date=? AND start_time IS NULL", (self.doctor_id, self.selected_date))
-                    cur.execute("INSERT INTO doctor_availability (doctor_id, date, is_available) VALUES (?, ?, 0)", (self.doctor_id, self.selected_date))
-                    conn.commit()
-                    conn.close()
+                    with db_connection() as conn:
+                        cur = conn.cursor()
+                        # Ensure we have an unavailable header
+                        cur.execute("DELETE FROM doctor_availability WHERE doctor_id=? AND date=? AND start_time IS NULL", (self.doctor_id, self.selected_date))
+                        cur.execute("INSERT INTO doctor_availability (doctor_id, date, is_available) VALUES (?, ?, 0)", (self.doctor_id, self.selected_date))
                     win.destroy()
                     self._refresh_calendar()
                     self._load_day_data(self.selected_date)
@@ -221,7 +231,7 @@ class DoctorManagePage(ctk.CTkFrame):
                     # We'll stick to 'No Slot -> Show Default'.
 
         btn_box = ctk.CTkFrame(win, fg_color="transparent")
-        btn_box.grid(row=3, column=0, columnspan=2, pady=30)
+        btn_box.grid(row=5, column=0, columnspan=2, pady=30)
         ctk.CTkButton(btn_box, text="Save Changes", font=("Inter", 13, "bold"), fg_color="#3b82f6", width=120, command=save).pack(side="left", padx=10)
         ctk.CTkButton(btn_box, text="Delete Slot" if slot_id != -1 else "Remove Availability", font=("Inter", 13, "bold"), fg_color="#ef4444", hover_color="#b91c1c", width=120, command=delete).pack(side="left", padx=10)
 
@@ -245,81 +255,51 @@ class DoctorManagePage(ctk.CTkFrame):
         # Update title
         self.month_label.configure(text=f"{calendar.month_name[self.current_month]} {self.current_year}")
 
-        # Fetch Data efficiently
+        # Fetch Data efficiently: dated rows plus weekly rules expanded for this month only
         availability_map = {}
-        if self.doctor_id is not None:
-            conn = self._connect()
-            cur = conn.cursor()
+        if self.doctor_id is not None and self.doctor_name:
+            last = calendar.monthrange(self.current_year, self.current_month)[1]
             start = f"{self.current_year:04d}-{self.current_month:02d}-01"
-            end = f"{self.current_year:04d}-{self.current_month:02d}-31"
-            # Get only dates that have explicitly marked status
-            cur.execute("""
-                SELECT date, is_available FROM doctor_availability 
-                WHERE doctor_id=? AND date BETWEEN ? AND ? AND start_time IS NULL
-            """, (self.doctor_id, start, end))
-            for d, avail in cur.fetchall():
-                availability_map[d] = avail
-            conn.close()
+            end = f"{self.current_year:04d}-{self.current_month:02d}-{last:02d}"
+            with db_connection() as conn:
+                _doctors, days = load_range(conn, start, end, doctor_name=self.doctor_name)
+            for (_doc, d), (windows, day_off, _booked) in days.items():
+                if day_off:
+                    availability_map[d] = 0
+                elif windows:
+                    availability_map[d] = 1
 
         # Fill Grid (Reuse Buttons)
-        cal = calendar.Calendar(firstweekday=0)
-        month_weeks = cal.monthdayscalendar(self.current_year, self.current_month)
-        
         today_str = date.today().strftime("%Y-%m-%d")
 
-        for r in range(6):
-            # If this week doesn't exist in the month, clear row
-            if r >= len(month_weeks):
-                for c in range(7):
-                    self.cal_buttons[r][c].configure(text="", fg_color="transparent", state="disabled")
-                continue
-                
-            week = month_weeks[r]
-            for c in range(7):
-                day_num = week[c]
-                btn = self.cal_buttons[r][c]
-
-                if day_num == 0:
-                    btn.configure(text="", fg_color="transparent", state="disabled")
-                    continue
-
-                d_str = f"{self.current_year:04d}-{self.current_month:02d}-{day_num:02d}"
-                status = availability_map.get(d_str)
-
-                # Style Logic
-                text_col = "white"
-                fg_col = "#334155" # Default available (Slate 700)
-                hover_col = "#475569"
-                state = "normal"
-                hover = True
-
-                if d_str < today_str:
-                    fg_col = "transparent" # Or extremely washed out
-                    text_col = "#475569"
-                    state = "disabled"
-                    hover = False
-                    cmd = None
-                elif status == 0:
-                    fg_col = "#ef4444" # Red (Unavail)
-                    hover_col = "#dc2626"
-                    cmd = lambda d=d_str: self._open_day_detail(d)
-                elif d_str == self.selected_date:
-                    fg_col = "#3b82f6" # Blue (Selected)
-                    hover_col = "#2563eb"
-                    cmd = lambda d=d_str: self._open_day_detail(d)
-                else:
-                    # Default Available
-                    cmd = lambda d=d_str: self._open_day_detail(d)
-
-                btn.configure(
-                    text=str(day_num),
-                    state=state,
-                    fg_color=fg_col,
-                    hover_color=hover_col,
-                    text_color=text_col,
-                    hover=hover,
-                    command=cmd
-                )
+        def _style(d_str):
+            status = availability_map.get(d_str)
+
+            # Style Logic
+            text_col = "white"
+            fg_col = "#334155" # Default available (Slate 700)
+            hover_col = "#475569"
+            state = "normal"
+            hover = True
+
+            if d_str < today_str:
+                fg_col = "transparent" # Or extremely washed out
+                text_col = "#475569"
+                state = "disabled"
+                hover = False
+            elif status == 0:
+                fg_col = "#ef4444" # Red (Unavail)
+                hover_col = "#dc2626"
+            elif d_str == self.selected_date:
+                fg_col = "#3b82f6" # Blue (Selected)
+                hover_col = "#2563eb"
+            elif status == 1:
+                fg_col = "#065f46" # Green (Hours set, for the day or weekly)
+                hover_col = "#047857"
+
+            return {"fg_color": fg_col, "hover_color": hover_col, "text_color": text_col, "state": state, "hover": hover}
+
+        self.calendar_frame.show(self.current_year, self.current_month, _style)
 
         # Trigger detail view logic if needed
         if self.selected_date and self.selected_date.startswith(f"{self.current_year:04d}-{self.current_month:02d}"):
@@ -372,25 +352,50 @@ class DoctorManagePage(ctk.CTkFrame):
 
     def _load_day_data(self, d_str: str, update_switch: bool = True):
         if self.doctor_id is None: return
-        conn = self._connect()
-        cur = conn.cursor()
+        with db_connection() as conn:
+            cur = conn.cursor()
         
-        # Check Status
-        cur.execute("SELECT is_available FROM doctor_availability WHERE doctor_id=? AND date=? AND start_time IS NULL ORDER BY id DESC LIMIT 1", (self.doctor_id, d_str))
-        row = cur.fetchone()
-        is_avail = 1 if row is None else row[0]
+            # Check Status
+            cur.execute("SELECT is_available FROM doctor_availability WHERE doctor_id=? AND date=? AND start_time IS NULL ORDER BY id DESC LIMIT 1", (self.doctor_id, d_str))
+            row = cur.fetchone()
+            is_avail = 1 if row is None else row[0]
+
+            # Fetch Slots
+            cur.execute("SELECT id, start_time, end_time, max_appointments, slot_length_minutes FROM doctor_availability WHERE doctor_id=? AND date=? AND is_available=1 AND start_time IS NOT NULL AND weekday_mask IS NULL ORDER BY start_time", (self.doctor_id, d_str))
+            slots = cur.fetchall()
+
+            # No hours of its own: the weekly rules covering this day apply.
+            # They show as virtual slots (id -1), so editing one sets hours for this day only.
+            weekly = False
+            if not slots:
+                cur.execute("""
+                    SELECT -1, start_time, end_time, max_appointments, slot_length_minutes FROM doctor_availability
+                    WHERE doctor_id=? AND weekday_mask & ? AND date <= ? AND (valid_until IS NULL OR valid_until >= ?) AND is_available=1
+                    ORDER BY start_time
+                """, (self.doctor_id, 1 << datetime.strptime(d_str, "%Y-%m-%d").weekday(), d_str, d_str))
+                slots = cur.fetchall()
+                weekly = bool(slots)
+            self._weekly_windows = slots if weekly else []
+
+            # Once a doctor has weekly hours, days they don't cover are closed
+            # unless switched to available for that day.
+            closed = False
+            if not slots and row is None:
+                cur.execute("SELECT 1 FROM doctor_availability WHERE doctor_id=? AND weekday_mask IS NOT NULL LIMIT 1", (self.doctor_id,))
+                closed = cur.fetchone() is not None
+                if closed: is_avail = 0
+
         if update_switch:
             if is_avail: self.day_status_switch.select()
             else: self.day_status_switch.deselect()
 
-        # Fetch Slots
-        cur.execute("SELECT id, start_time, end_time, max_appointments, slot_length_minutes FROM doctor_availability WHERE doctor_id=? AND date=? AND is_available=1 AND start_time IS NOT NULL ORDER BY start_time", (self.doctor_id, d_str))
-        slots = cur.fetchall()
-        conn.close()
-
         if not hasattr(self, "slots_frame"): return
         for c in self.slots_frame.winfo_children(): c.destroy()
 
+        if closed:
+            ctk.CTkLabel(self.slots_frame, text="Outside Weekly Hours", font=("Inter", 13), text_color="#ef4444").pack(pady=20)
+            return
+
         if is_avail == 0:
             ctk.CTkLabel(self.slots_frame, text="Marked as Unavailable", font=("Inter", 13), text_color="#ef4444").pack(pady=20)
             return
@@ -398,27 +403,56 @@ class DoctorManagePage(ctk.CTkFrame):
         if not slots:
             # Default to 9:00 - 17:00 if no slots and is available
             # We use slot_id = -1 to indicate it's a virtual default slot
-            slots = [(-1, "09:00", "17:00", 1, 30)]
+            slots = [(-1, "09:00", "17:00", SLOT_CAPACITY, SLOT_MINUTES)]
 
         def _fmt(t):
             try: return datetime.strptime(t, "%H:%M").strftime("%I:%M %p").lstrip("0")
             except: return t
 
-        for sid, st, et, ma, sl in slots:
+        for i, (sid, st, et, ma, sl) in enumerate(slots):
             row = ctk.CTkFrame(self.slots_frame, fg_color="#334155", corner_radius=8)
             row.pack(fill="x", pady=4)
             ctk.CTkLabel(row, text=f"{_fmt(st)} - {_fmt(et)}", font=("Inter", 13, "bold"), text_color="white").pack(side="left", padx=15, pady=10)
-            ctk.CTkButton(row, text="Edit", width=60, height=24, font=("Inter", 11), fg_color="#475569", hover_color="#64748b", command=lambda s=sid, a=st, b=et, c=sl, d=ma: self._edit_slot(s, a, b, c, d)).pack(side="right", padx=10)
+            ctk.CTkLabel(row, text=f"{sl or SLOT_MINUTES} min  ·  {ma or SLOT_CAPACITY} per slot", font=("Inter", 11), text_color="#94a3b8").pack(side="left", padx=5)
+            if weekly:
+                ctk.CTkLabel(row, text="WEEKLY", font=("Inter", 10, "bold"), text_color="#10b981").pack(side="left", padx=5)
+            ctk.CTkButton(row, text="Edit", width=60, height=24, font=("Inter", 11), fg_color="#475569", hover_color="#64748b", command=lambda s=sid, a=st, b=et, c=sl, d=ma, i=(i if weekly else None): self._edit_slot(s, a, b, c, d, i)).pack(side="right", padx=10)
+
+    def _copy_weekly_windows(self, cur, skip: int | None = None):
+        """Write the selected day's weekly windows, except ``skip``, as hours for that day."""
+        cur.executemany(
+            "INSERT INTO doctor_availability (doctor_id, date, start_time, end_time, is_available, max_appointments, slot_length_minutes) VALUES (?, ?, ?, ?, 1, ?, ?)",
+            [(self.doctor_id, self.selected_date, st, et, ma, sl)
+             for i, (_sid, st, et, ma, sl) in enumerate(self._weekly_windows) if i != skip],
+        )
+
+    def _create_slot_options(self, parent, row_idx, slot_len, max_appt):
+        """Slot length and patients-per-slot pickers used by the add/edit slot windows."""
+        ctk.CTkLabel(parent, text="Slot Length", font=("Inter", 14), text_color="#cbd5e1").grid(row=row_idx, column=0, padx=30, pady=10, sticky="w")
+        len_c = ctk.CTkComboBox(parent, values=[f"{m} min" for m in SLOT_LENGTHS], width=120, font=("Inter", 13))
+        len_c.set(f"{slot_len or SLOT_MINUTES} min")
+        len_c.grid(row=row_idx, column=1, padx=30, pady=10, sticky="w")
+
+        ctk.CTkLabel(parent, text="Patients per Slot", font=("Inter", 14), text_color="#cbd5e1").grid(row=row_idx + 1, column=0, padx=30, pady=10, sticky="w")
+        cap_c = ctk.CTkComboBox(parent, values=[str(n) for n in range(1, 11)], width=120, font=("Inter", 13))
+        cap_c.set(str(max_appt or SLOT_CAPACITY))
+        cap_c.grid(row=row_idx + 1, column=1, padx=30, pady=10, sticky="w")
+        return len_c, cap_c
+
+    def _slot_option_values(self, len_c, cap_c):
+        try: sl = int(len_c.get().split()[0])
+        except: sl = SLOT_MINUTES
+        try: ma = int(cap_c.get())
+        except: ma = SLOT_CAPACITY
+        return max(sl, 5), max(ma, 1)
 
     def _toggle_day_status(self):
         if not self.selected_date: return
         val = 1 if self.day_status_switch.get() else 0
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM doctor_availability WHERE doctor_id=? AND date=? AND start_time IS NULL", (self.doctor_id, self.selected_date))
-        cur.execute("INSERT INTO doctor_availability (doctor_id, date, is_available) VALUES (?, ?, ?)", (self.doctor_id, self.selected_date, val))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM doctor_availability WHERE doctor_id=? AND date=? AND start_time IS NULL", (self.doctor_id, self.selected_date))
+            cur.execute("INSERT INTO doctor_availability (doctor_id, date, is_available) VALUES (?, ?, ?)", (self.doctor_id, self.selected_date, val))
         self._refresh_calendar()
         self._load_day_data(self.selected_date, update_switch=False)
 
@@ -427,7 +461,7 @@ class DoctorManagePage(ctk.CTkFrame):
         master = self.winfo_toplevel()
         win = ctk.CTkToplevel(master)
         win.title("Add Slot")
-        win.geometry("500x350")
+        win.geometry("500x400")
         win.configure(fg_color="#0f172a")
         win.transient(master)
         win.grab_set()
@@ -435,7 +469,7 @@ class DoctorManagePage(ctk.CTkFrame):
         # Center
         win.update_idletasks()
         x = master.winfo_rootx() + (master.winfo_width() - 500) // 2
-        y = master.winfo_rooty() + (master.winfo_height() - 350) // 2
+        y = master.winfo_rooty() + (master.winfo_height() - 400) // 2
         win.geometry(f"+{x}+{y}")
         
         ctk.CTkLabel(win, text="Add New Time Slot", font=("Inter", 18, "bold"), text_color="white").pack(pady=20)
@@ -453,6 +487,10 @@ class DoctorManagePage(ctk.CTkFrame):
         end_h = ctk.CTkComboBox(f, values=hours, width=60); end_h.set("05"); end_h.grid(row=0, column=4, padx=2)
         end_m = ctk.CTkComboBox(f, values=mins, width=60); end_m.set("00"); end_m.grid(row=0, column=5, padx=2)
         end_p = ctk.CTkComboBox(f, values=ps, width=60); end_p.set("PM"); end_p.grid(row=0, column=6, padx=2)
+
+        opts = ctk.CTkFrame(win, fg_color="transparent")
+        opts.pack(pady=10)
+        len_c, cap_c = self._create_slot_options(opts, 0, SLOT_MINUTES, SLOT_CAPACITY)
         
         def _to_24h(h, m, p):
              hh = int(h)
@@ -464,19 +502,156 @@ class DoctorManagePage(ctk.CTkFrame):
              s = _to_24h(start_h.get(), start_m.get(), start_p.get())
              e = _to_24h(end_h.get(), end_m.get(), end_p.get())
              # Basic check if s < e? Or can end next day? Assuming same day for now.
-             conn = self._connect()
-             cur = conn.cursor()
-             cur.execute("INSERT INTO doctor_availability (doctor_id, date, start_time, end_time, is_available, max_appointments, slot_length_minutes) VALUES (?, ?, ?, ?, 1, 1, 30)", (self.doctor_id, self.selected_date, s, e))
-             conn.commit()
-             conn.close()
+             sl, ma = self._slot_option_values(len_c, cap_c)
+             with db_connection() as conn:
+                 cur = conn.cursor()
+                 cur.execute("INSERT INTO doctor_availability (doctor_id, date, start_time, end_time, is_available, max_appointments, slot_length_minutes) VALUES (?, ?, ?, ?, 1, ?, ?)", (self.doctor_id, self.selected_date, s, e, ma, sl))
              win.destroy()
              self._load_day_data(self.selected_date)
 
         ctk.CTkButton(win, text="Add Slot", font=("Inter", 13, "bold"), fg_color="#3b82f6", width=200, command=save).pack(pady=30)
 
+    def _open_recurring_template(self):
+        """Set standing weekly hours (e.g. Mon-Fri 9-5), stored as one rule row."""
+        if self.doctor_id is None: return
+        master = self.winfo_toplevel()
+        win = ctk.CTkToplevel(master)
+        win.title("Recurring Hours")
+        win.geometry("560x680")
+        win.configure(fg_color="#0f172a")
+        win.transient(master)
+        win.grab_set()
+
+        # Center
+        win.update_idletasks()
+        x = master.winfo_rootx() + (master.winfo_width() - 560) // 2
+        y = master.winfo_rooty() + (master.winfo_height() - 680) // 2
+        win.geometry(f"+{x}+{y}")
+
+        win.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(win, text="Recurring Weekly Hours", font=("Inter", 18, "bold"), text_color="white").grid(row=0, column=0, columnspan=2, pady=(20, 15))
+
+        ctk.CTkLabel(win, text="Days", font=("Inter", 14), text_color="#cbd5e1").grid(row=1, column=0, padx=30, pady=10, sticky="w")
+        days_f = ctk.CTkFrame(win, fg_color="transparent")
+        days_f.grid(row=1, column=1, padx=30, pady=10, sticky="w")
+        day_vars = []
+        for i, name in enumerate(calendar.day_abbr):
+            var = ctk.IntVar(value=1 if i < 5 else 0)
+            ctk.CTkCheckBox(days_f, text=name[:2], variable=var, width=20, checkbox_width=18, checkbox_height=18, font=("Inter", 12)).pack(side="left", padx=(0, 6))
+            day_vars.append(var)
+
+        hours = [f"{h:02d}" for h in range(1, 13)]
+        mins = ["00", "30"]
+        ps = ["AM", "PM"]
+
+        def _time_row(row_idx, label, h_val, p_val):
+            ctk.CTkLabel(win, text=label, font=("Inter", 14), text_color="#cbd5e1").grid(row=row_idx, column=0, padx=30, pady=10, sticky="w")
+            f = ctk.CTkFrame(win, fg_color="transparent")
+            f.grid(row=row_idx, column=1, padx=30, pady=10, sticky="w")
+            hc = ctk.CTkComboBox(f, values=hours, width=70, font=("Inter", 13)); hc.set(h_val); hc.pack(side="left", padx=(0, 5))
+            mc = ctk.CTkComboBox(f, values=mins, width=70, font=("Inter", 13)); mc.set("00"); mc.pack(side="left", padx=5)
+            pc = ctk.CTkComboBox(f, values=ps, width=70, font=("Inter", 13)); pc.set(p_val); pc.pack(side="left", padx=5)
+            return hc, mc, pc
+
+        start_c = _time_row(2, "Start Time", "09", "AM")
+        end_c = _time_row(3, "End Time", "05", "PM")
+        len_c, cap_c = self._create_slot_options(win, 4, SLOT_MINUTES, SLOT_CAPACITY)
+
+        ctk.CTkLabel(win, text="Apply For", font=("Inter", 14), text_color="#cbd5e1").grid(row=6, column=0, padx=30, pady=10, sticky="w")
+        span_c = ctk.CTkComboBox(win, values=list(TEMPLATE_SPANS), width=120, font=("Inter", 13))
+        span_c.set("3 months")
+        span_c.grid(row=6, column=1, padx=30, pady=10, sticky="w")
+
+        overwrite_var = ctk.IntVar(value=0)
+        ctk.CTkCheckBox(win, text="Clear hours already set on those days", variable=overwrite_var, font=("Inter", 12), text_color="#cbd5e1").grid(row=7, column=0, columnspan=2, padx=30, pady=10, sticky="w")
+
+        def _to_24h(h, m, p):
+            try: hh = int(h)
+            except: return ""
+            if p == "PM" and hh != 12: hh += 12
+            if p == "AM" and hh == 12: hh = 0
+            return f"{hh:02d}:{m}"
+
+        def save():
+            ns = _to_24h(*(c.get() for c in start_c))
+            ne = _to_24h(*(c.get() for c in end_c))
+            if not ns or not ne or ns >= ne:
+                messagebox.showerror("Error", "End time must be after start time.")
+                return
+            weekdays = {i for i, var in enumerate(day_vars) if var.get()}
+            if not weekdays:
+                messagebox.showerror("Error", "Pick at least one day.")
+                return
+            sl, ma = self._slot_option_values(len_c, cap_c)
+
+            first = date.today().strftime("%Y-%m-%d")
+            months = TEMPLATE_SPANS.get(span_c.get(), 3)
+            until = None
+            if months is not None:
+                until = (_add_months(date.today(), months) - timedelta(days=1)).strftime("%Y-%m-%d")
+            mask = sum(1 << i for i in weekdays)
+
+            # One rule row covers the whole span; it is expanded per viewed month when read
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cleared = []
+                if overwrite_var.get():
+                    # Day-specific hours win over rules, so drop them where the new hours should show
+                    cur.execute("SELECT DISTINCT date FROM doctor_availability WHERE doctor_id=? AND weekday_mask IS NULL AND date BETWEEN ? AND ?", (self.doctor_id, first, until or "9999-12-31"))
+                    cleared = [(self.doctor_id, d) for (d,) in cur.fetchall() if datetime.strptime(d, "%Y-%m-%d").weekday() in weekdays]
+                    cur.executemany("DELETE FROM doctor_availability WHERE doctor_id=? AND date=? AND weekday_mask IS NULL", cleared)
+                cur.execute(
+                    "INSERT INTO doctor_availability (doctor_id, date, start_time, end_time, is_available, max_appointments, slot_length_minutes, weekday_mask, valid_until) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)",
+                    (self.doctor_id, first, ns, ne, ma, sl, mask, until),
+                )
+
+            msg = "Weekly hours saved."
+            if cleared: msg += f" Cleared day-specific hours on {len(cleared)} day(s)."
+            win.destroy()
+            messagebox.showinfo("Recurring Hours", msg)
+            self._refresh_calendar()
+            if self.selected_date:
+                self._load_day_data(self.selected_date)
+
+        ctk.CTkButton(win, text="Apply", font=("Inter", 13, "bold"), fg_color="#3b82f6", width=200, command=save).grid(row=8, column=0, columnspan=2, pady=(10, 15))
+
+        # Standing rules, newest first
+        ctk.CTkLabel(win, text="CURRENT WEEKLY HOURS", font=("Inter", 11, "bold"), text_color="#94a3b8").grid(row=9, column=0, columnspan=2, padx=30, sticky="w")
+        rules_frame = ctk.CTkScrollableFrame(win, height=110, fg_color="#1e293b", corner_radius=8)
+        rules_frame.grid(row=10, column=0, columnspan=2, padx=30, pady=(5, 20), sticky="ew")
+
+        def _fmt(t):
+            try: return datetime.strptime(t, "%H:%M").strftime("%I:%M %p").lstrip("0")
+            except: return t
+
+        def _load_rules():
+            for c in rules_frame.winfo_children(): c.destroy()
+            with db_connection() as conn:
+                rules = conn.execute(
+                    "SELECT id, weekday_mask, start_time, end_time, valid_until FROM doctor_availability WHERE doctor_id=? AND weekday_mask IS NOT NULL AND (valid_until IS NULL OR valid_until >= ?) ORDER BY id DESC",
+                    (self.doctor_id, date.today().strftime("%Y-%m-%d")),
+                ).fetchall()
+            if not rules:
+                ctk.CTkLabel(rules_frame, text="None yet.", font=("Inter", 12), text_color="#64748b").pack(anchor="w", padx=10, pady=5)
+            for rid, mask, st, et, until in rules:
+                days_txt = " ".join(name[:2] for i, name in enumerate(calendar.day_abbr) if mask & (1 << i))
+                text = f"{days_txt}   {_fmt(st)} - {_fmt(et)}   " + (f"until {until}" if until else "no end date")
+                row = ctk.CTkFrame(rules_frame, fg_color="#334155", corner_radius=6)
+                row.pack(fill="x", padx=5, pady=2)
+                ctk.CTkLabel(row, text=text, font=("Inter", 12), text_color="white").pack(side="left", padx=10, pady=5)
+                ctk.CTkButton(row, text="Remove", width=60, height=24, font=("Inter", 11), fg_color="#ef4444", hover_color="#b91c1c", command=lambda r=rid: _remove(r)).pack(side="right", padx=10)
+
+        def _remove(rule_id):
+            if not messagebox.askyesno("Confirm", "Remove these weekly hours?"): return
+            self._delete_slot(rule_id)
+            _load_rules()
+            self._refresh_calendar()
+            if self.selected_date:
+                self._load_day_data(self.selected_date)
+
+        _load_rules()
+
     def _delete_slot(self, slot_id: int):
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM doctor_availability WHERE id=?", (slot_id,))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM doctor_availability WHERE id=?", (slot_id,))
@@ -1,11 +1,13 @@
 import customtkinter as ctk
-import sqlite3
 from datetime import datetime
 
-from database import DB_NAME
+from database import db_connection
+from virtual_table import VirtualTable
 
 
 class DoctorRecordsPage(ctk.CTkFrame):
+    tables = ("appointments",)
+
     def __init__(self, master, doctor_name: str):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -122,110 +124,114 @@ class DoctorRecordsPage(ctk.CTkFrame):
         _hlabel(3, "NOTES")
         _hlabel(4, "ACTIONS", "e")
 
-        self.list_frame = ctk.CTkScrollableFrame(list_container, corner_radius=0, fg_color="transparent")
+        self.list_frame = VirtualTable(
+            list_container, self._make_row, self._bind_row, row_height=60,
+            empty_text="No completed appointments found."
+        )
         self.list_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=(10, 10))
-        self.list_frame.grid_columnconfigure(0, weight=1)
 
         self._update_filter_buttons()
         self._load_records()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
+    def refresh(self):
+        self._load_records()
 
     def _load_records(self):
-        for child in self.list_frame.winfo_children():
-            child.destroy()
-
-        conn = self._connect()
-        cur = conn.cursor()
-
-        # Logic: Completed = past or now (schedule <= now)
-        base_query = """
-            SELECT patient_name, schedule, notes
-            FROM appointments
-            WHERE doctor_name = ?
-            AND DATETIME(schedule) <= DATETIME('now')
-        """
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            # Logic: Completed = past or now (schedule <= now)
+            base_query = """
+                SELECT patient_name, schedule, notes
+                FROM appointments
+                WHERE doctor_name = ?
+                AND DATETIME(schedule) <= DATETIME('now')
+            """
         
-        params = [self.doctor_name]
+            params = [self.doctor_name]
 
-        if self.filter_mode == "today":
-            base_query += " AND DATE(schedule) = DATE('now')"
-        # recent/all logic same base
+            if self.filter_mode == "today":
+                base_query += " AND schedule_date = DATE('now')"
+            # recent/all logic same base
         
-        base_query += " ORDER BY DATETIME(schedule) DESC"
+            base_query += " ORDER BY DATETIME(schedule) DESC"
 
-        if self.filter_mode == "recent":
-             base_query += " LIMIT 20"
+            if self.filter_mode == "recent":
+                 base_query += " LIMIT 20"
 
-        cur.execute(base_query, tuple(params))
-        rows = cur.fetchall()
-        conn.close()
+            cur.execute(base_query, tuple(params))
+            rows = cur.fetchall()
 
-        if not rows:
-            ctk.CTkLabel(
-                self.list_frame,
-                text="No completed appointments found.",
-                font=("Inter", 14),
-                text_color="#64748b"
-            ).pack(pady=40)
-            return
+        self.list_frame.set_records(rows)
 
-        for idx, (patient, schedule_str, notes) in enumerate(rows):
-            try:
-                dt = datetime.strptime(schedule_str, "%Y-%m-%d %H:%M")
-                pretty_date = dt.strftime("%b %d, %Y")
-                pretty_time = dt.strftime("%I:%M %p")
-            except Exception:
-                pretty_date = schedule_str
-                pretty_time = ""
-
-            # Row Card -> Slate 700 with outline
-            row = ctk.CTkFrame(
-                self.list_frame, 
-                corner_radius=8, 
-                fg_color="#334155", 
-                border_width=1, 
-                border_color="#475569",
-                height=50
-            )
-            row.pack(fill="x", pady=5, padx=5)
-            
-            row.grid_columnconfigure(0, weight=1)
-            row.grid_columnconfigure(1, weight=1)
-            row.grid_columnconfigure(2, weight=2)
-            row.grid_columnconfigure(3, weight=2)
-            row.grid_columnconfigure(4, weight=0, minsize=100)
-
-            # Date
-            ctk.CTkLabel(row, text=pretty_date, font=("Inter", 13, "bold"), text_color="white", anchor="w").grid(row=0, column=0, padx=15, pady=12, sticky="ew")
-            # Time
-            ctk.CTkLabel(row, text=pretty_time, font=("Inter", 13), text_color="#cbd5e1", anchor="w").grid(row=0, column=1, padx=10, sticky="ew")
-            # Patient
-            ctk.CTkLabel(row, text=patient, font=("Inter", 13), text_color="white", anchor="w").grid(row=0, column=2, padx=10, sticky="ew")
-            
-            # Notes (Truncated) display as plain text or icon? Text is better for records.
-            note_txt = (notes[:50] + "...") if notes and len(notes) > 50 else (notes or "-")
-            ctk.CTkLabel(row, text=note_txt, font=("Inter", 12), text_color="#94a3b8", anchor="w").grid(row=0, column=3, padx=10, sticky="ew")
+    def _make_row(self, parent):
+        # Row Card -> Slate 700 with outline
+        row = ctk.CTkFrame(
+            parent,
+            corner_radius=8,
+            fg_color="#334155",
+            border_width=1,
+            border_color="#475569",
+            height=50
+        )
+        row.grid_rowconfigure(0, weight=1)
+        row.grid_columnconfigure(0, weight=1)
+        row.grid_columnconfigure(1, weight=1)
+        row.grid_columnconfigure(2, weight=2)
+        row.grid_columnconfigure(3, weight=2)
+        row.grid_columnconfigure(4, weight=0, minsize=100)
+        row.record = None
+
+        # Date
+        row.date_label = ctk.CTkLabel(row, text="", font=("Inter", 13, "bold"), text_color="white", anchor="w")
+        row.date_label.grid(row=0, column=0, padx=15, sticky="ew")
+        # Time
+        row.time_label = ctk.CTkLabel(row, text="", font=("Inter", 13), text_color="#cbd5e1", anchor="w")
+        row.time_label.grid(row=0, column=1, padx=10, sticky="ew")
+        # Patient
+        row.patient_label = ctk.CTkLabel(row, text="", font=("Inter", 13), text_color="white", anchor="w")
+        row.patient_label.grid(row=0, column=2, padx=10, sticky="ew")
+        # Notes (Truncated)
+        row.notes_label = ctk.CTkLabel(row, text="", font=("Inter", 12), text_color="#94a3b8", anchor="w")
+        row.notes_label.grid(row=0, column=3, padx=10, sticky="ew")
+
+        # Actions
+        actions_panel = ctk.CTkFrame(row, fg_color="transparent")
+        actions_panel.grid(row=0, column=4, padx=10, sticky="e")
+
+        btn = ctk.CTkButton(
+            actions_panel,
+            text="Details",
+            width=60,
+            height=28,
+            font=("Inter", 12),
+            fg_color="transparent",
+            border_width=1,
+            border_color="#3b82f6",
+            text_color="#3b82f6",
+            hover_color=("#1e293b", "#0f172a"),
+            command=lambda: self._open_details(*row.record)
+        )
+        btn.pack(side="right")
 
-            # Actions
-            actions_panel = ctk.CTkFrame(row, fg_color="transparent")
-            actions_panel.grid(row=0, column=4, padx=10, sticky="e")
-            
-            btn = ctk.CTkButton(
-                actions_panel,
-                text="Details",
-                width=60,
-                height=28,
-                font=("Inter", 12),
-                fg_color="transparent",
-                border_width=1,
-                border_color="#3b82f6",
-                text_color="#3b82f6",
-                hover_color=("#1e293b", "#0f172a"),
-                command=lambda p=patient, s=schedule_str, n=notes: self._open_details(p, s, n)
-            )
-            btn.pack(side="right")
+        return row
+
+    def _bind_row(self, row, rec):
+        patient, schedule_str, notes = rec
+        row.record = rec
+        try:
+            dt = datetime.strptime(schedule_str, "%Y-%m-%d %H:%M")
+            pretty_date = dt.strftime("%b %d, %Y")
+            pretty_time = dt.strftime("%I:%M %p")
+        except Exception:
+            pretty_date = schedule_str
+            pretty_time = ""
+
+        note_txt = (notes[:50] + "...") if notes and len(notes) > 50 else (notes or "-")
+        row.date_label.configure(text=pretty_date)
+        row.time_label.configure(text=pretty_time)
+        row.patient_label.configure(text=patient)
+        row.notes_label.configure(text=note_txt)
 
     def _set_filter(self, mode: str):
         if mode not in {"recent", "today", "all"}:
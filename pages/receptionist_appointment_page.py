@@ -1,14 +1,24 @@
 import customtkinter as ctk
-import sqlite3
 import calendar
 from datetime import datetime, timedelta, date
 from uuid import uuid4
 import os
 
 from tkinter import messagebox, filedialog
-from database import DB_NAME, log_activity
+from database import DB_NAME, db_connection, get_services, log_activity, run_write, service_label
+from scheduling import book_appointment, day_slots, month_availability, next_available
+from calendar_grid import CalendarGrid
+from receipt_queue import get_receipt_queue
+
+# Look-ahead choices in the "Find next available" window
+NEXT_AVAILABLE_RANGES = {"Next 7 days": 7, "Next 14 days": 14, "Next 30 days": 30, "Next 90 days": 90}
+
 
 class ReceptionistAppointmentPage(ctk.CTkFrame):
+    tables = ("appointments", "doctors", "doctor_availability")
+    # Refreshing would drop a half-picked slot, so only reload when the page is reopened
+    auto_refresh = False
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
         
@@ -129,11 +139,15 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         self.appt_cal_next_btn = ctk.CTkButton(cal_container, text=">", width=32, height=32, command=self._appt_next_month, fg_color="#334155", hover_color="#475569")
         self.appt_cal_next_btn.grid(row=0, column=2, padx=(5, 0))
 
+        ctk.CTkButton(cal_container, text="Find next available", height=32, font=("Inter", 12, "bold"), fg_color="#3b82f6", hover_color="#2563eb", command=self._open_next_available).grid(row=0, column=3, padx=(12, 0))
+
         # Inline Calendar Grid
-        self.appt_calendar_frame = ctk.CTkFrame(form, corner_radius=12, fg_color="#0f172a", border_width=1, border_color="#334155")
+        self.appt_calendar_frame = CalendarGrid(
+            form, on_pick=self._pick_appt_day, cell_size=32, cell_font=("Inter", 12), cell_pad=3,
+            header_color="#cbd5e1", header_pady=6,
+            corner_radius=12, fg_color="#0f172a", border_width=1, border_color="#334155",
+        )
         self.appt_calendar_frame.grid(row=2, column=0, columnspan=2, padx=20, pady=8, sticky="nsew")
-        for col in range(7):
-            self.appt_calendar_frame.grid_columnconfigure(col, weight=1)
 
         # Time Slots
         self.slots_section_wrapper = ctk.CTkFrame(form, fg_color="transparent")
@@ -180,29 +194,13 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         # Init state
         self.selected_schedule = None
         self._selected_slot_btn = None
+        self._slot_buttons = {}
         self.available_dates = []
         self.current_date_index = None
 
-        services = [
-            "General Consultation - 400 PHP", "Pediatrics Consultation - 450 PHP", "Internal Medicine - 500 PHP",
-            "Cardiology Consultation - 800 PHP", "OB-GYN Consultation - 700 PHP", "Dermatology Consultation - 600 PHP",
-            "ENT Consultation - 550 PHP", "Orthopedic Consultation - 750 PHP", "Ophthalmology Consultation - 500 PHP",
-            "Dental Consultation - 350 PHP", "CBC (Complete Blood Count) - 250 PHP", "Urinalysis - 150 PHP",
-            "Stool Examination - 150 PHP", "Fasting Blood Sugar (FBS) - 200 PHP", "HbA1c - 800 PHP",
-            "Lipid Profile - 700 PHP", "Creatinine Test - 300 PHP", "BUN (Blood Urea Nitrogen) - 250 PHP",
-            "Liver Function Test (LFT) - 500 PHP", "TSH / Thyroid Test - 700 PHP", "Chest X-Ray (PA View) - 650 PHP",
-            "Lumbar X-Ray - 800 PHP", "Ultrasound – Whole Abdomen - 1000 PHP", "Ultrasound – Pelvic / OB - 900 PHP",
-            "Ultrasound – Thyroid - 800 PHP", "2D Echo - 2500 PHP", "ECG - 600 PHP", "CT Scan (Plain) - 6000 PHP",
-            "MRI (Plain) - 10000 PHP", "Mammogram - 2000 PHP", "Wound Dressing - 300 PHP", "Nebulization - 200 PHP",
-            "Injection Service - 200 PHP", "Suturing (small wound) - 1000 PHP", "Ear Cleaning - 400 PHP",
-            "Incision and Drainage - 800 PHP", "ECG with Interpretation - 800 PHP", "Cast / Splint Application - 1000 PHP",
-            "Pap Smear - 500 PHP", "Pregnancy Test (Urine) - 200 PHP", "Medical Certificate - 250 PHP",
-            "Vital Signs Check - 100 PHP", "ECG Print Request - 150 PHP", "X-Ray CD Copy - 150 PHP",
-            "Laboratory Results Printing - 100 PHP", "Doctor Follow-Up Consultation - 300 PHP",
-            "Teleconsultation - 400 PHP", "Nutritional Counseling - 500 PHP", "Family Planning Consultation - 400 PHP",
-            "Vaccination Service (Service Fee) - 400 PHP",
-        ]
-        self._about_services = services
+        # label -> (service_id, price)
+        self._services = {service_label(name, price): (sid, price) for sid, name, price in get_services()}
+        self._about_services = list(self._services)
         
         today = date.today()
         self.date_month_combo.set(f"{today.month:02d}")
@@ -275,9 +273,6 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
     def _validate_contact_digits(self, new_value: str) -> bool:
         return new_value == "" or new_value.isdigit()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
-
     def _clear_doctor(self):
         try: self.doctor_combo.set("")
         except: pass
@@ -331,62 +326,44 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
 
     def _refresh_appt_calendar(self):
         if not hasattr(self, "appt_calendar_frame"): return
-        for c in self.appt_calendar_frame.winfo_children(): c.destroy()
 
         year = getattr(self, "appt_cal_year", date.today().year)
         month = getattr(self, "appt_cal_month", date.today().month)
         try: self.appt_month_label.configure(text=f"{calendar.month_name[month]} {year}")
         except: pass
-        
-        for i, wd in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
-            ctk.CTkLabel(self.appt_calendar_frame, text=wd, font=("Inter", 12, "bold"), text_color="#cbd5e1").grid(row=0, column=i, pady=6)
 
         today_str = date.today().strftime("%Y-%m-%d")
         
         selected_doctor = self.doctor_combo.get().strip()
-        not_available_days = set()
+        day_counts = {}
 
         if selected_doctor and selected_doctor != "Add doctor first":
-            conn = self._connect()
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM doctors WHERE name = ? AND status = 'active'", (selected_doctor,))
-            row = cur.fetchone()
-            if row:
-                doc_id = row[0]
-                ms = f"{year:04d}-{month:02d}-01"
-                me = f"{year:04d}-{month:02d}-31"
-                cur.execute("SELECT date FROM doctor_availability WHERE doctor_id=? AND date BETWEEN ? AND ? AND start_time IS NULL AND is_available=0", (doc_id, ms, me))
-                not_available_days = {d for (d,) in cur.fetchall()}
-            conn.close()
-
-        cal = calendar.Calendar(firstweekday=0)
-        row_idx = 1
-        for week in cal.monthdayscalendar(year, month):
-            for col, day_num in enumerate(week):
-                if day_num == 0: continue
-                d_str = f"{year:04d}-{month:02d}-{day_num:02d}"
-
-                if d_str < today_str:
-                    fg, hover, state = "#334155", "#334155", "disabled"
-                elif d_str in not_available_days:
-                    fg, hover, state = "#ef4444", "#ef4444", "disabled"
-                else:
-                    fg, hover, state = "#10b981", "#059669", "normal"
-
-                def _pick(ds=d_str):
-                    self.date_entry.delete(0, "end")
-                    self.date_entry.insert(0, ds)
-                    self.current_date_index = None
-                    self._sync_combos_from_date_entry()
-
-                ctk.CTkButton(
-                    self.appt_calendar_frame,
-                    text=str(day_num), width=32, height=32,
-                    fg_color=fg, hover_color=hover, state=state,
-                    command=(None if state=="disabled" else _pick),
-                    font=("Inter", 12)
-                ).grid(row=row_idx, column=col, padx=3, pady=3, sticky="nsew")
-            row_idx += 1
+            with db_connection() as conn:
+                day_counts = month_availability(conn, selected_doctor, year, month)
+
+        def _style(d_str):
+            counts = day_counts.get(d_str, (1, 1))
+            if d_str < today_str:
+                fg, hover, state = "#334155", "#334155", "disabled"
+            elif counts is None:
+                fg, hover, state = "#ef4444", "#ef4444", "disabled"
+            elif counts[0] == 0:
+                # Fully booked
+                fg, hover, state = "#f97316", "#ea580c", "normal"
+            elif counts[0] * 2 < counts[1]:
+                # Less than half the slots left
+                fg, hover, state = "#f59e0b", "#d97706", "normal"
+            else:
+                fg, hover, state = "#10b981", "#059669", "normal"
+            return {"fg_color": fg, "hover_color": hover, "state": state}
+
+        self.appt_calendar_frame.show(year, month, _style)
+
+    def _pick_appt_day(self, ds):
+        self.date_entry.delete(0, "end")
+        self.date_entry.insert(0, ds)
+        self.current_date_index = None
+        self._sync_combos_from_date_entry()
 
     def _sync_date_entry_from_combos(self):
         m = self.date_month_combo.get().strip()
@@ -419,12 +396,20 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         except: pass
         self._load_slots()
 
+    def refresh(self):
+        # Re-read doctors and slots but stay on the doctor being booked
+        doctor = self.doctor_combo.get()
+        self._load_doctors()
+        if doctor in self.doctor_combo.cget("values"):
+            self.doctor_combo.set(doctor)
+            self._load_dates()
+        self._load_slots()
+
     def _load_doctors(self):
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM doctors WHERE status='active' ORDER BY name")
-        names = [r[0] for r in cur.fetchall()]
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT name FROM doctors WHERE status='active' ORDER BY name")
+            names = [r[0] for r in cur.fetchall()]
         if names:
             self.doctor_combo.configure(values=names, state="readonly")
             self.doctor_combo.set(names[0])
@@ -443,6 +428,7 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         for c in self.slots_frame.winfo_children(): c.destroy()
         self.selected_schedule = None
         self._selected_slot_btn = None
+        self._slot_buttons = {}
         if hasattr(self, "slot_summary_label"): self.slot_summary_label.configure(text="No time selected.")
         
         date_str = self.date_entry.get().strip()
@@ -456,60 +442,116 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         doc = self.doctor_combo.get().strip()
         if not doc: return
 
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT a.start_time, a.end_time 
-            FROM doctor_availability a 
-            JOIN doctors d ON d.id=a.doctor_id 
-            WHERE a.date=? AND d.name=? AND a.is_available=1 AND a.start_time IS NOT NULL AND d.status='active'
-            ORDER BY a.start_time
-        """, (date_str, doc))
-        windows = cur.fetchall()
-        if not windows: windows = [("09:00", "17:00")]
+        with db_connection() as conn:
+            slots = day_slots(conn, doc, date_str)
 
         self.slots_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
-        r, c = 0, 0
-        
-        for start_t, end_t in windows:
-            try:
-                rs = datetime.strptime(f"{date_str} {start_t}", "%Y-%m-%d %H:%M")
-                re = datetime.strptime(f"{date_str} {end_t}", "%Y-%m-%d %H:%M")
-            except: continue
-            
-            curr = rs
-            step = timedelta(hours=2)
-            while curr + step <= re:
-                 time_24 = curr.strftime("%H:%M")
-                 ok, _ = self._is_time_available_for_two_hours(doc, date_str, time_24)
-                 sch_str = curr.strftime("%Y-%m-%d %H:%M")
-                 
-                 cur.execute("SELECT COUNT(*) FROM appointments WHERE doctor_name=? AND schedule=?", (doc, sch_str))
-                 cnt = cur.fetchone()[0]
-                 rem = max(0, 1 - int(cnt))
-                 
-                 label = f"{curr.strftime('%I:%M %p').lstrip('0')} - {(curr+step).strftime('%I:%M %p').lstrip('0')}"
-                 
-                 if not ok or rem <= 0:
-                     fg, hover, state = "#334155", "#334155", "disabled"
-                 else:
-                     fg, hover, state = "#1e293b", "#334155", "normal"
-                 
-                 btn = ctk.CTkButton(
-                     self.slots_frame, text=label, font=("Inter", 12),
-                     fg_color=fg, hover_color=hover, state=state,
-                     border_width=1, border_color="#475569", height=32
-                 )
-                 if state == "normal":
-                     btn._base_fg_color = fg
-                     btn.configure(command=lambda s=sch_str, b=btn, d=doc: self._select_slot(s, b, d))
-                 
-                 btn.grid(row=r, column=c, padx=4, pady=4, sticky="ew")
-                 c += 1
-                 if c >= 4:
-                     c = 0; r += 1
-                 curr += step
-        conn.close()
+        if not slots:
+            ctk.CTkLabel(self.slots_frame, text="Doctor is not available on this day.", font=("Inter", 12), text_color="#94a3b8").grid(row=0, column=0, columnspan=4, pady=10)
+            return
+
+        for i, slot in enumerate(slots):
+            label = f"{slot.start.strftime('%I:%M %p').lstrip('0')} - {slot.end.strftime('%I:%M %p').lstrip('0')}"
+            if slot.capacity > 1 and slot.available:
+                label += f"  ({slot.remaining} left)"
+
+            if not slot.available:
+                fg, hover, state = "#334155", "#334155", "disabled"
+            else:
+                fg, hover, state = "#1e293b", "#334155", "normal"
+
+            btn = ctk.CTkButton(
+                self.slots_frame, text=label, font=("Inter", 12),
+                fg_color=fg, hover_color=hover, state=state,
+                border_width=1, border_color="#475569", height=32
+            )
+            if state == "normal":
+                btn._base_fg_color = fg
+                btn.configure(command=lambda s=slot.schedule, b=btn, d=doc: self._select_slot(s, b, d))
+                self._slot_buttons[slot.schedule] = btn
+
+            btn.grid(row=i // 4, column=i % 4, padx=4, pady=4, sticky="ew")
+
+    def _open_next_available(self):
+        with db_connection() as conn:
+            specialties = [row[0] for row in conn.execute(
+                "SELECT DISTINCT specialty FROM doctors WHERE status = 'active' AND COALESCE(specialty, '') != '' ORDER BY specialty"
+            )]
+
+        master = self.winfo_toplevel()
+        win = ctk.CTkToplevel(master)
+        win.title("Next available")
+        win.geometry("460x460")
+        win.resizable(False, False)
+        win.transient(master)
+        win.grab_set()
+        win.configure(fg_color="#0f172a")
+
+        win.grid_rowconfigure(2, weight=1)
+        win.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(win, text="Next Available Slots", font=("Inter", 16, "bold"), text_color="white").grid(row=0, column=0, padx=16, pady=(16, 8), sticky="w")
+
+        # Filters: doctor specialty and how far ahead to look
+        filters = ctk.CTkFrame(win, fg_color="transparent")
+        filters.grid(row=1, column=0, padx=16, pady=(0, 8), sticky="ew")
+        specialty_combo = ctk.CTkComboBox(filters, values=["Any specialty", *specialties], width=170, font=("Inter", 12))
+        specialty_combo.set("Any specialty")
+        specialty_combo.pack(side="left")
+        range_combo = ctk.CTkComboBox(filters, values=list(NEXT_AVAILABLE_RANGES), state="readonly", width=130, font=("Inter", 12))
+        range_combo.set("Next 30 days")
+        range_combo.pack(side="left", padx=8)
+
+        list_frame = ctk.CTkScrollableFrame(win, corner_radius=10, fg_color="#1e293b")
+        list_frame.grid(row=2, column=0, padx=16, pady=(0, 16), sticky="nsew")
+        list_frame.grid_columnconfigure(0, weight=1)
+
+        def _choose(doctor, slot):
+            win.destroy()
+            self._jump_to_slot(doctor, slot)
+
+        def _search():
+            for child in list_frame.winfo_children():
+                child.destroy()
+            specialty = specialty_combo.get().strip()
+            if specialty == "Any specialty":
+                specialty = None
+            days = NEXT_AVAILABLE_RANGES.get(range_combo.get(), 30)
+            today = date.today()
+            with db_connection() as conn:
+                results = next_available(conn, today, today + timedelta(days=days), limit=10, specialty=specialty)
+
+            if not results:
+                ctk.CTkLabel(list_frame, text=f"No free slots in the next {days} days.", font=("Inter", 13), text_color="#94a3b8").grid(row=0, column=0, pady=20)
+
+            for idx, (doctor, slot) in enumerate(results):
+                text = f"{slot.start.strftime('%a %b %d')} · {slot.start.strftime('%I:%M %p').lstrip('0')} · Dr. {doctor}"
+                ctk.CTkButton(
+                    list_frame, text=text, font=("Inter", 13), fg_color="#334155", hover_color="#475569",
+                    height=32, anchor="w", command=lambda d=doctor, s=slot: _choose(d, s),
+                ).grid(row=idx, column=0, padx=4, pady=2, sticky="ew")
+
+        ctk.CTkButton(filters, text="Search", width=80, height=28, font=("Inter", 12, "bold"), fg_color="#3b82f6", hover_color="#2563eb", command=_search).pack(side="left")
+        _search()
+
+        try:
+             mx = master.winfo_rootx() + (master.winfo_width() - 460)//2
+             my = master.winfo_rooty() + (master.winfo_height() - 460)//2
+             win.geometry(f"460x460+{mx}+{my}")
+        except: pass
+
+    def _jump_to_slot(self, doctor, slot):
+        self.doctor_combo.set(doctor)
+        self.appt_cal_year = slot.start.year
+        self.appt_cal_month = slot.start.month
+        self._refresh_appt_calendar()
+        self.date_entry.delete(0, "end")
+        self.date_entry.insert(0, slot.start.strftime("%Y-%m-%d"))
+        self.current_date_index = None
+        self._sync_combos_from_date_entry()
+        btn = self._slot_buttons.get(slot.schedule)
+        if btn is not None:
+            self._select_slot(slot.schedule, btn, doctor)
 
     def _select_slot(self, sch_str, btn, doctor):
         if self._selected_slot_btn is btn:
@@ -529,25 +571,6 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         ts = datetime.strptime(sch_str, "%Y-%m-%d %H:%M").strftime("%I:%M %p")
         self.slot_summary_label.configure(text=f"Selected: {doctor} · {sch_str.split()[0]} {ts}", text_color="#10b981")
 
-    def _is_time_available_for_two_hours(self, doctor, date_str, time_24):
-         # Simplified re-check
-         conn = self._connect()
-         cur = conn.cursor()
-         try:
-             start = datetime.strptime(f"{date_str} {time_24}", "%Y-%m-%d %H:%M")
-             end = start + timedelta(hours=2)
-             if start < datetime.now(): return False, "Past"
-             
-             # Overlap check
-             cur.execute("SELECT schedule FROM appointments WHERE doctor_name=? AND schedule LIKE ?", (doctor, f"{date_str} %"))
-             for (ex,) in cur.fetchall():
-                 est = datetime.strptime(ex, "%Y-%m-%d %H:%M")
-                 een = est + timedelta(hours=2)
-                 if start < een and end > est: return False, "Overlap"
-             return True, ""
-         except: return False, "Error"
-         finally: conn.close()
-
     def save_appointment(self):
         doc = self.doctor_combo.get().strip()
         pat = self.patient_entry.get().strip()
@@ -612,21 +635,30 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
         ctk.CTkButton(actions, text="Confirm Booking", fg_color="#10b981", hover_color="#059669", font=("Inter", 13, "bold"), width=160, command=lambda: self._finalize(win, data)).pack(side="left")
 
     def _finalize(self, win, data):
-        conn = self._connect()
-        cur = conn.cursor()
         notes = f"Contact: {data['contact']} | Address: {data['address']} | About: {data['about']}"
         if data['free_text']: notes += f" | Notes: {data['free_text']}"
         
+        service_id, price = self._services.get(data['about'], (None, None))
+
+        columns = {
+            "patient_name": data['patient'], "notes": notes, "barcode": data['barcode'],
+            "contact": data['contact'], "address": data['address'], "service_id": service_id, "price": price,
+        }
         try:
-            cur.execute("INSERT INTO appointments (patient_name, doctor_name, schedule, notes, barcode) VALUES (?, ?, ?, ?, ?)",
-                        (data['patient'], data['doctor'], data['schedule_str'], notes, data['barcode']))
-            conn.commit()
-            log_activity("receptionist", "receptionist", "book_appointment", f"Booked for {data['patient']}")
+            # The slot is re-checked inside the insert: another station may have taken it since it was shown
+            appt_id = run_write(lambda conn: book_appointment(conn, data['doctor'], data['schedule_str'], columns))
         except Exception as e:
             messagebox.showerror("Error", f"Failed: {e}")
             return
-        finally: conn.close()
-        
+
+        if appt_id is None:
+            win.destroy()
+            messagebox.showwarning("Slot Taken", "That time was just booked at another station. Please pick another slot.")
+            self._refresh_appt_calendar()
+            self._load_slots()
+            return
+
+        log_activity("receptionist", "receptionist", "book_appointment", f"Booked for {data['patient']}")
         win.destroy()
         self._show_receipt(data)
         self._clear_form()
@@ -685,9 +717,15 @@ class ReceptionistAppointmentPage(ctk.CTkFrame):
                 "Thank you!"
             ]
             
-            _write_receipt_image(filepath, lines)
-            messagebox.showinfo("Saved", f"Receipt saved to:\n{filepath}")
+            def _saved(path, error):
+                if error is not None:
+                    messagebox.showerror("Error", f"Could not save receipt: {error}")
+                else:
+                    messagebox.showinfo("Saved", f"Receipt saved to:\n{path}")
+
+            # Rendered on the receipt queue's worker, so the next booking can start right away
             win.destroy()
+            get_receipt_queue().submit(_write_receipt_image, filepath, lines, widget=self, on_done=_saved)
 
         ctk.CTkButton(btn_frame, text="Save Receipt", command=_save_receipt, width=120, fg_color="#334155").pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Close", command=win.destroy, width=80, fg_color="#ef4444").pack(side="left", padx=5)
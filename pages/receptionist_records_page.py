@@ -1,16 +1,19 @@
 import customtkinter as ctk
-import sqlite3
 import csv
 import calendar
 from datetime import datetime, date
 
 from tkinter import filedialog, messagebox, Menu
-from database import DB_NAME
+from database import db_connection, run_write, search_appointments, service_label
+from scheduling import day_slots, reschedule_appointment
+from virtual_table import VirtualTable
 
 
 class ReceptionistRecordsPage(ctk.CTkFrame):
     """Receptionist view of all appointment records, with rescheduling access."""
 
+    tables = ("appointments",)
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -48,7 +51,7 @@ class ReceptionistRecordsPage(ctk.CTkFrame):
 
         self.search_entry = ctk.CTkEntry(
             actions_frame,
-            placeholder_text="Search patient or doctor...",
+            placeholder_text="Search patient, phone, service...",
             width=200,
             height=36,
             corner_radius=8,
@@ -117,11 +120,9 @@ class ReceptionistRecordsPage(ctk.CTkFrame):
         _hlabel(4, "STATUS")
         _hlabel(5, "ACTIONS", "e")
 
-        self.table_frame = ctk.CTkScrollableFrame(list_container, corner_radius=0, fg_color="transparent")
+        self.table_frame = VirtualTable(list_container, self._make_row, self._bind_row, row_height=60)
         self.table_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=(10, 10))
-        self.table_frame.grid_columnconfigure(0, weight=1)
 
-        self.records = []
         self.reload_records()
 
     def clear_filters(self):
@@ -129,100 +130,97 @@ class ReceptionistRecordsPage(ctk.CTkFrame):
         self.apply_filters()
 
     def reload_records(self):
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        # Fetch fields needed for display + editing: id, patient, doctor, schedule, notes, barcode, is_paid, amount_paid
-        cur.execute(
-            """
-            SELECT id, patient_name, doctor_name, schedule, notes, barcode, COALESCE(is_paid, 0), COALESCE(amount_paid, 0) 
-            FROM appointments ORDER BY id DESC
-            """
-        )
-        self.records = cur.fetchall()
-        conn.close()
         self.apply_filters()
 
-    def get_filtered_records(self):
-        query = self.search_entry.get().strip().lower()
-        filtered = []
-        for rec in self.records:
-            rid, patient, doctor, schedule, notes, barcode, is_paid, amount = rec
-            haystack = f"{patient} {doctor} {barcode or ''}".lower()
-            if query and query not in haystack:
-                continue
-            filtered.append(rec)
-        return filtered
-
-    def apply_filters(self):
-        for child in self.table_frame.winfo_children():
-            child.destroy()
+    def get_filtered_records(self, before_id=None, limit=None):
+        # id, patient, doctor, schedule, notes, barcode, is_paid, amount_paid
+        return search_appointments(
+            "id, patient_name, doctor_name, schedule, notes, barcode, COALESCE(is_paid, 0), COALESCE(amount_paid, 0)",
+            self.search_entry.get(),
+            before_id=before_id,
+            limit=limit,
+        )
 
-        filtered = self.get_filtered_records()
+    def apply_filters(self, keep_position: bool = False):
+        self.table_frame.set_source(lambda last, limit: self.get_filtered_records(last[0] if last else None, limit), keep_position=keep_position)
 
-        for row_index, rec in enumerate(filtered):
-            rid, patient, doctor, schedule, notes, barcode, is_paid, amount = rec
-            
-            row_frame = ctk.CTkFrame(
-                self.table_frame, 
-                corner_radius=8,
-                fg_color="#334155", 
-                border_width=1,
-                border_color="#475569",
-                height=50
-            ) 
-            row_frame.grid(row=row_index, column=0, sticky="ew", pady=5, padx=5)
-            
-            row_frame.grid_columnconfigure(0, weight=0, minsize=60)
-            row_frame.grid_columnconfigure((1, 2, 3), weight=1, uniform="data_cols")
-            row_frame.grid_columnconfigure(4, weight=0, minsize=100)
-            row_frame.grid_columnconfigure(5, weight=0, minsize=100)
+    def refresh(self):
+        self.apply_filters(keep_position=True)
 
-            # ID
-            ctk.CTkLabel(row_frame, text=str(rid), font=("Inter", 12), text_color="#cbd5e1", anchor="w").grid(row=0, column=0, sticky="ew", padx=10, pady=10)
-            
-            # Patient
-            ctk.CTkLabel(row_frame, text=patient, font=("Inter", 13, "bold"), text_color="white", anchor="w").grid(row=0, column=1, sticky="ew", padx=10)
-            
-            # Doctor
-            ctk.CTkLabel(row_frame, text=f"Dr. {doctor}", font=("Inter", 13), text_color="#94a3b8", anchor="w").grid(row=0, column=2, sticky="ew", padx=10)
-            
-            # Schedule
-            pretty_schedule = self._format_schedule(schedule)
-            ctk.CTkLabel(row_frame, text=pretty_schedule, font=("Inter", 12), text_color="#cbd5e1", anchor="w").grid(row=0, column=3, sticky="ew", padx=10)
-            
-            # Status
-            status_text = "PAID" if is_paid else "UNPAID"
-            status_color = "#10b981" if is_paid else "#ef4444" 
-            ctk.CTkLabel(row_frame, text=status_text, font=("Inter", 11, "bold"), text_color=status_color, anchor="w").grid(row=0, column=4, sticky="ew", padx=10)
-
-            # Actions
-            actions_panel = ctk.CTkFrame(row_frame, fg_color="transparent")
-            actions_panel.grid(row=0, column=5, sticky="e", padx=10)
-
-            def _action_btn(txt, color, cmd):
-                return ctk.CTkButton(
-                    actions_panel,
-                    text=txt,
-                    width=40,
-                    height=24,
-                    font=("Inter", 11),
-                    fg_color="transparent",
-                    border_width=1,
-                    border_color=color,
-                    text_color=color,
-                    hover_color=("#1e293b", "#0f172a"),
-                    command=cmd
-                )
-
-            view_btn = _action_btn("View", "#3b82f6", lambda r=rec: self._view_details(r))
-            view_btn.pack(side="left", padx=2)
-
-            edit_btn = _action_btn("Edit", "#10b981", lambda r=rec: self._edit_record(r))
-            edit_btn.pack(side="left", padx=2)
-
-            # Separator inside
-            ctk.CTkFrame(row_frame, height=1, fg_color="#334155").place(relx=0, rely=0.98, relwidth=1.0)
+    def _make_row(self, parent):
+        row_frame = ctk.CTkFrame(
+            parent,
+            corner_radius=8,
+            fg_color="#334155",
+            border_width=1,
+            border_color="#475569",
+            height=50
+        )
+        row_frame.grid_rowconfigure(0, weight=1)
+        row_frame.grid_columnconfigure(0, weight=0, minsize=60)
+        row_frame.grid_columnconfigure((1, 2, 3), weight=1, uniform="data_cols")
+        row_frame.grid_columnconfigure(4, weight=0, minsize=100)
+        row_frame.grid_columnconfigure(5, weight=0, minsize=100)
+        row_frame.record = None
+
+        # ID
+        row_frame.id_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 12), text_color="#cbd5e1", anchor="w")
+        row_frame.id_label.grid(row=0, column=0, sticky="ew", padx=10)
 
+        # Patient
+        row_frame.patient_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 13, "bold"), text_color="white", anchor="w")
+        row_frame.patient_label.grid(row=0, column=1, sticky="ew", padx=10)
+
+        # Doctor
+        row_frame.doctor_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 13), text_color="#94a3b8", anchor="w")
+        row_frame.doctor_label.grid(row=0, column=2, sticky="ew", padx=10)
+
+        # Schedule
+        row_frame.schedule_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 12), text_color="#cbd5e1", anchor="w")
+        row_frame.schedule_label.grid(row=0, column=3, sticky="ew", padx=10)
+
+        # Status
+        row_frame.status_label = ctk.CTkLabel(row_frame, text="", font=("Inter", 11, "bold"), anchor="w")
+        row_frame.status_label.grid(row=0, column=4, sticky="ew", padx=10)
+
+        # Actions
+        actions_panel = ctk.CTkFrame(row_frame, fg_color="transparent")
+        actions_panel.grid(row=0, column=5, sticky="e", padx=10)
+
+        def _action_btn(txt, color, cmd):
+            return ctk.CTkButton(
+                actions_panel,
+                text=txt,
+                width=40,
+                height=24,
+                font=("Inter", 11),
+                fg_color="transparent",
+                border_width=1,
+                border_color=color,
+                text_color=color,
+                hover_color=("#1e293b", "#0f172a"),
+                command=cmd
+            )
+
+        view_btn = _action_btn("View", "#3b82f6", lambda: self._view_details(row_frame.record))
+        view_btn.pack(side="left", padx=2)
+
+        edit_btn = _action_btn("Edit", "#10b981", lambda: self._edit_record(row_frame.record))
+        edit_btn.pack(side="left", padx=2)
+
+        return row_frame
+
+    def _bind_row(self, row_frame, rec):
+        rid, patient, doctor, schedule, notes, barcode, is_paid, amount = rec
+        row_frame.record = rec
+        row_frame.id_label.configure(text=str(rid))
+        row_frame.patient_label.configure(text=patient)
+        row_frame.doctor_label.configure(text=f"Dr. {doctor}")
+        row_frame.schedule_label.configure(text=self._format_schedule(schedule))
+        row_frame.status_label.configure(
+            text="PAID" if is_paid else "UNPAID",
+            text_color="#10b981" if is_paid else "#ef4444",
+        )
 
     def _format_schedule(self, schedule_str: str) -> str:
         try:
@@ -341,11 +339,10 @@ class ReceptionistRecordsPage(ctk.CTkFrame):
         ctk.CTkLabel(win, text="Doctor", font=lbl_font, text_color="#94a3b8").grid(row=2, column=0, padx=24, pady=8, sticky="w")
         doctor_combo = ctk.CTkComboBox(win, state="readonly", fg_color=input_bg, border_color=input_border, text_color="white", dropdown_fg_color=input_bg)
         
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM doctors WHERE status = 'active' ORDER BY name")
-        doctor_names = [row[0] for row in cur.fetchall()]
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT name FROM doctors WHERE status = 'active' ORDER BY name")
+            doctor_names = [row[0] for row in cur.fetchall()]
         
         if doctor_names:
             doctor_combo.configure(values=doctor_names)
@@ -420,59 +417,36 @@ class ReceptionistRecordsPage(ctk.CTkFrame):
             d_str = date_entry.get()
             if not doc or not d_str: return
 
-            conn = sqlite3.connect(DB_NAME)
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM doctors WHERE name=? AND status='active'", (doc,))
-            row = cur.fetchone()
-            if not row: conn.close(); return
-            did = row[0]
+            try:
+                datetime.strptime(d_str, "%Y-%m-%d")
+            except ValueError:
+                return
 
-            cur.execute("SELECT start_time, end_time, slot_length_minutes FROM doctor_availability WHERE doctor_id=? AND date=? AND is_available=1 AND start_time IS NOT NULL ORDER BY start_time", (did, d_str))
-            avails = cur.fetchall()
-            
-            from datetime import timedelta
-            row_idx, col_idx = 0, 0
-            
-            for s, e, slen in avails:
-                try:
-                    s_dt = datetime.strptime(f"{d_str} {s}", "%Y-%m-%d %H:%M")
-                    e_dt = datetime.strptime(f"{d_str} {e}", "%Y-%m-%d %H:%M")
-                except: continue
-                
-                curr = s_dt
-                step = slen if slen else 30 
-                
-                while curr < e_dt:
-                    slot_str = curr.strftime("%Y-%m-%d %H:%M")
-                    # Check overlap (excluding self)
-                    cur.execute("SELECT COUNT(*) FROM appointments WHERE doctor_name=? AND schedule=? AND id!=?", (doc, slot_str, rid))
-                    busy = cur.fetchone()[0] > 0
-                    
-                    btn_txt = curr.strftime("%H:%M")
-                    
-                    if not busy:
-                        def _pick(ss=slot_str, b=None):
-                            selected_schedule["value"] = ss
-                            # Visual update
-                            for child in slots_frame.winfo_children():
-                                if getattr(child, "_is_slot", False):
-                                   child.configure(fg_color="#10b981")
-                            if b: b.configure(fg_color="#3b82f6")
-
-                        btn = ctk.CTkButton(slots_frame, text=btn_txt, width=80, height=30, fg_color="#10b981", hover_color="#059669")
-                        btn.configure(command=lambda s=slot_str, b=btn: _pick(s, b))
-                        btn._is_slot = True
-                    else:
-                        btn = ctk.CTkButton(slots_frame, text=btn_txt, width=80, height=30, fg_color="#334155", state="disabled")
-                    
-                    btn.grid(row=row_idx, column=col_idx, padx=4, pady=4)
-                    col_idx += 1
-                    if col_idx > 3: 
-                        col_idx=0; row_idx+=1
-                    
-                    curr += timedelta(minutes=step)
-
-            conn.close()
+            # Same slot engine as the booking page; this appointment's own slot counts as free.
+            # The day's interval index is cached, so the re-check on save skips the reload
+            # unless something was booked, moved or deleted meanwhile.
+            with db_connection() as conn:
+                if conn.execute("SELECT 1 FROM doctors WHERE name=? AND status='active'", (doc,)).fetchone() is None:
+                    return
+                slots = day_slots(conn, doc, d_str, exclude_id=rid)
+
+            def _pick(ss, b):
+                selected_schedule["value"] = ss
+                # Visual update
+                for child in slots_frame.winfo_children():
+                    if getattr(child, "_is_slot", False):
+                        child.configure(fg_color="#10b981")
+                b.configure(fg_color="#3b82f6")
+
+            for i, slot in enumerate(slots):
+                btn_txt = slot.start.strftime("%H:%M")
+                if slot.available:
+                    btn = ctk.CTkButton(slots_frame, text=btn_txt, width=80, height=30, fg_color="#10b981", hover_color="#059669")
+                    btn.configure(command=lambda s=slot.schedule, b=btn: _pick(s, b))
+                    btn._is_slot = True
+                else:
+                    btn = ctk.CTkButton(slots_frame, text=btn_txt, width=80, height=30, fg_color="#334155", state="disabled")
+                btn.grid(row=i // 4, column=i % 4, padx=4, pady=4)
 
         doctor_combo.configure(command=lambda x: load_slots())
         # Manual trigger
@@ -529,11 +503,20 @@ class ReceptionistRecordsPage(ctk.CTkFrame):
             if n: parts.append(f"Notes: {n}")
             final_notes = " | ".join(parts)
 
-            conn = sqlite3.connect(DB_NAME)
-            cur = conn.cursor()
-            cur.execute("UPDATE appointments SET patient_name=?, doctor_name=?, schedule=?, notes=?, is_rescheduled=1 WHERE id=?", (p, d, s, final_notes, rid))
-            conn.commit()
-            conn.close()
+            def _save(conn):
+                columns = {"patient_name": p, "notes": final_notes, "contact": c or None, "address": a or None, "is_rescheduled": 1}
+                # Switching to another listed service also moves the structured service/price
+                if ab != meta.get("About", ""):
+                    for sid, name, price in conn.execute("SELECT id, name, price FROM services").fetchall():
+                        if service_label(name, price) == ab:
+                            columns.update(service_id=sid, price=price)
+                            break
+                return reschedule_appointment(conn, rid, d, s, columns)
+
+            if not run_write(_save):
+                messagebox.showwarning("Slot Taken", "That time was just booked at another station. Please pick another slot.")
+                load_slots()
+                return
             win.destroy()
             self.reload_records()
 
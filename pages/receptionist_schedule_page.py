@@ -1,13 +1,19 @@
 import customtkinter as ctk
-import sqlite3
 import calendar
 from datetime import date
 from datetime import datetime as _dt, timedelta as _td
 
-from database import DB_NAME
+from database import db_connection
+from calendar_grid import CalendarGrid
+from scheduling import load_day, load_range
+from scheduling.availability import LEGACY_DURATION
 
 
 class ReceptionistSchedulePage(ctk.CTkFrame):
+    tables = ("appointments", "doctors", "doctor_availability")
+    # Refreshing closes the open day's slot list, so only reload when the page is reopened
+    auto_refresh = False
+
     def __init__(self, master):
         super().__init__(master, corner_radius=0, fg_color="transparent")
 
@@ -86,12 +92,12 @@ class ReceptionistSchedulePage(ctk.CTkFrame):
         ).pack(side="left", padx=2, pady=2)
 
         # Calendar Grid
-        self.calendar_frame = ctk.CTkFrame(content_card, corner_radius=12, fg_color="#0f172a", border_width=1, border_color="#334155")
+        self.calendar_frame = CalendarGrid(
+            content_card, on_pick=self._open_day_detail, cell_size=40, cell_font=("Inter", 14),
+            header_pady=(10, 5), uniform_rows=True,
+            corner_radius=12, fg_color="#0f172a", border_width=1, border_color="#334155",
+        )
         self.calendar_frame.grid(row=1, column=0, padx=24, pady=20, sticky="nsew")
-        for col in range(7):
-            self.calendar_frame.grid_columnconfigure(col, weight=1, uniform="cal_cols")
-        for r in range(7): # max rows
-            self.calendar_frame.grid_rowconfigure(r, weight=1, uniform="cal_rows")
 
         # Detail Section
         details_container = ctk.CTkFrame(content_card, fg_color="transparent")
@@ -116,15 +122,18 @@ class ReceptionistSchedulePage(ctk.CTkFrame):
         self._load_doctors()
         self._refresh_calendar()
 
-    def _connect(self):
-        return sqlite3.connect(DB_NAME)
+    def refresh(self):
+        doctor = self.doctor_combo.get()
+        self._load_doctors()
+        if doctor in self.doctor_combo.cget("values"):
+            self.doctor_combo.set(doctor)
+        self._refresh_calendar()
 
     def _load_doctors(self):
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM doctors WHERE status = 'active' ORDER BY name")
-        names = [row[0] for row in cur.fetchall()]
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT name FROM doctors WHERE status = 'active' ORDER BY name")
+            names = [row[0] for row in cur.fetchall()]
 
         if names:
             self.doctor_combo.configure(values=names, state="readonly")
@@ -153,70 +162,35 @@ class ReceptionistSchedulePage(ctk.CTkFrame):
         self._refresh_calendar()
 
     def _refresh_calendar(self):
-        for child in self.calendar_frame.winfo_children():
-            child.destroy()
-
         self.month_label.configure(text=f"{calendar.month_name[self.current_month]} {self.current_year}")
 
-        # Headings
-        for i, wd in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
-            ctk.CTkLabel(self.calendar_frame, text=wd, font=("Inter", 12, "bold"), text_color="#94a3b8").grid(row=0, column=i, pady=(10, 5))
-
         not_available_days = set()
         selected_doctor = self.doctor_combo.get().strip()
 
         if selected_doctor and selected_doctor != "Add doctor first":
-            conn = self._connect()
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM doctors WHERE name = ? AND status = 'active'", (selected_doctor,))
-            row = cur.fetchone()
-            if row:
-                doctor_id = row[0]
-                month_start = f"{self.current_year:04d}-{self.current_month:02d}-01"
-                month_end = f"{self.current_year:04d}-{self.current_month:02d}-31"
-                cur.execute(
-                    "SELECT date FROM doctor_availability WHERE doctor_id = ? AND date BETWEEN ? AND ? AND start_time IS NULL AND is_available = 0",
-                    (doctor_id, month_start, month_end),
-                )
-                not_available_days = {d for (d,) in cur.fetchall()}
-            conn.close()
-
-        cal = calendar.Calendar(firstweekday=0)
+            # Days off, marked for the day or outside the doctor's weekly hours
+            last = calendar.monthrange(self.current_year, self.current_month)[1]
+            month_start = f"{self.current_year:04d}-{self.current_month:02d}-01"
+            month_end = f"{self.current_year:04d}-{self.current_month:02d}-{last:02d}"
+            with db_connection() as conn:
+                _doctors, days = load_range(conn, month_start, month_end, doctor_name=selected_doctor)
+            not_available_days = {d for (_doc, d), (_windows, day_off, _booked) in days.items() if day_off}
+
         today_str = date.today().strftime("%Y-%m-%d")
-        
-        row = 1
-        for week in cal.monthdayscalendar(self.current_year, self.current_month):
-            for col, day_num in enumerate(week):
-                if day_num == 0: continue
-                d_str = f"{self.current_year:04d}-{self.current_month:02d}-{day_num:02d}"
-
-                if d_str < today_str:
-                    bg, hover, state = "#1e293b", "#1e293b", "disabled" # Past
-                    fg = "#64748b"
-                    cmd = None
-                elif d_str in not_available_days:
-                    bg, hover, state = "#991b1b", "#991b1b", "disabled" # Unavailable (Red)
-                    fg = "white"
-                    cmd = None
-                else:
-                    bg, hover, state = "#10b981", "#059669", "normal" # Available (Green)
-                    fg = "white"
-                    cmd = lambda ds=d_str: self._open_day_detail(ds)
-
-                btn = ctk.CTkButton(
-                    self.calendar_frame,
-                    text=str(day_num),
-                    width=40,
-                    height=40,
-                    font=("Inter", 14),
-                    fg_color=bg,
-                    hover_color=hover,
-                    text_color=fg,
-                    state=state,
-                    command=cmd,
-                )
-                btn.grid(row=row, column=col, padx=4, pady=4, sticky="nsew")
-            row += 1
+
+        def _style(d_str):
+            if d_str < today_str:
+                bg, hover, state = "#1e293b", "#1e293b", "disabled" # Past
+                fg = "#64748b"
+            elif d_str in not_available_days:
+                bg, hover, state = "#991b1b", "#991b1b", "disabled" # Unavailable (Red)
+                fg = "white"
+            else:
+                bg, hover, state = "#10b981", "#059669", "normal" # Available (Green)
+                fg = "white"
+            return {"fg_color": bg, "hover_color": hover, "text_color": fg, "state": state}
+
+        self.calendar_frame.show(self.current_year, self.current_month, _style)
 
         self._clear_day_slots()
 
@@ -237,29 +211,23 @@ class ReceptionistSchedulePage(ctk.CTkFrame):
         pretty_date = _dt.strptime(d_str, "%Y-%m-%d").strftime("%B %d, %Y")
         self.day_detail_label.configure(text=f"{pretty_date} – Schedule for Dr. {selected_doctor}")
 
-        conn = self._connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM doctors WHERE name = ? AND status = 'active'", (selected_doctor,))
-        row = cur.fetchone()
-        if not row:
-            conn.close(); return
-
-        doctor_id = row[0]
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT id FROM doctors WHERE name = ? AND status = 'active'", (selected_doctor,))
+            row = cur.fetchone()
+            if not row:
+                return
 
-        # Load Availability
-        cur.execute(
-            "SELECT start_time, end_time FROM doctor_availability WHERE doctor_id = ? AND date = ? AND is_available = 1 AND start_time IS NOT NULL ORDER BY start_time",
-            (doctor_id, d_str),
-        )
-        slots = cur.fetchall()
+            # Load Availability (the day's own windows, or the weekly hours covering it)
+            windows, day_off, _booked = load_day(conn, selected_doctor, d_str)
+            slots = [(st, et) for st, et, _length, _capacity in windows]
 
-        # Load Bookings
-        cur.execute(
-            "SELECT patient_name, schedule FROM appointments WHERE doctor_name = ? AND DATE(schedule) = ? ORDER BY DATETIME(schedule)",
-            (selected_doctor, d_str),
-        )
-        bookings = cur.fetchall()
-        conn.close()
+            # Load Bookings
+            cur.execute(
+                "SELECT patient_name, schedule, COALESCE(duration_minutes, ?) FROM appointments WHERE doctor_name = ? AND schedule_date = ? ORDER BY schedule",
+                (LEGACY_DURATION, selected_doctor, d_str),
+            )
+            bookings = cur.fetchall()
 
         # Layout: 2 Columns (Configured Slots | Bookings) inside the Frame
         grid_layout = ctk.CTkFrame(self.slots_frame, fg_color="transparent")
@@ -273,7 +241,9 @@ class ReceptionistSchedulePage(ctk.CTkFrame):
         
         ctk.CTkLabel(l_frame, text="OPEN TIME WINDOWS", font=("Inter", 11, "bold"), text_color="#94a3b8").pack(anchor="w", padx=10, pady=(10, 5))
         
-        if not slots:
+        if day_off:
+             ctk.CTkLabel(l_frame, text="Not available on this day.", font=("Inter", 12), text_color="#ef4444").pack(anchor="w", padx=10)
+        elif not slots:
              ctk.CTkLabel(l_frame, text="No availability set (Standard 9-5).", font=("Inter", 12), text_color="#64748b").pack(anchor="w", padx=10)
         else:
             for s, e in slots:
@@ -293,10 +263,10 @@ class ReceptionistSchedulePage(ctk.CTkFrame):
         if not bookings:
              ctk.CTkLabel(r_frame, text="No appointments yet.", font=("Inter", 12), text_color="#64748b").pack(anchor="w", padx=10)
         else:
-             for idx, (p_name, sch) in enumerate(bookings, 1):
+             for idx, (p_name, sch, mins) in enumerate(bookings, 1):
                 try:
                     s_dt = _dt.strptime(sch, "%Y-%m-%d %H:%M")
-                    e_dt = s_dt + _td(hours=2)
+                    e_dt = s_dt + _td(minutes=mins)
                     time_str = f"{s_dt.strftime('%I:%M %p')} - {e_dt.strftime('%I:%M %p')}".replace(" 0", " ")
                 except: time_str = sch
                 
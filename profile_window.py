@@ -1,7 +1,6 @@
-import sqlite3
 import customtkinter as ctk
 from tkinter import messagebox
-from database import DB_NAME
+from database import db_connection
 
 class ProfileWindow(ctk.CTkToplevel):
     def __init__(self, master, username: str, anchor_widget=None, mode="settings"):
@@ -54,11 +53,10 @@ class ProfileWindow(ctk.CTkToplevel):
         
         # DB Load
         self.current_image_path = None
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-        cur.execute("SELECT password, profile_image_path, full_name FROM users WHERE username = ?", (self.username,))
-        row = cur.fetchone()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT password, profile_image_path, full_name FROM users WHERE username = ?", (self.username,))
+            row = cur.fetchone()
         
         if row:
             self.current_password = row[0]
@@ -196,11 +194,9 @@ class ProfileWindow(ctk.CTkToplevel):
 
         # Upate DB
         try:
-            conn = sqlite3.connect(DB_NAME)
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET password = ? WHERE username = ?", (new_p, self.username))
-            conn.commit()
-            conn.close()
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("UPDATE users SET password = ? WHERE username = ?", (new_p, self.username))
             messagebox.showinfo("Success", "Password changed successfully.")
             self.destroy()
         except Exception as e:
@@ -233,30 +229,27 @@ class ProfileWindow(ctk.CTkToplevel):
                 messagebox.showerror("Error", f"Failed to save image: {e}")
                 return
 
-        conn = sqlite3.connect(DB_NAME)
-        cur = conn.cursor()
-
-        # If username changed, ensure it's unique
-        if new_username != self.username:
-            cur.execute("SELECT COUNT(*) FROM users WHERE username = ?", (new_username,))
-            if cur.fetchone()[0] > 0:
-                conn.close()
-                messagebox.showerror("Error", "Username already exists.")
-                return
+        with db_connection() as conn:
+            cur = conn.cursor()
 
-        cur.execute(
-            "UPDATE users SET username = ?, profile_image_path = ?, full_name = ? WHERE username = ?",
-            (new_username, final_image_path, new_fullname, self.username),
-        )
+            # If username changed, ensure it's unique
+            if new_username != self.username:
+                cur.execute("SELECT COUNT(*) FROM users WHERE username = ?", (new_username,))
+                if cur.fetchone()[0] > 0:
+                    messagebox.showerror("Error", "Username already exists.")
+                    return
 
-        if new_username != self.username:
             cur.execute(
-                "UPDATE recent_logins SET username = ? WHERE username = ?",
-                (new_username, self.username)
+                "UPDATE users SET username = ?, profile_image_path = ?, full_name = ? WHERE username = ?",
+                (new_username, final_image_path, new_fullname, self.username),
             )
 
-        conn.commit()
-        conn.close()
+            if new_username != self.username:
+                cur.execute(
+                    "UPDATE recent_logins SET username = ? WHERE username = ?",
+                    (new_username, self.username)
+                )
+
 
         self.username = new_username
         self.current_image_path = final_image_path
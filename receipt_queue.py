@@ -0,0 +1,82 @@
+import queue
+import threading
+
+
+class ReceiptQueue:
+    """Renders and saves receipts on a background thread so payment and booking never wait on Pillow.
+
+    ``submit`` returns straight away. Jobs run one at a time on a single
+    worker, so receipts are written in the order they were confirmed. When a
+    widget is given, ``on_done(filepath, error)`` is called on the Tk thread
+    once the file is written, by polling with ``after()``.
+    """
+
+    def __init__(self, poll_ms: int = 100):
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._thread = None
+
+    def _start(self):
+        # Called with the lock held
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="receipt-queue", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            render, filepath, lines, done = self._jobs.get()
+            error = None
+            try:
+                render(filepath, lines)
+            except Exception as e:
+                error = e
+            if done is not None:
+                done.put((filepath, error))
+            with self._lock:
+                self._pending -= 1
+                if not self._pending:
+                    self._idle.notify_all()
+
+    def submit(self, render, filepath: str, lines: list[str], widget=None, on_done=None) -> None:
+        """Queue ``render(filepath, lines)``; report back through ``on_done`` on ``widget``'s Tk thread."""
+        done = queue.Queue(maxsize=1) if widget is not None and on_done is not None else None
+        with self._lock:
+            self._pending += 1
+            self._jobs.put((render, filepath, lines, done))
+            self._start()
+        if done is not None:
+            self._poll(widget, done, on_done)
+
+    def _poll(self, widget, done, on_done):
+        try:
+            filepath, error = done.get_nowait()
+        except queue.Empty:
+            try:
+                widget.after(self.poll_ms, lambda: self._poll(widget, done, on_done))
+            except Exception:
+                pass  # Window gone; the receipt is still written
+            return
+        try:
+            if widget.winfo_exists():
+                on_done(filepath, error)
+        except Exception:
+            pass
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait for queued receipts to be written; False if some were still pending after ``timeout``."""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+
+_receipts = None
+
+
+def get_receipt_queue() -> ReceiptQueue:
+    """The process-wide receipt queue."""
+    global _receipts
+    if _receipts is None:
+        _receipts = ReceiptQueue()
+    return _receipts
@@ -0,0 +1,28 @@
+"""Scheduling logic shared by the booking pages, kept free of any UI code."""
+
+from scheduling.availability import (
+    Slot,
+    compute_slots,
+    day_slots,
+    load_day,
+    load_range,
+    month_availability,
+    next_available,
+    slot_at,
+)
+from scheduling.booking import book_appointment, reschedule_appointment
+from scheduling.intervals import IntervalIndex
+
+__all__ = [
+    "IntervalIndex",
+    "Slot",
+    "book_appointment",
+    "compute_slots",
+    "day_slots",
+    "load_day",
+    "load_range",
+    "month_availability",
+    "next_available",
+    "reschedule_appointment",
+    "slot_at",
+]
@@ -0,0 +1,321 @@
+import calendar
+import threading
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from scheduling.intervals import IntervalIndex
+
+# Slot length and patients per slot for windows that leave them unset.
+SLOT_MINUTES = 30
+SLOT_CAPACITY = 1
+# Used when a doctor has no explicit availability windows for a day; the same
+# virtual window DoctorManagePage shows.
+DEFAULT_WINDOW = ("09:00", "17:00", SLOT_MINUTES, SLOT_CAPACITY)
+# Appointments booked before durations were stored blocked the doctor this long.
+LEGACY_DURATION = 120
+
+
+class Slot(NamedTuple):
+    start: datetime
+    end: datetime
+    remaining: int
+    capacity: int = SLOT_CAPACITY
+
+    @property
+    def available(self) -> bool:
+        return self.remaining > 0
+
+    @property
+    def schedule(self) -> str:
+        """Value stored in ``appointments.schedule`` for this slot."""
+        return self.start.strftime("%Y-%m-%d %H:%M")
+
+
+def _minutes(hhmm: str) -> int:
+    return int(hhmm[:2]) * 60 + int(hhmm[3:5])
+
+
+def load_range(conn, date_from: str, date_to: str, doctor_name: str | None = None,
+               specialty: str | None = None, exclude_id: int | None = None):
+    """Fetch doctors, availability rows and bookings for a date range in one query.
+
+    Returns ``(doctors, days)``: the matching active doctor names, and a dict
+    mapping ``(doctor_name, date_str)`` to ``[windows, day_off, booked]`` where
+    ``windows`` is a sorted list of ``(start_time, end_time, slot_length,
+    max_appointments)``, ``day_off`` is True when the day is marked unavailable
+    and ``booked`` is an ``IntervalIndex`` of the day's bookings. Days without
+    rows are simply absent.
+    The appointment ``exclude_id`` (one being rescheduled) is not counted.
+
+    Weekly rule rows are expanded here, for the requested range only: a rule
+    adds its window to every matching day that has no dated windows or day
+    off of its own. A doctor with any weekly rules no longer gets the
+    implicit ``DEFAULT_WINDOW``: days no rule covers come back as days off,
+    unless they were explicitly switched to available.
+    """
+    doctor_filter, doctor_params = "", []
+    if doctor_name is not None:
+        doctor_filter += " AND d.name = ?"
+        doctor_params.append(doctor_name)
+    if specialty:
+        doctor_filter += " AND LOWER(COALESCE(d.specialty, '')) LIKE ?"
+        doctor_params.append(f"%{specialty.lower()}%")
+    booking_filter, booking_params = "", []
+    if doctor_name is not None:
+        booking_filter = " AND doctor_name = ?"
+        booking_params.append(doctor_name)
+    if exclude_id is not None:
+        booking_filter += " AND id != ?"
+        booking_params.append(exclude_id)
+
+    rows = conn.execute(
+        f"""
+        SELECT 'd', d.name, NULL, NULL, NULL,
+               EXISTS (SELECT 1 FROM doctor_availability r WHERE r.doctor_id = d.id AND r.weekday_mask IS NOT NULL),
+               NULL, NULL, NULL
+        FROM doctors d
+        WHERE d.status = 'active'{doctor_filter}
+        UNION ALL
+        SELECT 'w', d.name, a.date, a.start_time, a.end_time, a.is_available,
+               a.slot_length_minutes, a.max_appointments, NULL
+        FROM doctor_availability a
+        JOIN doctors d ON d.id = a.doctor_id
+        WHERE d.status = 'active' AND a.weekday_mask IS NULL AND a.date BETWEEN ? AND ?{doctor_filter}
+        UNION ALL
+        SELECT 'r', d.name, a.date, a.start_time, a.end_time, a.weekday_mask,
+               a.slot_length_minutes, a.max_appointments, a.valid_until
+        FROM doctor_availability a
+        JOIN doctors d ON d.id = a.doctor_id
+        WHERE d.status = 'active' AND a.weekday_mask IS NOT NULL AND a.is_available = 1
+          AND a.date <= ? AND (a.valid_until IS NULL OR a.valid_until >= ?){doctor_filter}
+        UNION ALL
+        SELECT 'b', doctor_name, schedule_date, schedule, NULL, NULL,
+               COALESCE(duration_minutes, {LEGACY_DURATION}), NULL, NULL
+        FROM appointments
+        WHERE schedule_date BETWEEN ? AND ?{booking_filter}
+        """,
+        (*doctor_params, date_from, date_to, *doctor_params, date_to, date_from, *doctor_params,
+         date_from, date_to, *booking_params),
+    ).fetchall()
+
+    doctors, days, rules = [], {}, []
+    ruled, opened = set(), set()
+    for kind, doctor, day, start, end, is_available, length, capacity, until in rows:
+        if kind == "d":
+            doctors.append(doctor)
+            if is_available:
+                ruled.add(doctor)
+            continue
+        if kind == "r":
+            rules.append((doctor, day, until, is_available, (start, end, length or SLOT_MINUTES, capacity or SLOT_CAPACITY)))
+            continue
+        plan = days.get((doctor, day))
+        if plan is None:
+            plan = days[(doctor, day)] = [[], False, []]
+        if kind == "b":
+            try:
+                plan[2].append((_minutes(start[11:16]), length))
+            except (TypeError, ValueError):
+                continue
+        elif start is None:
+            if not is_available:
+                plan[1] = True
+            else:
+                opened.add((doctor, day))
+        elif is_available:
+            plan[0].append((start, end, length or SLOT_MINUTES, capacity or SLOT_CAPACITY))
+    if ruled:
+        _expand_rules(days, rules, ruled, opened, date_from, date_to)
+    for plan in days.values():
+        plan[0].sort()
+        plan[2] = IntervalIndex(plan[2])
+    doctors.sort()
+    return doctors, days
+
+
+def _expand_rules(days, rules, ruled, opened, date_from: str, date_to: str):
+    # Days with dated windows or a day off keep them; the rest get every rule
+    # that covers them, or are closed when none does (unless switched to
+    # available, which keeps the default window). Only the days of the
+    # requested range are visited.
+    by_doctor = {doctor: [] for doctor in ruled}
+    for doctor, first, until, mask, window in rules:
+        by_doctor[doctor].append((first, until, mask, window))
+    dated = {key for key, plan in days.items() if plan[0] or plan[1]}
+    day, last = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    while day <= last:
+        date_str, bit = day.isoformat(), 1 << day.weekday()
+        for doctor, doctor_rules in by_doctor.items():
+            key = (doctor, date_str)
+            if key in dated:
+                continue
+            windows = [window for first, until, mask, window in doctor_rules
+                       if mask & bit and first <= date_str and (until is None or date_str <= until)]
+            if not windows and key in opened:
+                continue
+            plan = days.get(key)
+            if plan is None:
+                plan = days[key] = [[], False, []]
+            if windows:
+                plan[0].extend(windows)
+            else:
+                plan[1] = True
+        day += timedelta(days=1)
+
+
+# Per-thread (each thread has its own pooled connection) cache of load_day
+# results, so re-rendering a day or re-checking a slot on save skips the
+# availability/bookings query while nothing was written.
+_day_cache = threading.local()
+_DAY_CACHE_SIZE = 256
+
+
+def _day_token(conn):
+    # The file tells databases apart; the versions move on every write to the
+    # tables a day plan is built from, from this station or any other (see
+    # database._migrate_change_tracking).
+    return conn.execute(
+        """
+        SELECT (SELECT file FROM pragma_database_list WHERE name = 'main'),
+               (SELECT group_concat(version) FROM (
+                    SELECT version FROM table_versions
+                    WHERE name IN ('appointments', 'doctor_availability', 'doctors')
+                    ORDER BY name))
+        """
+    ).fetchone()
+
+
+def load_day(conn, doctor_name: str, date_str: str, exclude_id: int | None = None):
+    """``(windows, day_off, booked)`` for one doctor and day; see ``load_range``.
+
+    Results are cached per thread and reused until a booking, reschedule,
+    deletion or availability change bumps the table versions.
+    """
+    cache = getattr(_day_cache, "plans", None)
+    if cache is None:
+        cache = _day_cache.plans = {}
+    key = (doctor_name, date_str, exclude_id)
+    token = _day_token(conn)
+    hit = cache.get(key)
+    if hit is not None and hit[0] == token:
+        return hit[1]
+
+    _doctors, days = load_range(conn, date_str, date_str, doctor_name=doctor_name, exclude_id=exclude_id)
+    windows, day_off, booked = days.get((doctor_name, date_str), ([], False, IntervalIndex()))
+    if len(cache) >= _DAY_CACHE_SIZE:
+        cache.clear()
+    cache[key] = (token, (windows, day_off, booked))
+    return windows, day_off, booked
+
+
+def compute_slots(date_str: str, windows, booked, now: datetime | None = None) -> list[Slot]:
+    """Lay out slots over ``windows`` and subtract overlapping bookings.
+
+    Each window is cut into slots of its own length, each taking up to its
+    own number of patients. ``booked`` is an ``IntervalIndex`` (or
+    ``(start_minute, duration)`` pairs to build one from), so each slot costs
+    two binary searches however fine the grid or busy the day.
+    """
+    day = datetime.strptime(date_str, "%Y-%m-%d")
+    if now is None:
+        now = datetime.now()
+    if not isinstance(booked, IntervalIndex):
+        booked = IntervalIndex(booked)
+
+    slots = []
+    for start_t, end_t, slot_minutes, capacity in windows or [DEFAULT_WINDOW]:
+        try:
+            ws, we = _minutes(start_t), _minutes(end_t)
+        except (TypeError, ValueError):
+            continue
+        if slot_minutes <= 0:
+            continue
+        s = ws
+        while s + slot_minutes <= we:
+            e = s + slot_minutes
+            start_dt = day + timedelta(minutes=s)
+            if start_dt < now:
+                remaining = 0
+            else:
+                remaining = max(0, capacity - booked.overlapping(s, e))
+            slots.append(Slot(start_dt, day + timedelta(minutes=e), remaining, capacity))
+            s = e
+    return slots
+
+
+def day_slots(conn, doctor_name: str, date_str: str, now: datetime | None = None,
+              exclude_id: int | None = None) -> list[Slot]:
+    """All bookable slots for ``doctor_name`` on ``date_str`` (empty on a day off).
+
+    Pass the id of an appointment being rescheduled as ``exclude_id`` so its
+    own slot shows as free.
+    """
+    windows, day_off, booked = load_day(conn, doctor_name, date_str, exclude_id=exclude_id)
+    if day_off:
+        return []
+    return compute_slots(date_str, windows, booked, now)
+
+
+def slot_at(conn, doctor_name: str, schedule: str, exclude_id: int | None = None) -> Slot | None:
+    """The slot of ``doctor_name``'s grid starting at ``schedule``, or None if there is none.
+
+    Past slots are included, so their length and capacity can still be read.
+    """
+    start = datetime.strptime(schedule, "%Y-%m-%d %H:%M")
+    for slot in day_slots(conn, doctor_name, schedule[:10], now=datetime.min, exclude_id=exclude_id):
+        if slot.start == start:
+            return slot
+    return None
+
+
+def next_available(conn, date_from: date, date_to: date, limit: int = 5,
+                   specialty: str | None = None, now: datetime | None = None) -> list[tuple[str, Slot]]:
+    """Earliest ``limit`` free slots across all active doctors between two dates.
+
+    Everything is loaded with one ``load_range`` query; days are then swept in
+    order and the search stops as soon as ``limit`` slots have been found.
+    """
+    if now is None:
+        now = datetime.now()
+    doctors, days = load_range(
+        conn, date_from.strftime("%Y-%m-%d"), date_to.strftime("%Y-%m-%d"), specialty=specialty
+    )
+    found = []
+    day = date_from
+    while day <= date_to and len(found) < limit:
+        date_str = day.strftime("%Y-%m-%d")
+        todays = []
+        for doctor in doctors:
+            windows, day_off, booked = days.get((doctor, date_str), ([], False, IntervalIndex()))
+            if day_off:
+                continue
+            todays.extend((slot.start, doctor, slot) for slot in compute_slots(date_str, windows, booked, now) if slot.available)
+        todays.sort(key=lambda item: (item[0], item[1]))
+        found.extend((doctor, slot) for _start, doctor, slot in todays)
+        day += timedelta(days=1)
+    return found[:limit]
+
+
+def month_availability(conn, doctor_name: str, year: int, month: int,
+                       now: datetime | None = None) -> dict[str, tuple[int, int] | None]:
+    """Free and total slot counts per day of a month for one doctor.
+
+    Maps each ``date_str`` to ``(free, total)``, or to None when the day is
+    marked unavailable. Uses a single ``load_range`` query for the whole month.
+    """
+    if now is None:
+        now = datetime.now()
+    last = calendar.monthrange(year, month)[1]
+    _doctors, days = load_range(
+        conn, f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last:02d}", doctor_name=doctor_name
+    )
+    counts = {}
+    for day_num in range(1, last + 1):
+        date_str = f"{year:04d}-{month:02d}-{day_num:02d}"
+        windows, day_off, booked = days.get((doctor_name, date_str), ([], False, IntervalIndex()))
+        if day_off:
+            counts[date_str] = None
+            continue
+        slots = compute_slots(date_str, windows, booked, now)
+        counts[date_str] = (sum(1 for slot in slots if slot.available), len(slots))
+    return counts
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from scheduling.availability import LEGACY_DURATION, slot_at
+
+# Bookings overlapping [start, end): they start before ``end`` and finish after ``start``.
+# The lower bound on ``schedule`` keeps the lookup on the (doctor_name, schedule) index.
+_OVERLAP_SQL = f"""
+    SELECT COUNT(*) FROM appointments
+    WHERE doctor_name = ? AND schedule >= ? AND schedule < ?
+      AND strftime('%Y-%m-%d %H:%M', schedule, '+' || COALESCE(duration_minutes, {LEGACY_DURATION}) || ' minutes') > ?
+"""
+
+
+def _overlap_params(doctor_name: str, schedule: str, slot_minutes: int) -> tuple:
+    start = datetime.strptime(schedule, "%Y-%m-%d %H:%M")
+    end = (start + timedelta(minutes=slot_minutes)).strftime("%Y-%m-%d %H:%M")
+    return doctor_name, schedule[:10], end, schedule
+
+
+def book_appointment(conn, doctor_name: str, schedule: str, columns: dict) -> int | None:
+    """Insert an appointment only if its slot still has room; return the new id or None.
+
+    ``columns`` holds the remaining appointment columns (patient_name, notes,
+    ...). The slot's length and capacity come from the doctor's availability
+    window, and the appointment blocks the doctor for that long. The capacity
+    check and the insert are a single statement, so two stations confirming
+    the same slot at once cannot both get it.
+    """
+    slot = slot_at(conn, doctor_name, schedule)
+    if slot is None:
+        return None
+    slot_minutes = int((slot.end - slot.start).total_seconds() // 60)
+    names = ["doctor_name", "schedule", "duration_minutes", *columns]
+    cur = conn.execute(
+        f"""
+        INSERT INTO appointments ({', '.join(names)})
+        SELECT {', '.join('?' * len(names))}
+        WHERE ({_OVERLAP_SQL}) < ?
+        """,
+        (doctor_name, schedule, slot_minutes, *columns.values(),
+         *_overlap_params(doctor_name, schedule, slot_minutes), slot.capacity),
+    )
+    if cur.rowcount == 0:
+        return None
+    return cur.lastrowid
+
+
+def reschedule_appointment(conn, appt_id: int, doctor_name: str, schedule: str, columns: dict) -> bool:
+    """Move appointment ``appt_id`` and update ``columns``; False if the new slot is full.
+
+    Other bookings in the target slot are counted in the same UPDATE, leaving
+    the appointment itself out. Keeping the current doctor and time always
+    succeeds, so editing only the patient details never fails on an already
+    crowded slot, or on one whose window has since been removed.
+    """
+    slot = slot_at(conn, doctor_name, schedule, exclude_id=appt_id)
+    if slot is None:
+        slot_minutes, capacity = 0, 0
+    else:
+        slot_minutes = int((slot.end - slot.start).total_seconds() // 60)
+        capacity = slot.capacity
+        columns = dict(columns, duration_minutes=slot_minutes)
+    assignments = ", ".join(f"{name} = ?" for name in ["doctor_name", "schedule", *columns])
+    cur = conn.execute(
+        f"""
+        UPDATE appointments SET {assignments}
+        WHERE id = ?
+          AND ((doctor_name = ? AND schedule = ?)
+               OR ({_OVERLAP_SQL} AND id != ?) < ?)
+        """,
+        (doctor_name, schedule, *columns.values(), appt_id, doctor_name, schedule,
+         *_overlap_params(doctor_name, schedule, slot_minutes), appt_id, capacity),
+    )
+    return cur.rowcount > 0
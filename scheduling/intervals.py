@@ -0,0 +1,24 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """Bookings of one doctor-day as ``[start, start + length)`` minute intervals.
+
+    Starts and ends are kept in two independently sorted lists. An interval
+    that ends at or before ``s`` also starts before ``e``, so the number of
+    intervals overlapping ``[s, e)`` is ``#(start < e) - #(end <= s)``: two
+    binary searches, whatever the lengths and however many bookings.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals=()):
+        self.starts = sorted(start for start, _length in intervals)
+        self.ends = sorted(start + length for start, length in intervals)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, s: int, e: int) -> int:
+        """Number of intervals overlapping ``[s, e)``."""
+        return bisect_left(self.starts, e) - bisect_right(self.ends, s)
@@ -0,0 +1,337 @@
+"""Headless HTTP/JSON front end to the scheduling core, for kiosks and the SMS gateway.
+
+Run it next to the desktop app against the same database:
+
+    python service.py --host 0.0.0.0 --port 8080
+
+Endpoints (all responses are JSON):
+
+    GET  /services
+    GET  /availability?doctor=NAME&date=YYYY-MM-DD
+    GET  /next-available?days=30&limit=5&specialty=TEXT
+    POST /appointments                    {"doctor", "schedule", "patient", "contact", "address", "service_id", "notes"}
+    GET  /appointments/BARCODE
+    POST /appointments/BARCODE/pay        {"amount_paid"}
+"""
+
+import argparse
+import asyncio
+import json
+import functools
+import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qs, unquote, urlsplit
+from uuid import uuid4
+
+from database import DB_NAME, db_connection, get_services, init_db, log_activity, run_write
+from scheduling import book_appointment, day_slots, next_available
+
+log = logging.getLogger("medisked.service")
+
+MAX_BODY = 64 * 1024
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _slot_json(slot):
+    return {
+        "schedule": slot.schedule,
+        "start": slot.start.strftime("%H:%M"),
+        "end": slot.end.strftime("%H:%M"),
+        "remaining": slot.remaining,
+    }
+
+
+def _require_doctor(conn, name: str):
+    if conn.execute("SELECT 1 FROM doctors WHERE name = ? AND status = 'active'", (name,)).fetchone() is None:
+        raise HTTPError(404, "no active doctor with that name")
+
+
+def _check_booking(body: dict) -> None:
+    """Reject a booking payload with a missing or wrongly typed field before it reaches SQLite."""
+    required = ("doctor", "schedule", "patient", "contact", "address")
+    wrong = [k for k in (*required, "notes") if body.get(k) is not None and not isinstance(body[k], str)]
+    if wrong:
+        raise HTTPError(400, f"fields must be strings: {', '.join(wrong)}")
+    missing = [k for k in required if not (body.get(k) or "").strip()]
+    if missing:
+        raise HTTPError(400, f"missing fields: {', '.join(missing)}")
+    # strptime alone also takes "2030-1-5 9:0", which would never match a slot
+    try:
+        if not re.fullmatch(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}", body["schedule"]):
+            raise ValueError
+        datetime.strptime(body["schedule"], "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise HTTPError(400, "'schedule' must be 'YYYY-MM-DD HH:MM'")
+    # bool is an int subclass: true would otherwise pick service 1
+    service_id = body.get("service_id")
+    if service_id is not None and type(service_id) is not int:
+        raise HTTPError(400, "'service_id' must be an integer")
+
+
+def _parse_amount(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise HTTPError(400, "'amount_paid' must be a non-negative number")
+    return float(value)
+
+
+def _parse_date(value: str | None, name: str) -> str:
+    try:
+        return datetime.strptime(value or "", "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise HTTPError(400, f"'{name}' must be a YYYY-MM-DD date")
+
+
+class SchedulingService:
+    """Request handlers; every method runs on a worker thread with its own pooled connection."""
+
+    def __init__(self, db_path: str = DB_NAME):
+        self.db_path = db_path
+
+    def services(self, query, body):
+        return 200, [{"id": sid, "name": name, "price": price} for sid, name, price in get_services(self.db_path)]
+
+    def availability(self, query, body):
+        doctor = query.get("doctor")
+        if not doctor:
+            raise HTTPError(400, "'doctor' is required")
+        date_str = _parse_date(query.get("date"), "date")
+        with db_connection(self.db_path) as conn:
+            _require_doctor(conn, doctor)
+            slots = day_slots(conn, doctor, date_str)
+        return 200, {"doctor": doctor, "date": date_str, "slots": [_slot_json(s) for s in slots]}
+
+    def next_available(self, query, body):
+        try:
+            days = min(int(query.get("days", 30)), 365)
+            limit = min(int(query.get("limit", 5)), 100)
+        except ValueError:
+            raise HTTPError(400, "'days' and 'limit' must be integers")
+        today = date.today()
+        with db_connection(self.db_path) as conn:
+            found = next_available(conn, today, today + timedelta(days=days), limit=limit,
+                                   specialty=query.get("specialty"))
+        return 200, [dict(_slot_json(slot), doctor=doctor) for doctor, slot in found]
+
+    def book(self, query, body):
+        _check_booking(body)
+        with db_connection(self.db_path) as conn:
+            _require_doctor(conn, body["doctor"])
+            slots = day_slots(conn, body["doctor"], body["schedule"][:10])
+        if not any(slot.schedule == body["schedule"] and slot.available for slot in slots):
+            raise HTTPError(409, "slot is not available")
+
+        service_id, about, price = body.get("service_id"), "", None
+        if service_id is not None:
+            service = next((s for s in get_services(self.db_path) if s[0] == service_id), None)
+            if service is None:
+                raise HTTPError(400, "unknown service_id")
+            _sid, about, price = service
+
+        # Same notes layout as the receptionist's booking form
+        notes = f"Contact: {body['contact']} | Address: {body['address']} | About: {about}"
+        if body.get("notes"):
+            notes += f" | Notes: {body['notes']}"
+        barcode = "APPT-" + uuid4().hex[:10].upper()
+        columns = {
+            "patient_name": body["patient"], "notes": notes, "barcode": barcode,
+            "contact": body["contact"], "address": body["address"], "service_id": service_id, "price": price,
+        }
+        appt_id = run_write(
+            lambda conn: book_appointment(conn, body["doctor"], body["schedule"], columns), db_path=self.db_path
+        )
+        if appt_id is None:
+            raise HTTPError(409, "slot is no longer available")
+        log_activity("service", "service", "book_appointment", f"Booked for {body['patient']}", db_path=self.db_path)
+        return 201, {"id": appt_id, "barcode": barcode, "schedule": body["schedule"], "price": price}
+
+    def lookup(self, query, body, barcode):
+        with db_connection(self.db_path) as conn:
+            row = conn.execute(
+                """
+                SELECT a.id, a.patient_name, a.doctor_name, a.schedule, a.barcode,
+                       COALESCE(a.is_paid, 0), COALESCE(a.amount_paid, 0), a.price, s.name
+                FROM appointments a
+                LEFT JOIN services s ON s.id = a.service_id
+                WHERE a.barcode = ?
+                """,
+                (barcode,),
+            ).fetchone()
+        if row is None:
+            raise HTTPError(404, "no appointment with that barcode")
+        keys = ("id", "patient", "doctor", "schedule", "barcode", "is_paid", "amount_paid", "price", "service")
+        result = dict(zip(keys, row))
+        result["is_paid"] = bool(result["is_paid"])
+        return 200, result
+
+    def pay(self, query, body, barcode):
+        amount = _parse_amount(body.get("amount_paid"))
+
+        def _settle(conn):
+            row = conn.execute("SELECT id, price FROM appointments WHERE barcode = ?", (barcode,)).fetchone()
+            if row is None:
+                raise HTTPError(404, "no appointment with that barcode")
+            if row[1] is not None and amount < row[1]:
+                raise HTTPError(400, "amount paid is less than the price")
+            updated = conn.execute(
+                "UPDATE appointments SET is_paid = 1, amount_paid = ? WHERE id = ? AND COALESCE(is_paid, 0) = 0",
+                (amount, row[0]),
+            ).rowcount
+            if not updated:
+                raise HTTPError(409, "appointment is already paid")
+            return row
+
+        appt_id, price = run_write(_settle, db_path=self.db_path)
+        log_activity("service", "service", "confirm_payment", f"Paid appt #{appt_id} ({barcode})", db_path=self.db_path)
+        change = amount - price if price is not None else None
+        return 200, {"id": appt_id, "barcode": barcode, "amount_paid": amount, "change": change}
+
+    def route(self, method: str, path: str):
+        """Handler (with any path arguments bound) for a request, or raise HTTPError."""
+        parts = [unquote(p) for p in path.strip("/").split("/") if p]
+        routes = {
+            ("GET", "services"): self.services,
+            ("GET", "availability"): self.availability,
+            ("GET", "next-available"): self.next_available,
+            ("POST", "appointments"): self.book,
+        }
+        if len(parts) == 1:
+            handler = routes.get((method, parts[0]))
+            if handler is not None:
+                return handler
+            if any(key[1] == parts[0] for key in routes):
+                raise HTTPError(405, "method not allowed")
+        elif len(parts) == 2 and parts[0] == "appointments":
+            if method != "GET":
+                raise HTTPError(405, "method not allowed")
+            return functools.partial(self.lookup, barcode=parts[1])
+        elif len(parts) == 3 and parts[0] == "appointments" and parts[2] == "pay":
+            if method != "POST":
+                raise HTTPError(405, "method not allowed")
+            return functools.partial(self.pay, barcode=parts[1])
+        raise HTTPError(404, "not found")
+
+
+class HTTPServer:
+    """Minimal HTTP/1.1 server on asyncio; SQLite work goes to a thread pool.
+
+    Each pool thread keeps its own long-lived connection (see
+    ``database.get_connection``), so the pool size is also the number of open
+    database connections.
+    """
+
+    def __init__(self, service: SchedulingService, workers: int = 8):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-db")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request line"}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _sep, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "bad Content-Length"}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                raw = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._dispatch(method.upper(), target, raw)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, raw: bytes):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            handler = self.service.route(method, url.path)
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise HTTPError(400, "request body must be a JSON object")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, handler, query, body)
+        except HTTPError as e:
+            return e.status, {"error": e.message}
+        except json.JSONDecodeError:
+            return 400, {"error": "request body is not valid JSON"}
+        except Exception:
+            # Details stay in the server log; kiosks and the SMS gateway only need to know it failed
+            log.exception("%s %s failed", method, target)
+            return 500, {"error": "internal server error"}
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Medisked service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medisked scheduling service (HTTP/JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default=DB_NAME, help="SQLite database file")
+    parser.add_argument("--workers", type=int, default=8, help="database worker threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db(args.db)
+    server = HTTPServer(SchedulingService(args.db), workers=args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
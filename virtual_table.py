@@ -0,0 +1,158 @@
+import math
+import tkinter
+
+import customtkinter as ctk
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Scrollable list of fixed-height rows that only builds widgets for what is visible.
+
+    ``make_row(parent)`` builds the widgets for one row and returns the row
+    widget; ``bind_row(row, record)`` fills an existing row with a record. The
+    table keeps a pool of rows just large enough to cover the viewport and
+    rebinds them as the user scrolls, so a year of appointments costs the same
+    number of Tk widgets as a single screenful.
+
+    Records can be handed over in full with ``set_records`` or paged in from
+    the database with ``set_source``.
+    """
+
+    def __init__(self, master, make_row, bind_row, row_height=60, row_padx=5, row_pady=5,
+                 empty_text="No records found.", **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self._make_row = make_row
+        self._bind_row = bind_row
+        self._row_height = row_height
+        self._row_padx = row_padx
+        self._row_pady = row_pady
+
+        self._records = []
+        self._top = 0
+        self._fetch_page = None
+        self._page_size = 100
+        self._exhausted = True
+        self._pool = []  # [(slot_frame, row_widget, bound_index)]
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._empty_label = ctk.CTkLabel(self._viewport, text=empty_text, font=("Inter", 14), text_color="#64748b")
+
+        self._viewport.bind("<Configure>", lambda _e: self._render(), add="+")
+        self._bind_wheel(self._viewport)
+
+    def set_records(self, records, keep_position: bool = False):
+        self._fetch_page = None
+        self._exhausted = True
+        self._show(list(records), keep_position)
+
+    def set_source(self, fetch_page, page_size: int = 100, keep_position: bool = False):
+        """Load records lazily through ``fetch_page(last_record, limit)``.
+
+        ``last_record`` is None for the first page and the last loaded record
+        afterwards; a page shorter than ``limit`` marks the end. Further pages
+        are requested only when the user scrolls near the bottom.
+        """
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        records = fetch_page(None, page_size)
+        self._exhausted = len(records) < page_size
+        self._show(list(records), keep_position)
+
+    def _show(self, records, keep_position):
+        self._records = records
+        if not keep_position:
+            self._top = 0
+        self._pool = [(slot, row, None) for slot, row, _idx in self._pool]
+        self._render()
+
+    def _fetch_more(self):
+        records = self._fetch_page(self._records[-1], self._page_size)
+        self._exhausted = len(records) < self._page_size
+        self._records.extend(records)
+
+    @property
+    def records(self):
+        return self._records
+
+    def _viewport_height(self) -> int:
+        return max(self._viewport.winfo_height(), 1)
+
+    def _max_top(self) -> int:
+        return max(0, len(self._records) * self._row_height - self._viewport_height())
+
+    def _ensure_pool(self, size: int):
+        while len(self._pool) < size:
+            slot = ctk.CTkFrame(self._viewport, fg_color="transparent", corner_radius=0, height=self._row_height)
+            slot.pack_propagate(False)
+            row = self._make_row(slot)
+            row.pack(fill="both", expand=True, padx=self._row_padx, pady=self._row_pady)
+            self._bind_wheel(slot)
+            self._pool.append((slot, row, None))
+
+    def _render(self):
+        if not self._records:
+            for slot, _row, _idx in self._pool:
+                slot.place_forget()
+            self._empty_label.place(relx=0.5, y=40, anchor="n")
+            self._scrollbar.set(0.0, 1.0)
+            return
+        self._empty_label.place_forget()
+
+        height = self._viewport_height()
+        visible = math.ceil(height / self._row_height) + 1
+        while not self._exhausted and (self._top // self._row_height) + 2 * visible >= len(self._records):
+            self._fetch_more()
+        self._top = min(max(self._top, 0), self._max_top())
+        self._ensure_pool(visible)
+
+        first = self._top // self._row_height
+        shift = self._top - first * self._row_height
+        for i, (slot, row, bound) in enumerate(self._pool):
+            idx = first + i
+            if i >= visible or idx >= len(self._records):
+                slot.place_forget()
+                continue
+            if bound != idx:
+                self._bind_row(row, self._records[idx])
+                self._pool[i] = (slot, row, idx)
+            slot.place(x=0, y=i * self._row_height - shift, relwidth=1.0)
+
+        total = len(self._records) * self._row_height
+        self._scrollbar.set(self._top / total, min(1.0, (self._top + height) / total))
+
+    def _scroll_to(self, top: int):
+        top = min(max(int(top), 0), self._max_top())
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(float(args[0]) * len(self._records) * self._row_height)
+        elif action == "scroll":
+            amount = int(args[0])
+            if args[1] == "pages":
+                self._scroll_to(self._top + amount * self._viewport_height())
+            else:
+                self._scroll_to(self._top + amount * self._row_height)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._top - self._row_height)
+        else:
+            self._scroll_to(self._top + self._row_height)
+
+    def _bind_wheel(self, widget):
+        # Bind on the underlying Tk windows so each wheel event fires exactly once
+        tkinter.Misc.bind(widget, "<MouseWheel>", self._on_wheel, "+")
+        tkinter.Misc.bind(widget, "<Button-4>", self._on_wheel, "+")
+        tkinter.Misc.bind(widget, "<Button-5>", self._on_wheel, "+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)